@@ -0,0 +1,30 @@
+"""Add indexes backing the incremental file sync
+
+Revision ID: 4699fb04f802
+Revises: daf48d360ee5
+Create Date: 2026-10-17 07:05:12.384211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4699fb04f802'
+down_revision: Union[str, None] = 'daf48d360ee5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The in-memory file service polls for rows edited or deleted since its last sync
+    op.create_index('ix_files_last_edited_at', 'files', ['last_edited_at'])
+    op.create_index('ix_files_deleted_at', 'files', ['deleted_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_files_deleted_at', 'files')
+    op.drop_index('ix_files_last_edited_at', 'files')
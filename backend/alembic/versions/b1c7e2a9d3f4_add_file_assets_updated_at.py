@@ -0,0 +1,36 @@
+"""Add file_assets.updated_at for render cache invalidation
+
+Revision ID: b1c7e2a9d3f4
+Revises: 4699fb04f802
+Create Date: 2026-10-17 09:41:27.518306
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1c7e2a9d3f4'
+down_revision: Union[str, None] = '4699fb04f802'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The in-memory file service polls for changed assets to invalidate cached renders
+    op.add_column(
+        'file_assets',
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.execute('UPDATE file_assets SET updated_at = uploaded_at WHERE uploaded_at IS NOT NULL')
+    op.create_index('ix_file_assets_updated_at', 'file_assets', ['updated_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_file_assets_updated_at', 'file_assets')
+    op.drop_column('file_assets', 'updated_at')
@@ -0,0 +1,36 @@
+"""Add columns for metadata derived from file sources
+
+Revision ID: c4e8f1b2a6d9
+Revises: b1c7e2a9d3f4
+Create Date: 2026-10-17 10:12:53.904117
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8f1b2a6d9'
+down_revision: Union[str, None] = 'b1c7e2a9d3f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled at write time; existing rows are populated by scripts/backfill_file_metadata.py
+    op.add_column('files', sa.Column('derived_title', sa.String(), nullable=True))
+    op.add_column('files', sa.Column('derived_abstract', sa.Text(), nullable=True))
+    op.add_column('files', sa.Column('outline', sa.Text(), nullable=True))
+    op.add_column('files', sa.Column('derived_source_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('files', 'derived_source_hash')
+    op.drop_column('files', 'outline')
+    op.drop_column('files', 'derived_abstract')
+    op.drop_column('files', 'derived_title')
@@ -0,0 +1,44 @@
+"""Add indexes backing keyset pagination of file listings
+
+Revision ID: d2a5c7e9f0b1
+Revises: c4e8f1b2a6d9
+Create Date: 2026-10-17 11:02:37.461925
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a5c7e9f0b1'
+down_revision: Union[str, None] = 'c4e8f1b2a6d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Listings page through live files ordered by (last_edited_at, id), optionally per owner
+    op.create_index(
+        'ix_files_owner_live_last_edited',
+        'files',
+        ['owner_id', 'last_edited_at', 'id'],
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index(
+        'ix_files_live_last_edited',
+        'files',
+        ['last_edited_at', 'id'],
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index('ix_file_tags_tag_id_file_id', 'file_tags', ['tag_id', 'file_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_file_tags_tag_id_file_id', 'file_tags')
+    op.drop_index('ix_files_live_last_edited', 'files')
+    op.drop_index('ix_files_owner_live_last_edited', 'files')
@@ -0,0 +1,82 @@
+"""Store file asset and profile picture content as raw bytes
+
+Revision ID: e7b3d1f5a2c8
+Revises: d2a5c7e9f0b1
+Create Date: 2026-10-17 15:41:07.218934
+
+"""
+import base64
+import binascii
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3d1f5a2c8'
+down_revision: Union[str, None] = 'd2a5c7e9f0b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('file_assets', 'profile_pictures')
+BATCH_SIZE = 100
+
+
+def _decode(content: str) -> bytes:
+    # Content was meant to be base64; plain text assets are kept as UTF-8
+    try:
+        return base64.b64decode(''.join(content.split()), validate=True)
+    except binascii.Error:
+        return content.encode('utf-8')
+
+
+def _encode(content: bytes) -> str:
+    return base64.b64encode(content).decode('ascii')
+
+
+def _convert(table_name: str, source_type, target_type, convert) -> None:
+    """Rewrite ``content`` through a temporary column of the target type."""
+    op.add_column(table_name, sa.Column('content_new', target_type, nullable=True))
+
+    conn = op.get_bind()
+    table = sa.table(
+        table_name,
+        sa.column('id', sa.Integer),
+        sa.column('content', source_type),
+        sa.column('content_new', target_type),
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(table.c.id, table.c.content)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            conn.execute(
+                table.update().where(table.c.id == row.id).values(content_new=convert(row.content))
+            )
+        last_id = rows[-1].id
+
+    with op.batch_alter_table(table_name) as batch_op:
+        batch_op.drop_column('content')
+        batch_op.alter_column(
+            'content_new', new_column_name='content', existing_type=target_type, nullable=False
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name in TABLES:
+        _convert(table_name, sa.Text(), sa.LargeBinary(), _decode)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name in TABLES:
+        _convert(table_name, sa.LargeBinary(), sa.Text(), _encode)
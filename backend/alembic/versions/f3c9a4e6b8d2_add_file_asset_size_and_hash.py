@@ -0,0 +1,65 @@
+"""Add size and content hash to file assets
+
+Revision ID: f3c9a4e6b8d2
+Revises: e7b3d1f5a2c8
+Create Date: 2026-10-17 17:05:32.641870
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c9a4e6b8d2'
+down_revision: Union[str, None] = 'e7b3d1f5a2c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 100
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('file_assets', sa.Column('size', sa.Integer(), nullable=True))
+    op.add_column('file_assets', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    conn = op.get_bind()
+    assets = sa.table(
+        'file_assets',
+        sa.column('id', sa.Integer),
+        sa.column('content', sa.LargeBinary),
+        sa.column('size', sa.Integer),
+        sa.column('content_hash', sa.String),
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(assets.c.id, assets.c.content)
+            .where(assets.c.id > last_id)
+            .order_by(assets.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            conn.execute(
+                assets.update()
+                .where(assets.c.id == row.id)
+                .values(size=len(row.content), content_hash=hashlib.sha256(row.content).hexdigest())
+            )
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('file_assets') as batch_op:
+        batch_op.alter_column('size', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('content_hash', existing_type=sa.String(length=64), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('file_assets') as batch_op:
+        batch_op.drop_column('content_hash')
+        batch_op.drop_column('size')
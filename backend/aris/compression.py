@@ -0,0 +1,302 @@
+"""HTTP response compression.
+
+Rendered HTML and JSON listings are large and highly compressible. This module
+provides an ASGI middleware compressing such responses on the fly, and a helper
+for routes whose bodies are cached, so that hot documents are compressed once
+at a high level and then served from the render cache.
+
+gzip is always available. Brotli and zstd are used when the optional ``brotli``
+and ``zstandard`` packages are installed.
+"""
+
+import asyncio
+import zlib
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Protocol, cast
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .services.render_cache import get_render_cache
+
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+COMPRESSIBLE_TYPES = frozenset(
+    {
+        "application/json",
+        "application/javascript",
+        "application/xml",
+        "application/x-ndjson",
+        "image/svg+xml",
+    }
+)
+
+# Levels for responses compressed per request, and for variants compressed once and cached
+DYNAMIC_LEVELS = {"br": 4, "zstd": 3, "gzip": 6}
+CACHED_LEVELS = {"br": 9, "zstd": 12, "gzip": 9}
+
+
+class _Stream(Protocol):
+    """Incremental compressor for one response body."""
+
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return cast(bytes, self._compressor.process(data))
+
+    def flush(self) -> bytes:
+        return cast(bytes, self._compressor.flush())
+
+    def finish(self) -> bytes:
+        return cast(bytes, self._compressor.finish())
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return cast(bytes, self._compressor.compress(data))
+
+    def flush(self) -> bytes:
+        return cast(bytes, self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK))
+
+    def finish(self) -> bytes:
+        return cast(bytes, self._compressor.flush())
+
+
+_STREAMS: Dict[str, Callable[[int], _Stream]] = {
+    "br": _BrotliStream,
+    "zstd": _ZstdStream,
+    "gzip": _GzipStream,
+}
+
+
+def available_encodings() -> list[str]:
+    """Return the configured encodings whose libraries are installed, in preference order."""
+    installed = {"br": brotli is not None, "zstd": zstandard is not None, "gzip": True}
+    configured = [e.strip() for e in settings.COMPRESSION_ENCODINGS.split(",") if e.strip()]
+    return [e for e in configured if installed.get(e, False)]
+
+
+def negotiate(accept_encoding: str, encodings: Iterable[str]) -> Optional[str]:
+    """Pick the encoding to use for a request.
+
+    Args:
+        accept_encoding: The request's Accept-Encoding header.
+        encodings: Supported encodings, most preferred first.
+
+    Returns:
+        The acceptable encoding with the highest q-value, ties going to the
+        server's preference, or None to send the body as is.
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress a whole body with ``encoding``, at its cached-variant level by default."""
+    stream = _STREAMS[encoding](CACHED_LEVELS[encoding] if level is None else level)
+    return stream.compress(data) + stream.finish()
+
+
+def is_compressible(headers: Headers) -> bool:
+    """Whether a response with these headers is text worth compressing."""
+    if "content-encoding" in headers or "content-range" in headers:
+        return False
+    if "no-transform" in headers.get("cache-control", ""):
+        return False
+    media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+def _set_encoding_headers(headers: MutableHeaders, encoding: str) -> None:
+    headers["Content-Encoding"] = encoding
+    headers.add_vary_header("Accept-Encoding")
+    # The compressed body differs byte-wise from the one the strong tag identifies
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+async def cached_compressed_response(
+    request,
+    key: str,
+    body: Callable[[], Awaitable[str]],
+    media_type: str,
+    headers: Dict[str, str],
+) -> Response:
+    """Serve a text body, reusing a compressed variant stored in the render cache.
+
+    Args:
+        request: The incoming request, read for Accept-Encoding.
+        key: Identifies the body exactly, e.g. its render cache key or strong ETag.
+        body: Produces the uncompressed body; not called on a cache hit.
+        media_type: Content-Type of the body.
+        headers: Headers to send with the response.
+
+    Returns:
+        A response whose body is compressed with the negotiated encoding, or the
+        plain body if compression does not apply. Plain bodies may still be
+        compressed per request by :class:`CompressionMiddleware`.
+    """
+    encoding = negotiate(request.headers.get("accept-encoding", ""), available_encodings())
+    cache = get_render_cache()
+    if encoding is None or cache is None:
+        return Response(await body(), media_type=media_type, headers=headers)
+
+    compressed = cache.get_compressed(key, encoding)
+    if compressed is None:
+        text = await body()
+        minimum = settings.COMPRESSION_MINIMUM_SIZE
+        # A character takes at least one byte, so only short texts need encoding to be measured
+        if len(text) < minimum and len(text.encode("utf-8")) < minimum:
+            return Response(text, media_type=media_type, headers=headers)
+        compressed = await asyncio.to_thread(compress, text.encode("utf-8"), encoding)
+        cache.set_compressed(key, encoding, compressed)
+
+    response = Response(compressed, media_type=media_type, headers=headers)
+    _set_encoding_headers(response.headers, encoding)
+    return response
+
+class CompressionMiddleware:
+    """Compress text responses with the best encoding the client accepts.
+
+    Responses are left alone when they are already encoded, partial, marked
+    ``no-transform``, not text, or smaller than ``minimum_size``. Streaming
+    responses are compressed chunk by chunk and flushed after every chunk, so
+    clients receive content as soon as the application produces it.
+
+    Args:
+        app: The ASGI application to wrap.
+        minimum_size: Smallest body in bytes worth compressing.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        encoding = negotiate(headers.get("accept-encoding", ""), self.encodings)
+        if encoding is None or "range" in headers:
+            await self.app(scope, receive, send)
+            return
+        await _CompressingResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class _CompressingResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.stream: Optional[_Stream] = None
+        self.send: Send
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self._begin(start, body, more_body)
+            return
+        if self.stream is None:
+            await self.send(message)
+            return
+        data = self.stream.compress(body) + (self.stream.flush() if more_body else self.stream.finish())
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    async def _begin(self, start: Message, body: bytes, more_body: bool) -> None:
+        """Decide from the first body chunk whether to compress, then send it."""
+        headers = MutableHeaders(raw=start["headers"])
+        declared = headers.get("content-length", "")
+        if declared.isdigit():
+            size: Optional[int] = int(declared)
+        else:
+            size = None if more_body else len(body)
+        if (
+            not 200 <= start["status"] < 300
+            or start["status"] in (204, 206)
+            or not is_compressible(headers)
+            or (size is not None and size < self.minimum_size)
+        ):
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        self.stream = _STREAMS[self.encoding](DYNAMIC_LEVELS[self.encoding])
+        _set_encoding_headers(headers, self.encoding)
+        if not more_body:
+            data = self.stream.compress(body) + self.stream.finish()
+            headers["Content-Length"] = str(len(data))
+        else:
+            del headers["Content-Length"]
+            data = self.stream.compress(body) + self.stream.flush()
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -71,6 +71,91 @@ class Settings(BaseSettings):
     COPILOT_PROVIDER: str = Field("anthropic", json_schema_extra={"env": "COPILOT_PROVIDER"})
     """AI provider for copilot functionality (anthropic, openai, etc.)."""
 
+    RENDER_ENGINE: str = Field("process", json_schema_extra={"env": "RENDER_ENGINE"})
+    """Where RSM rendering runs: 'process' (worker processes) or 'thread' (in-process)."""
+
+    RENDER_WORKERS: int = Field(0, json_schema_extra={"env": "RENDER_WORKERS"})
+    """Number of render workers. 0 uses the CPU count, capped at 4."""
+
+    RENDER_MAX_QUEUE: int = Field(64, json_schema_extra={"env": "RENDER_MAX_QUEUE"})
+    """Renders allowed to wait for a free worker before new ones are rejected."""
+
+    RENDER_TIMEOUT_SECONDS: float = Field(
+        120.0, json_schema_extra={"env": "RENDER_TIMEOUT_SECONDS"}
+    )
+    """Maximum time in seconds a single render may take before it is abandoned."""
+
+    RENDER_MAX_TASKS_PER_WORKER: int = Field(
+        500, json_schema_extra={"env": "RENDER_MAX_TASKS_PER_WORKER"}
+    )
+    """Renders a worker process handles before it is replaced (0 disables recycling)."""
+
+    RENDER_MAX_SOURCE_BYTES: int = Field(
+        2_000_000, json_schema_extra={"env": "RENDER_MAX_SOURCE_BYTES"}
+    )
+    """Largest RSM source accepted for rendering, in bytes (0 disables the limit)."""
+
+    RENDER_CACHE_MAX_BYTES: int = Field(
+        64_000_000, json_schema_extra={"env": "RENDER_CACHE_MAX_BYTES"}
+    )
+    """Size of the in-memory render cache in bytes (0 disables render caching)."""
+
+    RENDER_CACHE_PATH: str = Field("", json_schema_extra={"env": "RENDER_CACHE_PATH"})
+    """SQLite file for the render cache shared by all workers on a host (empty disables it)."""
+
+    RENDER_CACHE_DISK_MAX_BYTES: int = Field(
+        512_000_000, json_schema_extra={"env": "RENDER_CACHE_DISK_MAX_BYTES"}
+    )
+    """Approximate size budget of the on-disk render cache, in compressed bytes."""
+
+    RENDER_INCREMENTAL: bool = Field(True, json_schema_extra={"env": "RENDER_INCREMENTAL"})
+    """Reuse the HTML of unchanged top-level blocks when an edited document is re-rendered."""
+
+    ASSET_CACHE_MAX_BYTES: int = Field(
+        32_000_000, json_schema_extra={"env": "ASSET_CACHE_MAX_BYTES"}
+    )
+    """Size of the in-memory cache of decoded file assets in bytes (0 disables it)."""
+
+    COMPRESSION_ENCODINGS: str = Field(
+        "br,zstd,gzip", json_schema_extra={"env": "COMPRESSION_ENCODINGS"}
+    )
+    """Response encodings by preference; br and zstd need optional packages (empty disables)."""
+
+    COMPRESSION_MINIMUM_SIZE: int = Field(
+        1024, json_schema_extra={"env": "COMPRESSION_MINIMUM_SIZE"}
+    )
+    """Smallest response body in bytes that is compressed."""
+
+    FILE_WRITE_BEHIND: bool = Field(False, json_schema_extra={"env": "FILE_WRITE_BEHIND"})
+    """Write file edits to the database from a background task instead of on the request path."""
+
+    FILE_WRITE_BEHIND_INTERVAL_SECONDS: float = Field(
+        2.0, json_schema_extra={"env": "FILE_WRITE_BEHIND_INTERVAL_SECONDS"}
+    )
+    """Longest time in seconds an edit waits in memory before it is written."""
+
+    FILE_WRITE_BEHIND_MAX_DIRTY: int = Field(
+        100, json_schema_extra={"env": "FILE_WRITE_BEHIND_MAX_DIRTY"}
+    )
+    """Edited files waiting to be written that trigger a write before the interval ends."""
+
+    FILE_INVALIDATION_BUS: str = Field("", json_schema_extra={"env": "FILE_INVALIDATION_BUS"})
+    """How workers announce file writes to each other: "postgres" (LISTEN/NOTIFY), "local" (one process), or empty to read the change feed on every sync."""
+
+    FILE_INVALIDATION_DSN: str = Field("", json_schema_extra={"env": "FILE_INVALIDATION_DSN"})
+    """Direct PostgreSQL connection for invalidations, not through a transaction pooler; empty uses the database URL."""
+
+    PRINCIPAL_CACHE_TTL_SECONDS: float = Field(
+        30.0, json_schema_extra={"env": "PRINCIPAL_CACHE_TTL_SECONDS"}
+    )
+    """Seconds an authenticated user is served from memory (0 looks it up on every request)."""
+
+    PASSWORD_HASH_WORKERS: int = Field(0, json_schema_extra={"env": "PASSWORD_HASH_WORKERS"})
+    """Threads running bcrypt. 0 uses the CPU count, capped at 2."""
+
+    PASSWORD_HASH_MAX_QUEUE: int = Field(32, json_schema_extra={"env": "PASSWORD_HASH_MAX_QUEUE"})
+    """Password operations allowed to wait for a free thread before new ones are rejected."""
+
     model_config = SettingsConfigDict(extra="forbid", env_file=".env")
 
     def get_test_database_url(self) -> str:
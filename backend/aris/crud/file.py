@@ -2,12 +2,13 @@ import asyncio
 from datetime import UTC, datetime
 from typing import Any, Optional
 
-import rsm
 from sqlalchemy import select
 from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import File, FileStatus, file_tags
+from ..services.file_metadata import refresh_file_metadata
+from ..services.render_engine import get_render_engine
 from .utils import extract_section, extract_title
 
 
@@ -81,7 +82,7 @@ async def get_file_html(file_id: int, db: AsyncSession):
 
     Notes
     -----
-    Uses the rsm.render() function with handrails=True for enhanced navigation.
+    Renders on the render engine with handrails=True for enhanced navigation.
     Only retrieves the source field from the database for efficiency.
     """
     result: Result[Any] = await db.execute(
@@ -91,7 +92,7 @@ async def get_file_html(file_id: int, db: AsyncSession):
     if not source:
         return None
 
-    return rsm.render(source, handrails=True)
+    return await get_render_engine().render(source, handrails=True)
 
 
 async def create_file(
@@ -124,7 +125,8 @@ async def create_file(
     Notes
     -----
     Sets status to DRAFT by default and timestamps created_at and last_edited_at
-    to current UTC time. Commits the transaction and refreshes the object.
+    to current UTC time. Extracts the derived metadata columns from the source.
+    Commits the transaction and refreshes the object.
     """
     file = File(
         title=title,
@@ -139,6 +141,7 @@ async def create_file(
     now = datetime.now(UTC)
     file.created_at = now
     file.last_edited_at = now
+    await refresh_file_metadata(file)
     db.add(file)
     await db.commit()
     await db.refresh(file)
@@ -171,8 +174,9 @@ async def update_file(
 
     Notes
     -----
-    Updates last_edited_at to current UTC time. Commits the transaction
-    and refreshes the object before returning.
+    Updates last_edited_at to current UTC time and re-extracts the derived
+    metadata columns if the source changed. Commits the transaction and
+    refreshes the object before returning.
     """
     file = await get_file(file_id, db)
     if not file:
@@ -181,6 +185,7 @@ async def update_file(
     file.title = title
     file.source = source
     file.last_edited_at = datetime.now(UTC)
+    await refresh_file_metadata(file)
     await db.commit()
     await db.refresh(file)
     return file
@@ -248,6 +253,10 @@ async def duplicate_file(file_id: int, db: AsyncSession):
         source=original.source,
         owner_id=original.owner_id,
         last_edited_at=datetime.now(UTC),
+        derived_title=original.derived_title,
+        derived_abstract=original.derived_abstract,
+        outline=original.outline,
+        derived_source_hash=original.derived_source_hash,
     )
     db.add(new_file)
     await db.flush()
@@ -1,12 +1,13 @@
 import base64
 import binascii
 from datetime import UTC, datetime
-from typing import Any, List, Optional
+from typing import Any, List, Literal, Optional
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, field_validator, model_validator
 from sqlalchemy import select
 from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
 from ..logging_config import get_logger
 from ..models import FileAsset
@@ -15,27 +16,70 @@ from ..models import FileAsset
 logger = get_logger(__name__)
 
 
+# How asset content is encoded in request payloads
+ContentEncoding = Literal["base64", "utf-8"]
+
+
+def decode_asset_content(content: str, encoding: ContentEncoding = "base64") -> bytes:
+    """Convert asset content from the API's wire format to the stored bytes.
+
+    Clients send asset content base64-encoded, unless the payload says it holds
+    plain text with ``content_encoding="utf-8"``. The content itself is never
+    used to guess, so text that happens to be valid base64 is not decoded.
+
+    Parameters
+    ----------
+    content : str
+        Content as received in a request payload.
+    encoding : {"base64", "utf-8"}, optional
+        The payload's ``content_encoding`` (default: "base64").
+
+    Returns
+    -------
+    bytes
+        Raw asset bytes.
+
+    Raises
+    ------
+    binascii.Error
+        If ``encoding`` is "base64" and the content is not valid base64.
+    """
+    if encoding == "utf-8":
+        return content.encode("utf-8")
+    return base64.b64decode("".join(content.split()), validate=True)
+
+
+def _check_content(content: Optional[str], encoding: ContentEncoding) -> None:
+    if content is None:
+        return
+    try:
+        decode_asset_content(content, encoding)
+    except binascii.Error:
+        raise ValueError("Invalid base64-encoded string")
+
+
+def encode_asset_content(content: bytes) -> str:
+    """Convert stored asset bytes to the base64 wire format."""
+    return base64.b64encode(content).decode("ascii")
+
+
 class FileAssetCreate(BaseModel):
     filename: str
     mime_type: str
     content: str
     file_id: int
+    content_encoding: ContentEncoding = "base64"
 
-    @field_validator("content")
-    @classmethod
-    def validate_content(cls, v, info):
-        mime = info.data.get("mime_type", "") if info.data else ""
-        if mime.startswith("image/"):
-            try:
-                base64.b64decode(v)
-            except (TypeError, binascii.Error):
-                raise ValueError("Invalid base64-encoded string")
-        return v
+    @model_validator(mode="after")
+    def validate_content(self):
+        _check_content(self.content, self.content_encoding)
+        return self
 
 
 class FileAssetUpdate(BaseModel):
     filename: str | None = None
     content: str | None = None
+    content_encoding: ContentEncoding = "base64"
     deleted_at: datetime | None = None
 
     @classmethod
@@ -48,33 +92,44 @@ class FileAssetUpdate(BaseModel):
             logger.warning("Content is not base64 decodable")
         return v
 
-    @field_validator("content")
-    @classmethod
-    def validate_content_strict(cls, v):
-        if v is None:
-            return v
-        try:
-            base64.b64decode(v)
-        except (TypeError, binascii.Error):
-            raise ValueError("Invalid base64-encoded string")
-        return v
+    @model_validator(mode="after")
+    def validate_content_strict(self):
+        _check_content(self.content, self.content_encoding)
+        return self
 
 
-class FileAssetOut(BaseModel):
+class FileAssetMetaOut(BaseModel):
     id: int
     filename: str
     mime_type: str
-    content: str
+    size: int
+    content_hash: str
     uploaded_at: datetime
     deleted_at: datetime | None
     file_id: int
 
 
+class FileAssetOut(FileAssetMetaOut):
+    content: str
+
+    @field_validator("content", mode="before")
+    @classmethod
+    def encode_content(cls, v):
+        return encode_asset_content(v) if isinstance(v, bytes) else v
+
+
 class FileAssetDB:
     @staticmethod
-    async def get_user_asset(asset_id: int, user_id: int, db: AsyncSession) -> Optional[FileAsset]:
-        """Get a user's asset by ID, excluding soft-deleted assets"""
-        asset = await db.get(FileAsset, asset_id)
+    async def get_user_asset(
+        asset_id: int, user_id: int, db: AsyncSession, with_content: bool = True
+    ) -> Optional[FileAsset]:
+        """Get a user's asset by ID, excluding soft-deleted assets.
+
+        With ``with_content=False`` the content is deferred until loaded with
+        ``await db.refresh(asset, ["content"])``.
+        """
+        options = [] if with_content else [defer(FileAsset.content)]
+        asset = await db.get(FileAsset, asset_id, options=options)
         if not asset or asset.owner_id != user_id or asset.deleted_at is not None:
             return None
         return asset
@@ -85,7 +140,7 @@ class FileAssetDB:
         new_asset = FileAsset(
             filename=payload.filename,
             mime_type=payload.mime_type,
-            content=payload.content,
+            content=decode_asset_content(payload.content, payload.content_encoding),
             file_id=payload.file_id,
             owner_id=user_id,
         )
@@ -95,11 +150,21 @@ class FileAssetDB:
         return new_asset
 
     @staticmethod
-    async def list_user_assets(user_id: int, db: AsyncSession) -> List[FileAsset]:
-        """List all non-deleted assets for a user"""
-        result: Result[Any] = await db.execute(
-            select(FileAsset).where(FileAsset.owner_id == user_id, FileAsset.deleted_at.is_(None))
+    async def list_user_assets(
+        user_id: int, db: AsyncSession, file_id: Optional[int] = None
+    ) -> List[FileAsset]:
+        """List all non-deleted assets for a user, optionally of one file.
+
+        Only metadata is loaded; accessing ``content`` on the result raises.
+        """
+        query = (
+            select(FileAsset)
+            .options(defer(FileAsset.content, raiseload=True))
+            .where(FileAsset.owner_id == user_id, FileAsset.deleted_at.is_(None))
         )
+        if file_id is not None:
+            query = query.where(FileAsset.file_id == file_id)
+        result: Result[Any] = await db.execute(query)
         return list(result.scalars().all())
 
     @staticmethod
@@ -110,7 +175,7 @@ class FileAssetDB:
         if payload.filename is not None:
             asset.filename = payload.filename
         if payload.content is not None:
-            asset.content = payload.content
+            asset.content = decode_asset_content(payload.content, payload.content_encoding)
         if payload.deleted_at is not None:
             asset.deleted_at = payload.deleted_at
         await db.commit()
@@ -0,0 +1,98 @@
+"""Keyset pagination and field selection helpers for file listings.
+
+Listings are ordered by ``(last_edited_at, id)`` descending. A page ends with an
+opaque cursor encoding the sort key of its last row, and the next page starts
+strictly after it. Unlike offsets, fetching a page then costs the same no matter
+how deep into the listing it is, and rows edited between two requests cannot
+make the listing skip or repeat entries behind the cursor.
+"""
+
+import base64
+import json
+from datetime import UTC, datetime
+from typing import Iterable, Optional, Set, Tuple
+
+
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+Cursor = Tuple[datetime, int]
+
+
+def _as_utc(timestamp: datetime) -> datetime:
+    # SQLite returns naive datetimes; everything is stored as UTC
+    return timestamp if timestamp.tzinfo is not None else timestamp.replace(tzinfo=UTC)
+
+
+def encode_cursor(last_edited_at: datetime, file_id: int) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor.
+
+    Parameters
+    ----------
+    last_edited_at : datetime
+        Last edit timestamp of the row.
+    file_id : int
+        ID of the row.
+
+    Returns
+    -------
+    str
+        URL-safe cursor string.
+    """
+    payload = json.dumps([_as_utc(last_edited_at).isoformat(), file_id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Decode a cursor produced by :func:`encode_cursor`.
+
+    Parameters
+    ----------
+    cursor : str
+        Cursor string from a previous page.
+
+    Returns
+    -------
+    tuple of (datetime, int)
+        The sort key after which the next page starts.
+
+    Raises
+    ------
+    ValueError
+        If the cursor is malformed.
+    """
+    try:
+        timestamp, file_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return _as_utc(datetime.fromisoformat(timestamp)), int(file_id)
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[Set[str]]:
+    """Parse a comma-separated ``fields`` query parameter.
+
+    Parameters
+    ----------
+    fields : str or None
+        The raw parameter, e.g. ``"id,title,last_edited_at"``.
+    allowed : iterable of str
+        Field names the listing can return.
+
+    Returns
+    -------
+    set of str or None
+        The requested fields, always including ``id``, or None to return all.
+
+    Raises
+    ------
+    ValueError
+        If an unknown field is requested.
+    """
+    if fields is None:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested | {"id"}
+
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..logging_config import get_logger
 from ..services.asset_resolver import FileAssetResolver
+from ..services.render_engine import get_render_engine
 
 
 logger = get_logger(__name__)
@@ -16,7 +17,7 @@ async def render(src: str):
     start_time = time.time()
     
     try:
-        result = rsm.render(src, handrails=True)
+        result = await get_render_engine().render(src, handrails=True)
         render_time = time.time() - start_time
         logger.debug(f"RSM render completed successfully in {render_time:.3f}s")
     except rsm.RSMApplicationError as e:
@@ -33,9 +34,9 @@ async def render_with_assets(src: str, file_id: int, db: AsyncSession, user_id:
     
     try:
         # Create asset resolver for this file with pre-loaded assets
-        asset_resolver = await FileAssetResolver.create_for_file(file_id, db)
+        asset_resolver = await FileAssetResolver.create_for_file(file_id, db, source=src)
         
-        result = rsm.render(src, handrails=True, asset_resolver=asset_resolver)
+        result = await get_render_engine().render(src, handrails=True, asset_resolver=asset_resolver)
         render_time = time.time() - start_time
         logger.debug(f"RSM render with assets completed successfully in {render_time:.3f}s")
     except rsm.RSMApplicationError as e:
@@ -214,7 +214,7 @@ async def email_exists(email: str, db: AsyncSession) -> bool:
     bool
         True if email exists, False otherwise.
     """
-    result = await db.execute(
+    result: Result = await db.execute(
         select(Signup.id).where(Signup.email == email).limit(1)
     )
     return result.scalars().first() is not None
@@ -1,6 +1,7 @@
 import itertools
+from collections import defaultdict
 from datetime import UTC, datetime
-from typing import Any
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy import delete, insert, select
 from sqlalchemy.engine import Result
@@ -106,6 +107,35 @@ async def get_user_file_tags(user_id: int, doc_id: int, db: AsyncSession):
     return result.scalars().all()
 
 
+async def get_user_files_tags(
+    user_id: int, db: AsyncSession, file_ids: Optional[List[int]] = None
+) -> Dict[int, List[Tag]]:
+    """Get the tags of all of a user's files, or of ``file_ids`` only, in a single query.
+
+    Returns a mapping from file id to its tags, ordered like get_user_file_tags.
+    Files without tags are absent from the mapping.
+    """
+    query = (
+        select(file_tags.c.file_id, Tag)
+        .join(Tag, Tag.id == file_tags.c.tag_id)
+        .join(File, File.id == file_tags.c.file_id)
+        .where(
+            File.owner_id == user_id,
+            File.deleted_at.is_(None),
+            Tag.user_id == user_id,
+            Tag.deleted_at.is_(None),
+        )
+        .order_by(Tag.created_at.asc(), Tag.name.asc())
+    )
+    if file_ids is not None:
+        query = query.where(file_tags.c.file_id.in_(file_ids))
+    result: Result[Any] = await db.execute(query)
+    tags: Dict[int, List[Tag]] = defaultdict(list)
+    for file_id, tag in result.all():
+        tags[file_id].append(tag)
+    return dict(tags)
+
+
 async def add_tag_to_file(user_id: int, file_id: int, tag_id: str, db: AsyncSession):
     file = await db.get(File, file_id)
     if not file or file.owner_id != user_id:
@@ -1,14 +1,17 @@
 import asyncio
 from datetime import UTC, datetime
-from typing import Any
+from typing import Any, Optional, Set
 
-from sqlalchemy import asc, desc, select
+from sqlalchemy import desc, select, tuple_
 from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
-from ..models import File, FileSettings, User
+from ..models import File, FileSettings, FileStatus, User, file_tags
+from ..services.principal_cache import invalidate_principal
 from .file import get_file, get_file_section
-from .tag import get_user_file_tags
+from .pagination import decode_cursor, encode_cursor
+from .tag import get_user_file_tags, get_user_files_tags
 from .utils import extract_title
 
 
@@ -106,7 +109,8 @@ async def update_user(user_id: int, name: str, initials: str, email: str, db: As
     Notes
     -----
     Only updates fields that have changed from their current values.
-    Commits the transaction and refreshes the user object before returning.
+    Commits the transaction, drops the user from the principal cache and
+    refreshes the user object before returning.
     """
     user = await get_user(user_id, db)
     if not user:
@@ -118,6 +122,7 @@ async def update_user(user_id: int, name: str, initials: str, email: str, db: As
     if email != user.email:
         user.email = email
     await db.commit()
+    invalidate_principal(user_id)
     await db.refresh(user)
     return user
 
@@ -147,9 +152,50 @@ async def soft_delete_user(user_id: int, db: AsyncSession):
         return None
     user.deleted_at = datetime.now(UTC)
     await db.commit()
+    invalidate_principal(user_id)
     return user
 
 
+USER_FILE_FIELDS = ("id", "title", "source", "last_edited_at", "tags")
+
+# Columns each listed field needs; titles only read the source of rows without derived metadata
+_FIELD_COLUMNS = {
+    "title": (File.title, File.derived_title, File.derived_source_hash),
+    "source": (File.source,),
+}
+
+
+async def _listed_titles(docs, source_loaded: bool, db: AsyncSession) -> dict[Any, str]:
+    """Return the titles of listed files by ID.
+
+    Writers keep the derived title current with the source, so it is trusted
+    whenever a row has one. Only rows without derived metadata are parsed, and
+    unless ``source_loaded``, their sources are loaded in one extra query.
+    """
+    titles: dict[Any, str] = {}
+    unparsed = []
+    for doc in docs:
+        if doc.title is not None:
+            titles[doc.id] = str(doc.title)
+        elif doc.derived_source_hash is not None:
+            titles[doc.id] = str(doc.derived_title or "")
+        else:
+            unparsed.append(doc)
+    if not unparsed:
+        return titles
+
+    if not source_loaded:
+        # Fills in the source of the instances already in the session
+        await db.execute(
+            select(File)
+            .options(load_only(File.id, File.source))
+            .where(File.id.in_([doc.id for doc in unparsed]))
+        )
+    parsed = await asyncio.gather(*(extract_title(doc) for doc in unparsed))
+    titles.update(zip((doc.id for doc in unparsed), parsed))
+    return titles
+
+
 async def get_user_files(user_id: int, with_tags: bool, db: AsyncSession):
     """Retrieve all files owned by a user with optional tag information.
 
@@ -175,39 +221,117 @@ async def get_user_files(user_id: int, with_tags: bool, db: AsyncSession):
 
     Notes
     -----
-    Files are ordered by last edited date (descending) then by source content.
-    Titles are extracted asynchronously from RSM content using extract_title.
-    Tags are fetched concurrently if requested to optimize performance.
+    Returns every file at once; see get_user_files_page for a paginated listing.
+    """
+    files, _ = await get_user_files_page(user_id, with_tags, db)
+    return files
+
+
+async def get_user_files_page(
+    user_id: int,
+    with_tags: bool,
+    db: AsyncSession,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Set[str]] = None,
+    status: Optional[FileStatus] = None,
+    tag_id: Optional[int] = None,
+):
+    """Retrieve one page of the files owned by a user.
+
+    Parameters
+    ----------
+    user_id : int
+        The unique identifier of the user whose files to retrieve.
+    with_tags : bool
+        Whether to include tag information for each file.
+    db : AsyncSession
+        SQLAlchemy async database session.
+    limit : int, optional
+        Maximum number of files to return. All files are returned if None.
+    cursor : str, optional
+        Cursor returned with the previous page.
+    fields : set of str, optional
+        Subset of USER_FILE_FIELDS to return. All fields are returned if None.
+    status : FileStatus, optional
+        Only return files with this status.
+    tag_id : int, optional
+        Only return files carrying this tag.
+
+    Returns
+    -------
+    tuple of (list of dict, str or None)
+        The file dictionaries and the cursor of the next page, or None if this
+        is the last page.
+
+    Raises
+    ------
+    ValueError
+        If the user is not found or the cursor is malformed.
+
+    Notes
+    -----
+    Files are ordered by last edited date (descending) then by ID (descending),
+    matching the ix_files_owner_live_last_edited index so that each page costs
+    O(limit) regardless of its position. Only the columns backing the requested
+    fields are loaded; in particular, the source is not read unless it is
+    requested, or a requested title has no derived metadata to read it from. Tags
+    are fetched in a single query.
     """
     user = await get_user(user_id, db)
     if not user:
         raise ValueError(f"User {user_id} not found")
 
-    result: Result[Any] = await db.execute(
+    fields = set(USER_FILE_FIELDS) if fields is None else fields
+    columns = [File.id, File.last_edited_at]
+    for field in fields:
+        columns.extend(_FIELD_COLUMNS.get(field, ()))
+
+    query = (
         select(File)
+        .options(load_only(*columns))
         .where(File.owner_id == user_id, File.deleted_at.is_(None))
-        .order_by(desc(File.last_edited_at), asc(File.source))
+        .order_by(desc(File.last_edited_at), desc(File.id))
     )
+    if status is not None:
+        query = query.where(File.status == status)
+    if tag_id is not None:
+        query = query.where(
+            File.id.in_(select(file_tags.c.file_id).where(file_tags.c.tag_id == tag_id))
+        )
+    if cursor is not None:
+        query = query.where(tuple_(File.last_edited_at, File.id) < decode_cursor(cursor))
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    result: Result[Any] = await db.execute(query)
     docs = result.scalars().all()
+    next_cursor = None
+    if limit is not None and len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1].last_edited_at, docs[-1].id)
 
-    titles_list = await asyncio.gather(*(extract_title(d) for d in docs))
-    titles = dict(zip(docs, titles_list))
+    titles: dict[Any, str] = {}
+    if "title" in fields:
+        titles = await _listed_titles(docs, "source" in fields, db)
 
     tags: dict[Any, Any] = {}
-    if with_tags:
-        tags_list = await asyncio.gather(*(get_user_file_tags(user_id, d.id, db) for d in docs))
-        tags = dict(zip(docs, tags_list))
-
-    return [
-        {
+    if with_tags and "tags" in fields and docs:
+        # A full listing loads the whole library's tags; a page only its own
+        file_ids = [d.id for d in docs] if limit is not None else None
+        tags = await get_user_files_tags(user_id, db, file_ids)
+
+    files = []
+    for doc in docs:
+        values = {
             "id": doc.id,
-            "title": titles[doc],
-            "source": doc.source,
+            "title": titles.get(doc.id),
+            "source": doc.source if "source" in fields else None,
             "last_edited_at": doc.last_edited_at,
-            "tags": tags.get(doc, []),
+            "tags": tags.get(doc.id, []),
         }
-        for doc in docs
-    ]
+        files.append({field: value for field, value in values.items() if field in fields})
+    return files, next_cursor
 
 
 async def get_user_file(
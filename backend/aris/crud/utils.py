@@ -1,9 +1,6 @@
-import asyncio
-
-import rsm
-from bs4 import BeautifulSoup
-
 from ..models import File
+from ..services.file_metadata import persisted_title
+from ..services.render_engine import get_render_engine
 
 
 async def extract_title(file: File) -> str:
@@ -12,21 +9,16 @@ async def extract_title(file: File) -> str:
     # Access the actual value, not the column definition
     if file.title is not None:
         return str(file.title)
+    title = persisted_title(file)
+    if title is not None:
+        return title
 
     source_content = str(file.source) if file.source is not None else ""
-    app = rsm.app.ParserApp(plain=source_content)
-    await asyncio.to_thread(app.run)
-    # Return the actual title string, not the column
-    return str(app.transformer.tree.title) if app.transformer.tree.title else ""
+    return await get_render_engine().parse_title(source_content)
 
 
 async def extract_section(file: File, section_name: str, handrails: bool = True) -> str:
     source_content = str(file.source) if file.source is not None else ""
-    app = rsm.app.ProcessorApp(plain=source_content, handrails=handrails)
-    await asyncio.to_thread(app.run)
-    html = app.translator.body
-
-    soup = BeautifulSoup(html, "lxml")
-    element = soup.find("div", class_=section_name)
-    # Return the string content of the element, or empty string if not found
-    return str(element) if element else ""
+    indexed = await get_render_engine().render_indexed(source_content, handrails=handrails)
+    # The markup of the first element with the class, or empty string if not found
+    return indexed.section(section_name)
@@ -18,7 +18,7 @@ from typing import AsyncGenerator, Optional
 from uuid import UUID
 
 from dotenv import load_dotenv
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import BaseModel, ConfigDict, EmailStr
@@ -27,6 +27,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from . import crud
 from .config import settings
 from .services.file_service import InMemoryFileService
+from .services.principal_cache import get_principal_cache
 
 
 load_dotenv()
@@ -76,12 +77,19 @@ class UserRead(BaseModel):
 
 
 async def current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
 ) -> UserRead:
     """Dependency that retrieves and validates the current authenticated user based on
     the provided OAuth2 Bearer token.
 
+    The user is resolved at most once per request, and served from the principal
+    cache when it was resolved recently. The returned user is a detached snapshot
+    of its columns; query the user to load relationships or to modify it.
+
     Args:
+        request (Request): The incoming request, which memoizes the resolved user.
         token (str): OAuth2 Bearer token extracted from the Authorization header.
         db (AsyncSession): SQLAlchemy database async session.
 
@@ -119,10 +127,19 @@ async def current_user(
     except ValueError:
         raise credentials_exception
 
-    user = await crud.get_user(user_id, db)
-    if user is None:
-        raise credentials_exception
-    return user  # type: ignore
+    principal = getattr(request.state, "principal", None)
+    if principal is not None and principal.id == user_id:
+        return principal  # type: ignore
+
+    cache = get_principal_cache()
+    principal = cache.get(user_id)
+    if principal is None:
+        user = await crud.get_user(user_id, db)
+        if user is None:
+            raise credentials_exception
+        principal = cache.set(user)
+    request.state.principal = principal
+    return principal  # type: ignore
 
 
 # Global singleton file service instance
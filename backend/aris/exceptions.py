@@ -2,6 +2,9 @@
 
 from fastapi import HTTPException, status
 
+from .security import PasswordHasherBusyError
+from .services.render_engine import RenderEngineError, RenderSourceTooLargeError
+
 
 def not_found_exception(resource: str, resource_id: int | None = None) -> HTTPException:
     """Create a standardized 404 Not Found exception.
@@ -91,3 +94,47 @@ def validation_exception(field: str, message: str) -> HTTPException:
     detail = f"Validation error for {field}: {message}"
     return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
 
+
+
+def render_unavailable_exception(error: RenderEngineError) -> HTTPException:
+    """Translate a render engine failure into an HTTP error.
+
+    Oversized sources are a client error (413). An engine that is saturated or timed
+    out is a temporary server condition (503) and carries a ``Retry-After`` header.
+
+    Parameters
+    ----------
+    error : RenderEngineError
+        The error raised by the render engine.
+
+    Returns
+    -------
+    HTTPException
+        A 413 or 503 exception with the engine's message.
+    """
+    if isinstance(error, RenderSourceTooLargeError):
+        return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(error))
+    headers = {"Retry-After": str(error.retry_after)} if error.retry_after is not None else None
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(error), headers=headers
+    )
+
+
+def password_hasher_busy_exception(error: PasswordHasherBusyError) -> HTTPException:
+    """Translate a full password hashing queue into a 503 with ``Retry-After``.
+
+    Parameters
+    ----------
+    error : PasswordHasherBusyError
+        The error raised by the password hasher.
+
+    Returns
+    -------
+    HTTPException
+        A 503 exception with the hasher's message.
+    """
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)},
+    )
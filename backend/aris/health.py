@@ -6,7 +6,7 @@ and non-critical system components.
 
 import time
 from datetime import UTC, datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from pydantic import BaseModel
 from sqlalchemy import text
@@ -108,12 +108,12 @@ async def check_rsm_rendering_health() -> Dict[str, Any]:
         Dictionary with RSM rendering health status
     """
     start_time = time.time()
-    try:
-        import rsm
+    from .services.render_engine import RenderQueueFullError, get_render_engine
 
+    try:
         # Test simple RSM rendering
         test_rsm = ":rsm:\nTest content\n::"
-        result = rsm.render(test_rsm, handrails=True)
+        result = await get_render_engine().render(test_rsm, handrails=True)
 
         response_time = round((time.time() - start_time) * 1000, 2)
 
@@ -132,6 +132,16 @@ async def check_rsm_rendering_health() -> Dict[str, Any]:
                 "message": "RSM rendering returned empty result",
             }
 
+    except RenderQueueFullError as e:
+        # Busy rendering is not broken rendering
+        response_time = round((time.time() - start_time) * 1000, 2)
+        logger.warning(f"RSM rendering health check - engine saturated in {response_time}ms")
+
+        return {
+            "status": "degraded",
+            "response_time_ms": response_time,
+            "message": f"RSM rendering engine is saturated: {str(e)}",
+        }
     except Exception as e:
         response_time = round((time.time() - start_time) * 1000, 2)
         logger.error(f"RSM rendering health check failed after {response_time}ms: {str(e)}")
@@ -143,6 +153,38 @@ async def check_rsm_rendering_health() -> Dict[str, Any]:
         }
 
 
+def check_file_write_behind_health() -> Optional[Dict[str, Any]]:
+    """Report the backlog of file edits waiting to be written to the database.
+
+    Returns:
+        Dictionary with write-behind queue depth and flush latency, or None if
+        write-behind is disabled
+    """
+    start_time = time.time()
+    from .services import file_service
+
+    service = file_service.file_service_instance
+    stats = service.get_write_behind_stats() if service is not None else None
+    if stats is None:
+        return None
+
+    response_time = round((time.time() - start_time) * 1000, 2)
+    if stats["consecutive_failures"] > 0:
+        logger.warning(f"File write-behind health check - {stats['dirty']} edited files not written")
+        return {
+            "status": "degraded",
+            "response_time_ms": response_time,
+            "message": f"Writing edited files failed, {stats['dirty']} files are waiting",
+            **stats,
+        }
+    return {
+        "status": "healthy",
+        "response_time_ms": response_time,
+        "message": "Edited files are being written",
+        **stats,
+    }
+
+
 def check_environment_config() -> Dict[str, Any]:
     """Check critical environment configuration.
 
@@ -203,6 +245,7 @@ async def perform_health_check(db: AsyncSession) -> HealthResponse:
     email_health = await check_email_service_health()
     rsm_health = await check_rsm_rendering_health()
     config_health = check_environment_config()
+    write_behind_health = check_file_write_behind_health()
 
     # Calculate total response time
     total_response_time = round((time.time() - start_time) * 1000, 2)
@@ -218,10 +261,14 @@ async def perform_health_check(db: AsyncSession) -> HealthResponse:
         "rsm_rendering": rsm_health,
         "environment_config": config_health,
     }
+    if write_behind_health is not None:
+        checks["file_write_behind"] = write_behind_health
 
     # Determine overall status based on all checks
     critical_checks = [db_health, rsm_health, config_health]
     non_critical_checks = [email_health]  # Email can be disabled
+    if write_behind_health is not None:
+        non_critical_checks.append(write_behind_health)
 
     # Check if any critical systems are unhealthy
     critical_unhealthy = any(check["status"] == "unhealthy" for check in critical_checks)
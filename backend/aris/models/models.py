@@ -9,6 +9,7 @@ All models use timezone-aware timestamps and cascade deletion where appropriate.
 """
 
 import enum
+import hashlib
 
 from sqlalchemy import (
     Boolean,
@@ -18,13 +19,14 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
     Table,
     Text,
     UniqueConstraint,
     text,
 )
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, validates
 from sqlalchemy.sql import func
 
 
@@ -208,8 +210,8 @@ class ProfilePicture(Base):
         Original filename of the uploaded image.
     mime_type : str
         MIME type (e.g., image/jpeg, image/png).
-    content : str
-        Base64-encoded image content.
+    content : bytes
+        Raw image bytes.
     uploaded_at : datetime
         Timestamp of upload.
     deleted_at : datetime
@@ -224,7 +226,7 @@ class ProfilePicture(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     filename = Column(String, nullable=False)
     mime_type = Column(String, nullable=False)
-    content = Column(Text, nullable=False)
+    content = Column(LargeBinary, nullable=False)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
     deleted_at = Column(DateTime(timezone=True), nullable=True)
 
@@ -240,6 +242,8 @@ file_tags = Table(
     Column(
         "tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True
     ),
+    # The primary key covers lookups by file; this one covers filtering files by tag
+    Index("ix_file_tags_tag_id_file_id", "tag_id", "file_id"),
 )
 
 
@@ -280,6 +284,14 @@ class File(Base):
         Version number for preprint versioning.
     prev_version_id : int
         Foreign key to previous version of this file.
+    derived_title : str
+        Title extracted from the RSM source.
+    derived_abstract : str
+        Plain-text abstract extracted from the RSM source.
+    outline : str
+        JSON array of the section headings in the RSM source.
+    derived_source_hash : str
+        SHA-256 of the source the derived columns were extracted from.
     owner : User
         Owner relationship.
     tags : list of Tag
@@ -293,6 +305,22 @@ class File(Base):
     __table_args__ = (
         Index("ix_files_version", "version"),
         Index("ix_files_prev_version_id", "prev_version_id"),
+        Index("ix_files_last_edited_at", "last_edited_at"),
+        Index("ix_files_deleted_at", "deleted_at"),
+        # Keyset pagination of live files by (last_edited_at, id), per owner and overall
+        Index(
+            "ix_files_owner_live_last_edited",
+            "owner_id",
+            "last_edited_at",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_files_live_last_edited",
+            "last_edited_at",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -314,6 +342,12 @@ class File(Base):
     version = Column(Integer, nullable=False, default=0)
     prev_version_id = Column(Integer, ForeignKey("files.id"), nullable=True)
 
+    # Metadata extracted from the source at write time, so listings never parse RSM
+    derived_title = Column(String, nullable=True)
+    derived_abstract = Column(Text, nullable=True)
+    outline = Column(Text, nullable=True)  # JSON array of {title, level}
+    derived_source_hash = Column(String(64), nullable=True)
+
     owner = relationship("User", back_populates="files")
     tags = relationship("Tag", secondary=file_tags, back_populates="files")
     annotations = relationship(
@@ -387,10 +421,16 @@ class FileAsset(Base):
         Name of the file.
     mime_type : str
         MIME type (e.g., image/png).
-    content : str
-        File contents (stored inline).
+    content : bytes
+        Raw file contents (stored inline).
+    size : int
+        Length of ``content`` in bytes.
+    content_hash : str
+        Hex SHA-256 of ``content``. Both are kept in sync by assigning ``content``.
     uploaded_at : datetime
         Timestamp of upload.
+    updated_at : datetime
+        Timestamp of the last change, including soft deletion.
     deleted_at : datetime
         Soft delete marker.
     owner_id : int
@@ -406,13 +446,19 @@ class FileAsset(Base):
     __tablename__ = "file_assets"
     __table_args__ = (
         UniqueConstraint("file_id", "filename", name="uq_file_asset_filename_per_file"),
+        Index("ix_file_assets_updated_at", "updated_at"),
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     filename = Column(String, nullable=False)
     mime_type = Column(String, nullable=False)
-    content = Column(Text, nullable=False)
+    content = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)
+    content_hash = Column(String(64), nullable=False)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
     deleted_at = Column(DateTime(timezone=True), nullable=True)
 
     owner_id = Column(
@@ -425,6 +471,12 @@ class FileAsset(Base):
     owner = relationship("User", back_populates="file_assets")
     file = relationship("File", back_populates="file_assets")
 
+    @validates("content")
+    def _track_content(self, key, content):
+        self.size = len(content)
+        self.content_hash = hashlib.sha256(content).hexdigest()
+        return content
+
 
 class UserSettings(Base):
     """User behavioral and privacy preferences.
@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from .. import crud, current_user, get_db, jwt
 from ..logging_config import get_logger
 from ..models import User
-from ..security import hash_password, verify_password
+from ..security import hash_password_async, verify_password_async
 
 
 logger = get_logger(__name__)
@@ -149,7 +149,7 @@ async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
         for row in all_user_rows:
             logger.warning(f"  ID {row.id}: email='{row.email}', name='{row.name}'")
     
-    if not user or not verify_password(user_data.password, user.password_hash):
+    if not user or not await verify_password_async(user_data.password, user.password_hash):
         logger.warning(f"Failed login attempt for email: {user_data.email}")
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
@@ -198,7 +198,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
         logger.warning(f"Registration failed - email already exists: {user_data.email}")
         raise HTTPException(status_code=409, detail="Email already registered.")
 
-    password_hash = hash_password(user_data.password)
+    password_hash = await hash_password_async(user_data.password)
     new_user = await crud.create_user(
         user_data.name, user_data.initials, user_data.email, password_hash, db
     )
@@ -1,18 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import HTMLResponse
-from pydantic import BaseModel, field_validator
-from sqlalchemy import select
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import Select, desc, exists, select, tuple_
+from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import current_user, get_db, get_file_service
+from ..compression import cached_compressed_response
+from ..crud import FileAssetDB, FileAssetMetaOut
+from ..crud.pagination import (
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+    parse_fields,
+)
 from ..deps import UserRead
-from ..models import FileAsset
-from ..services.file_service import FileCreateData, FileUpdateData, InMemoryFileService
-from .file_assets import FileAssetOut
+from ..exceptions import bad_request_exception
+from ..models import File, FileStatus, file_tags
+from ..services.file_service import (
+    FileCreateData,
+    FileUpdateData,
+    InMemoryFileService,
+    SourceConflictError,
+    TextOperation,
+    source_version,
+)
+from ..services.render_engine import get_render_engine
+from .file_assets import etag_matches
 
 
 router = APIRouter(prefix="/files", tags=["files"], dependencies=[Depends(current_user)])
 
+# Carries the current source version on 409 responses to stale patches
+SOURCE_VERSION_HEADER = "X-Source-Version"
+
+
+def _check_rsm_source(source: str) -> str:
+    """Raise ValueError unless ``source`` is empty or framed by ``:rsm:`` and ``::``."""
+    if not source:  # Allow empty sources
+        return source
+    if not source.strip().startswith(":rsm:"):
+        raise ValueError("Malformed RSM source.")
+    if not source.strip().endswith("::"):
+        raise ValueError("Malformed RSM source.")
+    return source
+
 
 class FileCreate(BaseModel):
     title: str = ""
@@ -43,13 +79,7 @@ class FileCreate(BaseModel):
         ValueError
             If source format is invalid (must start with ':rsm:' and end with '::').
         """
-        if not v:  # Allow empty sources
-            return v
-        if not v.strip().startswith(":rsm:"):
-            raise ValueError("Malformed RSM source.")
-        if not v.strip().endswith("::"):
-            raise ValueError("Malformed RSM source.")
-        return v
+        return _check_rsm_source(v)
 
 
 class FileUpdate(BaseModel):
@@ -78,26 +108,86 @@ class FileUpdate(BaseModel):
         ValueError
             If source format is invalid (must start with ':rsm:' and end with '::').
         """
-        if not v:  # Allow empty sources
-            return v
-        if not v.strip().startswith(":rsm:"):
-            raise ValueError("Malformed RSM source.")
-        if not v.strip().endswith("::"):
-            raise ValueError("Malformed RSM source.")
-        return v
+        return _check_rsm_source(v)
+
+
+# Upper bound on the operations of a single source patch
+MAX_PATCH_OPERATIONS = 1000
+
+
+class TextOperationIn(BaseModel):
+    offset: int = Field(ge=0)
+    delete: int = Field(default=0, ge=0)
+    insert: str = ""
+
+
+class FilePatch(BaseModel):
+    base_version: str
+    operations: list[TextOperationIn] = Field(min_length=1, max_length=MAX_PATCH_OPERATIONS)
+
+
+
+# Upper bounds on the work a single render batch may request
+MAX_BATCH_ITEMS = 50
+MAX_BATCH_SECTIONS = 20
+
+
+class RenderBatchItem(BaseModel):
+    file_id: int
+    html: bool = False
+    sections: list[str] = Field(default_factory=list, max_length=MAX_BATCH_SECTIONS)
+    handrails: bool = True
+    title: bool = False
 
 
+class RenderBatchRequest(BaseModel):
+    items: list[RenderBatchItem] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+class RenderBatchResult(BaseModel):
+    file_id: int
+    html: Optional[str] = None
+    sections: dict[str, Optional[str]] = Field(default_factory=dict)
+    title: Optional[str] = None
+    error: Optional[str] = None
+
+
+class RenderBatchResponse(BaseModel):
+    results: list[RenderBatchResult]
+
+FILE_FIELDS = (
+    "id", "title", "abstract", "last_edited_at", "source", "owner_id", "status", "created_at"
+)
 
 
 @router.get("")
 async def get_files(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    status: Optional[FileStatus] = None,
+    tag_id: Optional[int] = None,
     file_service: InMemoryFileService = Depends(get_file_service),
     db: AsyncSession = Depends(get_db)
 ):
-    """Retrieve all files with extracted titles.
+    """Retrieve files with extracted titles, optionally one page at a time.
 
     Parameters
     ----------
+    response : Response
+        Outgoing response, used to set the next page cursor header.
+    limit : int, optional
+        Page size. All files are returned if omitted.
+    cursor : str, optional
+        Value of the X-Next-Cursor header of the previous page.
+    fields : str, optional
+        Comma-separated subset of the file fields to return, e.g.
+        ``fields=id,title,last_edited_at`` to omit the source.
+    status : FileStatus, optional
+        Only return files with this status.
+    tag_id : int, optional
+        Only return files carrying this tag.
     file_service : InMemoryFileService
         File service dependency.
     db : AsyncSession
@@ -106,23 +196,64 @@ async def get_files(
     Returns
     -------
     list of FileData
-        List of all non-deleted files with title attributes populated.
+        List of non-deleted files with title attributes populated.
+
+    Raises
+    ------
+    HTTPException
+        400 error if the cursor or fields are invalid.
 
     Notes
     -----
-    Requires authentication. Uses file service for in-memory access.
+    Requires authentication. Uses file service for in-memory access. Files are
+    ordered by last edited date, then ID, both descending. When more files
+    follow, the X-Next-Cursor response header holds the cursor of the next page.
+    The page is selected by a keyset query on the files table, so its cost does
+    not depend on how many files there are or how deep the page is; the files
+    themselves and their titles then come from memory, for that page only.
     """
+    try:
+        selected = set(FILE_FIELDS) if fields is None else parse_fields(fields, FILE_FIELDS)
+        after = decode_cursor(cursor) if cursor is not None else None
+    except ValueError as e:
+        raise bad_request_exception(str(e))
+
     # Sync from database to ensure we have latest data
     await file_service.sync_from_database(db)
-    
-    # Get files from memory
-    files = await file_service.get_all_files()
-    
+
+    # The page is selected by the database, along ix_files_live_last_edited
+    query: Select = (
+        select(File.id, File.last_edited_at)
+        .where(File.deleted_at.is_(None))
+        .order_by(desc(File.last_edited_at), desc(File.id))
+    )
+    if status is not None:
+        query = query.where(File.status == status)
+    if tag_id is not None:
+        query = query.where(
+            exists().where(file_tags.c.file_id == File.id, file_tags.c.tag_id == tag_id)
+        )
+    if after is not None:
+        query = query.where(tuple_(File.last_edited_at, File.id) < after)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    rows = (await db.execute(query)).all()
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].last_edited_at, rows[-1].id)
+
+    # Serve the page's files from memory
+    page = []
+    for row in rows:
+        file_data = await file_service.get_file(row.id)
+        if file_data is not None:
+            page.append(file_data)
+
     # Convert to response format with extracted titles
     result = []
-    for f in files:
-        title = await file_service.get_file_title(f.id)
-        result.append({
+    for f in page:
+        title = await file_service.get_file_title(f.id) if "title" in selected else None
+        values = {
             "id": f.id,
             "title": title or f.title,  # Use extracted title or fallback to original
             "abstract": f.abstract,
@@ -131,7 +262,8 @@ async def get_files(
             "owner_id": f.owner_id,
             "status": f.status.value,
             "created_at": f.created_at,
-        })
+        }
+        result.append({field: value for field, value in values.items() if field in selected})
     return result
 
 
@@ -177,11 +309,8 @@ async def create_file(
         owner_id=doc.owner_id
     )
     
-    # Create in memory
-    result = await file_service.create_file(create_data)
-    
-    # Save to database
-    await file_service.save_file_to_database(result.id, db)
+    # Insert into the database, which allocates the ID, and keep in memory
+    result = await file_service.create_file(create_data, db)
     
     return {"id": result.id}
 
@@ -246,6 +375,7 @@ async def get_file(
         "abstract": doc.abstract,
         "last_edited_at": doc.last_edited_at,
         "source": doc.source,
+        "version": source_version(doc.source),
         "owner_id": doc.owner_id,
         "status": doc.status.value,
         "created_at": doc.created_at,
@@ -327,12 +457,101 @@ async def update_file(
         "abstract": doc.abstract,
         "last_edited_at": doc.last_edited_at,
         "source": doc.source,
+        "version": source_version(doc.source),
         "owner_id": doc.owner_id,
         "status": doc.status.value,
         "created_at": doc.created_at,
     }
 
 
+@router.patch("/{file_id}")
+async def patch_file(
+    file_id: int,
+    patch: FilePatch,
+    file_service: InMemoryFileService = Depends(get_file_service),
+    db: AsyncSession = Depends(get_db),
+    user: UserRead = Depends(current_user)
+):
+    """Edit a file's source with text operations instead of resending all of it.
+
+    Parameters
+    ----------
+    file_id : int
+        The unique identifier of the file to edit.
+    patch : FilePatch
+        The ``version`` of the source the operations were computed against, as
+        returned by the file endpoints, and the operations. Offsets refer to that
+        version, count Unicode code points, and must be sorted and non-overlapping.
+    file_service : InMemoryFileService
+        File service dependency.
+    db : AsyncSession
+        SQLAlchemy async database session dependency.
+
+    Returns
+    -------
+    dict
+        The file ``id``, the new source ``version`` and ``last_edited_at``. The
+        source itself is not echoed back.
+
+    Raises
+    ------
+    HTTPException
+        404 error if file is not found, 403 if it belongs to another user, 400 if
+        the operations do not fit the base source or produce malformed RSM, and
+        409 if the source changed since the base version, and 503 if the edit was
+        applied but could not be written to the database. The 409 and 503
+        responses carry the current version in the ``X-Source-Version`` header.
+
+    Notes
+    -----
+    Requires authentication. Only the source and edit time are written to the
+    database, without reading the stored source back.
+    """
+    result: Result[Any] = await db.execute(
+        select(File.owner_id).where(File.id == file_id, File.deleted_at.is_(None))
+    )
+    owner_id = result.scalar_one_or_none()
+    
+    if owner_id is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    if owner_id != user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    await file_service.sync_from_database(db)
+    
+    operations = [TextOperation(op.offset, op.delete, op.insert) for op in patch.operations]
+    try:
+        doc = await file_service.patch_file_source(
+            file_id, patch.base_version, operations, validate=_check_rsm_source
+        )
+    except SourceConflictError as e:
+        raise HTTPException(
+            status_code=409,
+            detail="Source has changed since the base version",
+            headers={SOURCE_VERSION_HEADER: e.current_version},
+        )
+    except ValueError as e:
+        raise bad_request_exception(str(e))
+    if not doc:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    version = source_version(doc.source)
+    if not await file_service.update_source_in_database(file_id, db):
+        # The edit stays in memory, unsaved, and is written by a later save
+        raise HTTPException(
+            status_code=503,
+            detail="The edit could not be saved",
+            headers={SOURCE_VERSION_HEADER: version, "Retry-After": "1"},
+        )
+    
+    return {
+        "id": doc.id,
+        "version": version,
+        "last_edited_at": doc.last_edited_at,
+    }
+
+
 @router.delete("/{file_id}")
 async def soft_delete_file(
     file_id: int, 
@@ -425,14 +644,11 @@ async def duplicate_file(
     # Sync from database to ensure we have latest data
     await file_service.sync_from_database(db)
     
-    # Duplicate in memory
-    new_doc = await file_service.duplicate_file(file_id)
+    # Duplicate into the database and memory
+    new_doc = await file_service.duplicate_file(file_id, db)
     if not new_doc:
         raise HTTPException(status_code=404, detail="File not found")
     
-    # Save to database
-    await file_service.save_file_to_database(new_doc.id, db)
-    
     # Copy tags from original file (using original logic)
     from ..models.models import file_tags
     tag_ids = (
@@ -448,9 +664,20 @@ async def duplicate_file(
     return {"id": new_doc.id, "message": "File duplicated successfully"}
 
 
+def _content_headers(etag: str) -> dict[str, str]:
+    # Rendered content changes with every edit: clients keep it but revalidate each time
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def _is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    return bool(if_none_match) and etag_matches(if_none_match, etag)
+
+
 @router.get("/{file_id}/content", response_class=HTMLResponse)
 async def get_file_html(
     file_id: int, 
+    request: Request,
     file_service: InMemoryFileService = Depends(get_file_service),
     db: AsyncSession = Depends(get_db)
 ):
@@ -460,6 +687,8 @@ async def get_file_html(
     ----------
     file_id : int
         The unique identifier of the file to render.
+    request : Request
+        Incoming request, read for If-None-Match.
     file_service : InMemoryFileService
         File service dependency.
     db : AsyncSession
@@ -468,7 +697,8 @@ async def get_file_html(
     Returns
     -------
     HTMLResponse
-        Rendered HTML content with handrails enabled.
+        Rendered HTML content with handrails enabled, or an empty 304 response
+        when If-None-Match names the current ETag.
 
     Raises
     ------
@@ -478,22 +708,34 @@ async def get_file_html(
     Notes
     -----
     Requires authentication. Uses file service for cached HTML rendering.
+    The ETag is derived from the render inputs, so revalidation never renders.
+    Compressed bodies are cached too, so hot documents are compressed once.
     """
     # Sync from database to ensure we have latest data
     await file_service.sync_from_database(db)
     
-    # Get HTML from file service with database session for asset resolution
-    html = await file_service.get_file_html(file_id, db=db)
-    if not html:
+    etag = await file_service.get_content_etag(file_id, db=db)
+    if etag is None:
         raise HTTPException(status_code=404, detail="File not found")
+    headers = _content_headers(etag)
+    if _is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
     
-    return HTMLResponse(content=html)
+    async def render() -> str:
+        # Get HTML from file service with database session for asset resolution
+        html = await file_service.get_file_html(file_id, db=db)
+        if not html:
+            raise HTTPException(status_code=404, detail="File not found")
+        return html
+    
+    return await cached_compressed_response(request, etag, render, "text/html", headers)
 
 
 @router.get("/{file_id}/content/{section_name}", response_class=HTMLResponse)
 async def get_file_section(
     file_id: int,
     section_name: str,
+    request: Request,
     handrails: bool = True,
     file_service: InMemoryFileService = Depends(get_file_service),
     db: AsyncSession = Depends(get_db),
@@ -506,6 +748,8 @@ async def get_file_section(
         The unique identifier of the file.
     section_name : str
         Name of the section to extract (e.g., 'minimap', 'abstract').
+    request : Request
+        Incoming request, read for If-None-Match.
     handrails : bool, optional
         Whether to enable handrails in the rendered output (default: True).
     file_service : InMemoryFileService
@@ -516,7 +760,8 @@ async def get_file_section(
     Returns
     -------
     HTMLResponse
-        Rendered HTML content for the specified section.
+        Rendered HTML content for the specified section, or an empty 304
+        response when If-None-Match names the current ETag.
 
     Raises
     ------
@@ -530,15 +775,116 @@ async def get_file_section(
     # Sync from database to ensure we have latest data
     await file_service.sync_from_database(db)
     
-    # Get section HTML from file service (with caching)
-    html = await file_service.get_file_section(file_id, section_name, handrails)
-    if not html:
+    etag = await file_service.get_content_etag(file_id, section_name=section_name, handrails=handrails)
+    if etag is None:
         raise HTTPException(status_code=404, detail=f"Section {section_name} not found")
+    headers = _content_headers(etag)
+    if _is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    async def render() -> str:
+        # Get section HTML from file service (with caching)
+        html = await file_service.get_file_section(file_id, section_name, handrails)
+        if not html:
+            raise HTTPException(status_code=404, detail=f"Section {section_name} not found")
+        return html
     
-    return HTMLResponse(content=html)
+    return await cached_compressed_response(request, etag, render, "text/html", headers)
 
 
-@router.get("/{file_id}/assets", response_model=list[FileAssetOut])
+@router.post("/render-batch", response_model=RenderBatchResponse)
+async def render_batch(
+    batch: RenderBatchRequest,
+    file_service: InMemoryFileService = Depends(get_file_service),
+    db: AsyncSession = Depends(get_db),
+    user: UserRead = Depends(current_user),
+):
+    """Render several documents, sections and titles in one call.
+
+    Parameters
+    ----------
+    batch : RenderBatchRequest
+        Items naming a file and what to render of it: the full HTML, any number
+        of sections (rendered with the item's ``handrails`` flag) and the title.
+    file_service : InMemoryFileService
+        File service dependency.
+    db : AsyncSession
+        SQLAlchemy async database session dependency.
+    user : UserRead
+        Current authenticated user dependency.
+
+    Returns
+    -------
+    RenderBatchResponse
+        One result per item, in request order. Sections that do not exist map to
+        None; files that do not exist or belong to another user carry an error.
+
+    Notes
+    -----
+    Requires authentication. The in-memory files are synced once for the whole
+    batch, and work shared by several items is done once. Sections and titles are
+    rendered concurrently on the render engine. Full documents resolve their
+    assets through the request's database session, which cannot be shared by
+    concurrent tasks, so they render one after another alongside the rest.
+    """
+    file_ids = {item.file_id for item in batch.items}
+    result: Result[Any] = await db.execute(
+        select(File.id).where(
+            File.id.in_(file_ids), File.owner_id == user.id, File.deleted_at.is_(None)
+        )
+    )
+    owned = set(result.scalars().all())
+
+    await file_service.sync_from_database(db)
+
+    # Deduplicate the work across items, keeping request order
+    html_ids = list(dict.fromkeys(i.file_id for i in batch.items if i.html and i.file_id in owned))
+    title_ids = list(dict.fromkeys(i.file_id for i in batch.items if i.title and i.file_id in owned))
+    section_keys = list(dict.fromkeys(
+        (i.file_id, name, i.handrails) for i in batch.items if i.file_id in owned for name in i.sections
+    ))
+
+    limit = asyncio.Semaphore(get_render_engine().workers)
+    html: dict[int, Optional[str]] = {}
+    titles: dict[int, Optional[str]] = {}
+    sections: dict[tuple[int, str, bool], Optional[str]] = {}
+
+    async def render_documents() -> None:
+        for file_id in html_ids:
+            async with limit:
+                html[file_id] = await file_service.get_file_html(file_id, db=db)
+
+    async def render_section(key: tuple[int, str, bool]) -> None:
+        async with limit:
+            sections[key] = await file_service.get_file_section(*key) or None
+
+    async def render_title(file_id: int) -> None:
+        async with limit:
+            titles[file_id] = await file_service.get_file_title(file_id)
+
+    await asyncio.gather(
+        render_documents(),
+        *(render_section(key) for key in section_keys),
+        *(render_title(file_id) for file_id in title_ids),
+    )
+
+    results = []
+    for item in batch.items:
+        if item.file_id not in owned or await file_service.get_file(item.file_id) is None:
+            results.append(RenderBatchResult(file_id=item.file_id, error="File not found"))
+            continue
+        results.append(
+            RenderBatchResult(
+                file_id=item.file_id,
+                html=html.get(item.file_id) if item.html else None,
+                sections={name: sections[(item.file_id, name, item.handrails)] for name in item.sections},
+                title=titles.get(item.file_id) if item.title else None,
+            )
+        )
+    return RenderBatchResponse(results=results)
+
+
+@router.get("/{file_id}/assets", response_model=list[FileAssetMetaOut])
 async def get_assets_for_file(
     file_id: int,
     db: AsyncSession = Depends(get_db),
@@ -557,21 +903,14 @@ async def get_assets_for_file(
 
     Returns
     -------
-    list of FileAssetOut
-        List of file assets owned by the user for the specified file.
+    list of FileAssetMetaOut
+        Metadata of the file assets owned by the user for the specified file.
 
     Notes
     -----
     Requires authentication. Only returns assets owned by the current user.
-    Excludes soft-deleted assets.
+    Excludes soft-deleted assets. Asset contents are not loaded; fetch them
+    per asset from ``GET /assets/{asset_id}`` or ``GET /assets/{asset_id}/raw``.
     """
-    result = await db.execute(
-        select(FileAsset).where(
-            FileAsset.file_id == file_id,
-            FileAsset.owner_id == user.id,
-            FileAsset.deleted_at.is_(None),
-        )
-    )
-    assets = result.scalars().all()
-    return assets
+    return await FileAssetDB.list_user_assets(user.id, db, file_id=file_id)
 
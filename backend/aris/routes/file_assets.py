@@ -1,19 +1,28 @@
 """Routes to manage file assets (pictures, extra rsm files, etc)."""
 
-from typing import List
+import re
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .. import current_user, get_db
-from ..crud import FileAssetCreate, FileAssetDB, FileAssetOut, FileAssetUpdate
+from .. import current_user, get_db, get_file_service
+from ..crud import FileAssetCreate, FileAssetDB, FileAssetMetaOut, FileAssetOut, FileAssetUpdate
+from ..services.file_service import InMemoryFileService
 
 
 router = APIRouter(prefix="/assets", tags=["files", "assets"], dependencies=[Depends(current_user)])
 
+RAW_CHUNK_SIZE = 64 * 1024
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
 
-async def get_user_asset_or_404(asset_id: int, user_id: int, db: AsyncSession):
-    asset = await FileAssetDB.get_user_asset(asset_id, user_id, db)
+
+async def get_user_asset_or_404(
+    asset_id: int, user_id: int, db: AsyncSession, with_content: bool = True
+):
+    asset = await FileAssetDB.get_user_asset(asset_id, user_id, db, with_content=with_content)
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
     return asset
@@ -21,13 +30,17 @@ async def get_user_asset_or_404(asset_id: int, user_id: int, db: AsyncSession):
 
 @router.post("", response_model=FileAssetOut)
 async def upload_asset(
-    payload: FileAssetCreate, db: AsyncSession = Depends(get_db), user=Depends(current_user)
+    payload: FileAssetCreate,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(current_user),
+    file_service: InMemoryFileService = Depends(get_file_service),
 ):
     new_asset = await FileAssetDB.create_asset(payload, user.id, db)
+    await file_service.invalidate_file_assets(payload.file_id)
     return new_asset
 
 
-@router.get("", response_model=List[FileAssetOut])
+@router.get("", response_model=List[FileAssetMetaOut])
 async def list_assets(db: AsyncSession = Depends(get_db), user=Depends(current_user)):
     assets = await FileAssetDB.list_user_assets(user.id, db)
     return assets
@@ -44,16 +57,141 @@ async def update_asset(
     payload: FileAssetUpdate,
     db: AsyncSession = Depends(get_db),
     user=Depends(current_user),
+    file_service: InMemoryFileService = Depends(get_file_service),
 ):
     asset = await get_user_asset_or_404(asset_id, user.id, db)
     updated_asset = await FileAssetDB.update_asset(asset, payload, db)
+    await file_service.invalidate_file_assets(asset.file_id)
     return updated_asset
 
 
 @router.delete("/{asset_id}")
 async def soft_delete_asset(
-    asset_id: int, db: AsyncSession = Depends(get_db), user=Depends(current_user)
+    asset_id: int,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(current_user),
+    file_service: InMemoryFileService = Depends(get_file_service),
 ):
     asset = await get_user_asset_or_404(asset_id, user.id, db)
     await FileAssetDB.soft_delete_asset(asset, db)
+    await file_service.invalidate_file_assets(asset.file_id)
     return {"message": f"Asset {asset_id} soft deleted"}
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Whether an If-None-Match header names ``etag``, using weak comparison."""
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single byte range into inclusive ``(start, end)`` offsets.
+
+    Returns None for headers this endpoint does not honour (malformed,
+    multi-range, or a last position before the first), in which case the
+    whole asset is served.
+
+    Raises
+    ------
+    HTTPException
+        416 error if the range lies outside the asset.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first and last and int(last) < int(first):
+        # Syntactically invalid, so the header is ignored (RFC 9110, section 14.1.1)
+        return None
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+def _content_disposition(filename: str) -> str:
+    """Build an inline Content-Disposition header value for any filename.
+
+    Headers are latin-1, so the name is sent percent-encoded as UTF-8 in
+    ``filename*`` (RFC 6266), with an ASCII-only ``filename`` fallback for
+    clients that do not support it.
+    """
+    fallback = "".join(c if " " <= c <= "~" and c not in '"\\' else "_" for c in filename)
+    return f"inline; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+def _iter_chunks(content: memoryview) -> Iterator[bytes]:
+    for offset in range(0, len(content), RAW_CHUNK_SIZE):
+        yield bytes(content[offset : offset + RAW_CHUNK_SIZE])
+
+
+@router.get("/{asset_id}/raw")
+async def get_asset_raw(
+    asset_id: int, request: Request, db: AsyncSession = Depends(get_db), user=Depends(current_user)
+):
+    """Stream the raw bytes of an asset.
+
+    Parameters
+    ----------
+    asset_id : int
+        The unique identifier of the asset.
+    request : Request
+        Incoming request, read for conditional and range headers.
+    db : AsyncSession
+        SQLAlchemy async database session dependency.
+    user : User
+        Current authenticated user dependency.
+
+    Returns
+    -------
+    StreamingResponse or Response
+        The asset with its own Content-Type, a 206 partial response when a
+        single byte range is requested, or 304 when If-None-Match matches.
+
+    Raises
+    ------
+    HTTPException
+        404 error if the asset does not exist or belongs to another user.
+        416 error if the requested range lies outside the asset.
+    """
+    asset = await get_user_asset_or_404(asset_id, user.id, db, with_content=False)
+    etag = f'"{asset.content_hash}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": _content_disposition(asset.filename),
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    await db.refresh(asset, ["content"])
+    content: bytes = asset.content
+    size = len(content)
+    status_code, start, end = 200, 0, size - 1
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # If-Range requires a strong match: weak tags name compressed variants
+    if range_header and (if_range is None or if_range.strip() == etag):
+        byte_range = _parse_range(range_header, size)
+        if byte_range is not None:
+            status_code, (start, end) = 206, byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_chunks(memoryview(content)[start : end + 1]),
+        status_code=status_code,
+        media_type=asset.mime_type,
+        headers=headers,
+    )
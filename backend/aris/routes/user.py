@@ -1,18 +1,19 @@
-import base64
 import json
 from datetime import UTC, datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, File, HTTPException, Response, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
 from pydantic import BaseModel, field_validator
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from .. import crud, current_user, get_db
+from ..crud.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, parse_fields
 from ..exceptions import bad_request_exception, not_found_exception
-from ..models import ProfilePicture, User
-from ..security import hash_password, verify_password
+from ..models import FileStatus, ProfilePicture, User
+from ..security import hash_password_async, verify_password_async
+from ..services.principal_cache import invalidate_principal
 
 
 router = APIRouter(prefix="/users", tags=["users"], dependencies=[Depends(current_user)])
@@ -148,12 +149,13 @@ async def change_password(
         raise not_found_exception("User", user_id)
     
     # Verify current password
-    if not verify_password(password_data.current_password, user.password_hash):
+    if not await verify_password_async(password_data.current_password, user.password_hash):
         raise HTTPException(status_code=401, detail="Current password is incorrect")
     
     # Hash new password and update
-    user.password_hash = hash_password(password_data.new_password)
+    user.password_hash = await hash_password_async(password_data.new_password)
     await db.commit()
+    invalidate_principal(user.id)
     await db.refresh(user)
     
     return {"message": "Password changed successfully"}
@@ -200,6 +202,7 @@ async def send_verification_email(
     user.generate_verification_token()
     user.email_verification_sent_at = datetime.now(UTC)
     await db.commit()
+    invalidate_principal(user.id)
     
     # TODO: In production, send actual email with verification link
     # For now, just return success message
@@ -260,6 +263,7 @@ async def verify_email(
     user.email_verification_token = None  # type: ignore
     user.email_verification_sent_at = None  # type: ignore
     await db.commit()
+    invalidate_principal(user.id)
     
     return {"message": "Email verified successfully"}
 
@@ -299,17 +303,36 @@ async def soft_delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
 @router.get("/{user_id}/files")
 async def get_user_files(
     user_id: int,
+    response: Response,
     with_tags: bool = True,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    status: Optional[FileStatus] = None,
+    tag_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
 ):
-    """Retrieve all files owned by a user.
+    """Retrieve the files owned by a user, optionally one page at a time.
 
     Parameters
     ----------
     user_id : int
         The unique identifier of the user whose files to retrieve.
+    response : Response
+        Outgoing response, used to set the next page cursor header.
     with_tags : bool, optional
         Whether to include tag information for each file (default: True).
+    limit : int, optional
+        Page size. All files are returned if omitted.
+    cursor : str, optional
+        Value of the X-Next-Cursor header of the previous page.
+    fields : str, optional
+        Comma-separated subset of id, title, source, last_edited_at and tags to
+        return, e.g. ``fields=id,title,last_edited_at`` to omit the source.
+    status : FileStatus, optional
+        Only return files with this status.
+    tag_id : int, optional
+        Only return files carrying this tag.
     db : AsyncSession
         SQLAlchemy async database session dependency.
 
@@ -321,16 +344,30 @@ async def get_user_files(
     Raises
     ------
     HTTPException
-        404 error if user is not found.
+        404 error if user is not found, 400 error if the cursor or fields are
+        invalid.
 
     Notes
     -----
-    Requires authentication. Returns files ordered by last edited date.
+    Requires authentication. Returns files ordered by last edited date, then
+    ID. When more files follow, the X-Next-Cursor response header holds the
+    cursor of the next page.
     """
     try:
-        return await crud.get_user_files(user_id, with_tags, db)
+        selected = parse_fields(fields, crud.USER_FILE_FIELDS)
+        if cursor is not None:
+            decode_cursor(cursor)
+    except ValueError as e:
+        raise bad_request_exception(str(e))
+    try:
+        files, next_cursor = await crud.get_user_files_page(
+            user_id, with_tags, db, limit, cursor, selected, status, tag_id
+        )
     except ValueError:
         raise not_found_exception("User", user_id)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return files
 
 
 @router.get("/{user_id}/files/{file_id}")
@@ -425,7 +462,7 @@ async def upload_profile_picture(
     -----
     Maximum file size is 5MB. Allowed formats: JPEG, PNG, GIF, WebP.
     Soft deletes existing profile picture before creating new one.
-    Stores image as base64-encoded content in database.
+    Stores the raw image bytes in the database.
     """
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to update this profile")
@@ -442,7 +479,6 @@ async def upload_profile_picture(
             status_code=400,
             detail=f"File size too large. Maximum allowed: {MAX_FILE_SIZE // (1024 * 1024)}MB",
         )
-    base64_content = base64.b64encode(content).decode("utf-8")
 
     try:
         # Get the user
@@ -462,12 +498,13 @@ async def upload_profile_picture(
 
         # Create new profile picture
         new_picture = ProfilePicture(
-            filename=avatar.filename, mime_type=avatar.content_type, content=base64_content
+            filename=avatar.filename, mime_type=avatar.content_type, content=content
         )
         db.add(new_picture)
         await db.flush()  # Get the ID without committing
         user.profile_picture_id = new_picture.id
         await db.commit()
+        invalidate_principal(user.id)
         await db.refresh(new_picture)
 
         return {
@@ -505,7 +542,6 @@ async def get_profile_picture(
     HTTPException
         403 error if user is not authorized to retrieve this profile.
         404 error if user or profile picture is not found.
-        500 error if image data is corrupted.
 
     Notes
     -----
@@ -529,13 +565,8 @@ async def get_profile_picture(
         raise HTTPException(status_code=404, detail="Profile picture not found")
     profile_picture = user.profile_picture
 
-    try:
-        image_data = base64.b64decode(profile_picture.content)
-    except ValueError:
-        raise HTTPException(status_code=500, detail="Invalid image data")
-
     return Response(
-        content=image_data,
+        content=profile_picture.content,
         media_type=profile_picture.mime_type,
         headers={
             "Content-Disposition": f"inline; filename={profile_picture.filename}",
@@ -593,6 +624,7 @@ async def delete_profile_picture(
         user.profile_picture.deleted_at = datetime.now(UTC)
         user.profile_picture_id = None  # type: ignore
         await db.commit()
+        invalidate_principal(user.id)
         return {"message": "Profile picture deleted successfully"}
 
     except HTTPException:
@@ -1,7 +1,26 @@
-"""Password hashing and verification utilities using bcrypt."""
+"""Password hashing and verification utilities using bcrypt.
+
+A bcrypt call burns tens of milliseconds of CPU. Async code must use
+:func:`hash_password_async` and :func:`verify_password_async`, which run bcrypt
+in a small dedicated thread pool instead of on the event loop. bcrypt releases
+the GIL while hashing, so the loop keeps serving other requests. The pool's queue
+is bounded: when a login storm fills it, new calls fail fast with
+:class:`PasswordHasherBusyError` instead of piling up behind each other.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
 
 import bcrypt
 
+from .config import settings
+
+
+T = TypeVar("T")
+
 
 def hash_password(password: str) -> str:
     """Hash a plaintext password using bcrypt with salt.
@@ -45,3 +64,110 @@ def verify_password(password: str, hashed: str) -> bool:
     performs constant-time comparison.
     """
     return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when the password hashing queue is full.
+
+    Attributes:
+        retry_after: Suggested number of seconds before retrying.
+    """
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Thread pool running bcrypt with admission control.
+
+    Args:
+        workers: Threads hashing concurrently.
+        max_queue: Calls allowed to wait for a free thread before new ones are rejected.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self._completed = 0
+        self._rejected = 0
+
+    async def hash(self, password: str) -> str:
+        """Hash a password without blocking the event loop. See :func:`hash_password`."""
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """Verify a password without blocking the event loop. See :func:`verify_password`."""
+        return await self._run(verify_password, password, hashed)
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self._outstanding >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise PasswordHasherBusyError("Too many concurrent password operations")
+            self._outstanding += 1
+        # Count the call until the thread finishes it, even if the caller goes away
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._outstanding -= 1
+            self._completed += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of calls in flight, completed and rejected."""
+        return {
+            "outstanding": self._outstanding,
+            "completed": self._completed,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_password_hasher: Optional[PasswordHasher] = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Get the global password hasher, creating it from the settings on first use."""
+    global _password_hasher
+    if _password_hasher is None:
+        workers = settings.PASSWORD_HASH_WORKERS or min(2, os.cpu_count() or 1)
+        _password_hasher = PasswordHasher(workers, settings.PASSWORD_HASH_MAX_QUEUE)
+    return _password_hasher
+
+
+def shutdown_password_hasher() -> None:
+    """Stop the global password hasher's threads."""
+    global _password_hasher
+    if _password_hasher is not None:
+        _password_hasher.shutdown()
+        _password_hasher = None
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the password hasher's thread pool.
+
+    Raises
+    ------
+    PasswordHasherBusyError
+        If too many password operations are already queued.
+    """
+    return await get_password_hasher().hash(password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """Verify a password on the password hasher's thread pool.
+
+    Raises
+    ------
+    PasswordHasherBusyError
+        If too many password operations are already queued.
+    """
+    return await get_password_hasher().verify(password, hashed)
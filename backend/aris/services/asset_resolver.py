@@ -4,12 +4,16 @@ This module provides asset resolution for RSM rendering by fetching assets
 from the database instead of the filesystem.
 """
 
-import base64
+import hashlib
 import logging
-from typing import Optional
+from collections import OrderedDict
+from typing import Any, Optional
 
+from sqlalchemy import select
+from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..config import settings
 from ..models.models import FileAsset
 
 
@@ -32,6 +36,7 @@ class FileAssetResolver:
             Dictionary mapping asset filenames to their content
         """
         self._assets = assets
+        self._digest: Optional[str] = None
         
     def resolve_asset(self, path: str) -> Optional[str]:
         """Resolve an asset path to its content.
@@ -48,49 +53,229 @@ class FileAssetResolver:
         """
         return self._assets.get(path)
     
+    def digest(self) -> str:
+        """Return a digest identifying this exact set of assets.
+        
+        Two resolvers with the same filenames and contents have the same digest,
+        which lets render results be cached by content.
+        
+        Returns
+        -------
+        str
+            Hex SHA-256 over the sorted filenames and their contents
+        """
+        if self._digest is None:
+            h = hashlib.sha256()
+            for name, content in sorted(self._assets.items()):
+                for part in (name, content):
+                    h.update(part.encode("utf-8"))
+                    h.update(b"\0")
+            self._digest = h.hexdigest()
+        return self._digest
+    
     @classmethod
-    async def create_for_file(cls, file_id: int, db: AsyncSession) -> 'FileAssetResolver':
+    async def create_for_file(
+        cls, file_id: int, db: AsyncSession, source: Optional[str] = None
+    ) -> 'FileAssetResolver':
         """Create an asset resolver for a specific file.
         
+        Decoded assets are served from the asset bundle cache when the file's
+        assets have not changed since they were decoded. Assets that are not
+        valid UTF-8 are left out, and not fetched again until they are updated.
+        
         Parameters
         ----------
         file_id
             The ID of the file whose assets should be resolved
         db
             Database session for querying assets
+        source
+            RSM source that will be rendered with the resolver. If given, only
+            assets whose filename occurs in it are loaded, since RSM can only
+            resolve paths spelled out in the source.
             
         Returns
         -------
         FileAssetResolver
-            Resolver with all assets pre-loaded
+            Resolver with the assets pre-loaded
         """
         try:
-            # Query all assets for this file
-            from sqlalchemy import select
-            result = await db.execute(
-                select(FileAsset)
+            result: Result[Any] = await db.execute(
+                select(
+                    FileAsset.id, FileAsset.filename, FileAsset.content_hash, FileAsset.updated_at
+                )
                 .where(FileAsset.file_id == file_id)
                 .where(FileAsset.deleted_at.is_(None))
             )
-            assets = result.scalars().all()
+            rows = result.all()
+            version = tuple(sorted((row.id, row.filename, row.content_hash) for row in rows))
+            wanted = {
+                row.id: row.filename for row in rows if source is None or row.filename in source
+            }
+            # updated_at can have second resolution, the hash tells same-second edits apart
+            asset_versions = {row.id: (row.updated_at, row.content_hash) for row in rows}
             
-            # Create assets dictionary with base64 decoding
-            assets_dict: dict[str, str] = {}
-            for asset in assets:
-                try:
-                    # Decode base64 content to get actual asset content
-                    decoded_content = base64.b64decode(asset.content).decode('utf-8')
-                    assets_dict[str(asset.filename)] = decoded_content
-                    logger.info(f"Decoded asset {asset.filename}: {len(decoded_content)} chars, starts with: {decoded_content[:100]!r}")
-                except Exception as e:
-                    logger.error(f"Failed to decode asset {asset.filename} for file {file_id}: {e}")
-                    # Skip this asset if decoding fails
-                    continue
+            cache = get_asset_bundle_cache()
+            decoded = cache.get(file_id, version)
+            missing = [
+                asset_id for asset_id, name in wanted.items()
+                if name not in decoded
+                and not cache.is_undecodable(asset_id, asset_versions[asset_id])
+            ]
+            if missing:
+                result = await db.execute(
+                    select(FileAsset.id, FileAsset.filename, FileAsset.content)
+                    .where(FileAsset.id.in_(missing))
+                )
+                loaded: dict[str, str] = {}
+                for asset_id, filename, content in result.all():
+                    try:
+                        loaded[filename] = content.decode('utf-8')
+                    except UnicodeDecodeError as e:
+                        logger.error(f"Failed to decode asset {filename} for file {file_id}: {e}")
+                        cache.add_undecodable(asset_id, asset_versions[asset_id])
+                decoded = cache.add(file_id, version, loaded)
+                logger.debug(f"Decoded {len(loaded)} assets for file {file_id}")
             
-            logger.info(f"Loaded {len(assets_dict)} assets for file {file_id}")
-            
-            return cls(assets_dict)
+            return cls({name: decoded[name] for name in wanted.values() if name in decoded})
             
         except Exception as e:
             logger.error(f"Failed to load assets for file {file_id}: {e}")
-            return cls({})
\ No newline at end of file
+            return cls({})
+
+
+async def file_assets_digest(file_id: int, db: AsyncSession) -> str:
+    """Return a digest of the filenames and contents of a file's live assets.
+    
+    Only metadata is read, so this is cheap enough to compute per request.
+    
+    Parameters
+    ----------
+    file_id
+        The ID of the file whose assets to digest
+    db
+        Database session for querying assets
+        
+    Returns
+    -------
+    str
+        Hex SHA-256 over the sorted filenames and content hashes
+    """
+    result: Result[Any] = await db.execute(
+        select(FileAsset.filename, FileAsset.content_hash)
+        .where(FileAsset.file_id == file_id)
+        .where(FileAsset.deleted_at.is_(None))
+        .order_by(FileAsset.filename)
+    )
+    h = hashlib.sha256()
+    for filename, content_hash in result.all():
+        for part in (filename, content_hash):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+    return h.hexdigest()
+
+
+class AssetBundleCache:
+    """Per-file cache of decoded assets, LRU-bounded by total decoded size.
+    
+    Each entry belongs to a version of the file's asset set: the ids, filenames
+    and content hashes of its live assets. A lookup with a different version
+    drops the entry, so edits are never served stale even without explicit
+    invalidation. Entries may hold only some of a file's assets when resolvers
+    were built for sources referencing a subset of them.
+    
+    Assets that failed to decode are remembered separately, by asset id,
+    ``updated_at`` and content hash, so that they are not fetched again until
+    they change.
+    
+    Parameters
+    ----------
+    max_bytes
+        Total UTF-8 size of the cached assets. 0 disables caching.
+    """
+    
+    # Assets remembered as undecodable, oldest forgotten first
+    MAX_UNDECODABLE = 1024
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[int, tuple[tuple, dict[str, str], int]]" = OrderedDict()
+        self._undecodable: "OrderedDict[tuple[int, tuple], None]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+    
+    def get(self, file_id: int, version: tuple) -> dict[str, str]:
+        """Return the assets decoded so far for this version of the file's assets."""
+        entry = self._entries.get(file_id)
+        if entry is None or entry[0] != version:
+            if entry is not None:
+                self.invalidate(file_id)
+            self._misses += 1
+            return {}
+        self._entries.move_to_end(file_id)
+        self._hits += 1
+        return entry[1]
+    
+    def add(self, file_id: int, version: tuple, assets: dict[str, str]) -> dict[str, str]:
+        """Add decoded assets to a file's entry and return all of its assets."""
+        entry = self._entries.get(file_id)
+        merged = dict(entry[1]) if entry is not None and entry[0] == version else {}
+        merged.update(assets)
+        self.invalidate(file_id)
+        nbytes = sum(len(content.encode('utf-8')) for content in merged.values())
+        if 0 < nbytes <= self.max_bytes:
+            self._entries[file_id] = (version, merged, nbytes)
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+        return merged
+    
+    def is_undecodable(self, asset_id: int, version: tuple) -> bool:
+        """Whether this version of an asset is known to fail decoding."""
+        return (asset_id, version) in self._undecodable
+    
+    def add_undecodable(self, asset_id: int, version: tuple) -> None:
+        """Remember that this version of an asset failed to decode."""
+        if self.max_bytes <= 0:
+            return
+        self._undecodable[(asset_id, version)] = None
+        while len(self._undecodable) > self.MAX_UNDECODABLE:
+            self._undecodable.popitem(last=False)
+    
+    def invalidate(self, file_id: int) -> None:
+        """Forget the decoded assets of a file, if any."""
+        entry = self._entries.pop(file_id, None)
+        if entry is not None:
+            self.size -= entry[2]
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self._undecodable.clear()
+        self.size = 0
+    
+    def stats(self) -> dict[str, int]:
+        """Return hit and miss counters and the cache's occupancy."""
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "entries": len(self._entries),
+            "bytes": self.size,
+        }
+
+
+_asset_bundle_cache: Optional[AssetBundleCache] = None
+
+
+def get_asset_bundle_cache() -> AssetBundleCache:
+    """Get the global asset bundle cache."""
+    global _asset_bundle_cache
+    if _asset_bundle_cache is None:
+        _asset_bundle_cache = AssetBundleCache(settings.ASSET_CACHE_MAX_BYTES)
+    return _asset_bundle_cache
+
+
+def invalidate_asset_bundle(file_id: int) -> None:
+    """Drop a file's decoded assets after one of its assets changed."""
+    get_asset_bundle_cache().invalidate(file_id)
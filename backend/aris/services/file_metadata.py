@@ -0,0 +1,187 @@
+"""Metadata derived from RSM source and persisted alongside each file.
+
+Listings need the title of every document they show, and extracting it means
+parsing the whole RSM source. Instead, the title, a plain-text abstract and the
+section outline are extracted once whenever a file's source is written and stored
+in the ``derived_*`` columns of ``files``, together with a hash of the source they
+were extracted from. Readers trust the stored values only while that hash matches
+the current source, so rows edited out of band fall back to parsing until
+:func:`backfill_file_metadata` catches up with them.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict, Optional, cast
+
+from sqlalchemy import Select, select, update
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..logging_config import get_logger
+from ..models import File
+from .render_engine import RenderEngineError, get_render_engine
+
+
+logger = get_logger(__name__)
+
+EMPTY_METADATA: Dict[str, Any] = {"title": "", "abstract": "", "outline": []}
+
+
+def source_digest(source: Optional[str]) -> str:
+    """Return the hex SHA-256 of a file source, treating None as empty."""
+    return hashlib.sha256((source or "").encode("utf-8")).hexdigest()
+
+
+def is_metadata_current(file: File) -> bool:
+    """Whether the derived columns of ``file`` were extracted from its current source."""
+    digest = cast(Optional[str], file.derived_source_hash)
+    return digest is not None and digest == source_digest(cast(Optional[str], file.source))
+
+
+def persisted_title(file: File) -> Optional[str]:
+    """Return the derived title of ``file``, or None if it is missing or stale."""
+    if not is_metadata_current(file):
+        return None
+    return cast(Optional[str], file.derived_title) or ""
+
+
+async def extract_metadata(source: Optional[str]) -> Dict[str, Any]:
+    """Parse RSM source into its title, plain-text abstract and outline.
+
+    Parameters
+    ----------
+    source : str or None
+        The RSM source.
+
+    Returns
+    -------
+    dict
+        ``title`` and ``abstract`` strings and an ``outline`` list of
+        ``{"title", "level"}`` dicts.
+    """
+    if not source:
+        # RSM refuses to parse an empty document
+        return dict(EMPTY_METADATA)
+    return await get_render_engine().parse_metadata(source)
+
+
+def _metadata_values(metadata: Dict[str, Any], digest: str) -> Dict[str, Any]:
+    return {
+        "derived_title": metadata["title"],
+        "derived_abstract": metadata["abstract"],
+        "outline": json.dumps(metadata["outline"]),
+        "derived_source_hash": digest,
+    }
+
+
+async def refresh_file_metadata(file: File) -> bool:
+    """Re-extract the derived columns of ``file`` if its source changed.
+
+    Call this before committing a write to ``file.source``. Failures are logged
+    and leave the columns stale, so readers fall back to parsing the source.
+
+    Parameters
+    ----------
+    file : File
+        The file row, attached to a session or not.
+
+    Returns
+    -------
+    bool
+        True if the columns were updated.
+    """
+    source = cast(Optional[str], file.source)
+    if file.derived_source_hash == source_digest(source):
+        return False
+    values = await metadata_columns(cast(Optional[int], file.id), source)
+    if values is None:
+        return False
+    for column, value in values.items():
+        setattr(file, column, value)
+    return True
+
+
+async def metadata_columns(file_id: Optional[int], source: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Extract the values of the derived columns for a file source.
+
+    Parameters
+    ----------
+    file_id : int or None
+        The file the source belongs to, for logging.
+    source : str or None
+        The RSM source.
+
+    Returns
+    -------
+    dict or None
+        Column values, or None if extraction failed. Failures are logged.
+    """
+    try:
+        metadata = await extract_metadata(source)
+    except RenderEngineError as e:
+        logger.warning(f"Deferring metadata extraction for file {file_id}: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Failed to extract metadata for file {file_id}: {e}")
+        return None
+    return _metadata_values(metadata, source_digest(source))
+
+
+async def backfill_file_metadata(db: AsyncSession, batch_size: int = 32) -> int:
+    """Populate the derived columns of every file whose metadata is missing or stale.
+
+    Files are walked in primary key order, ``batch_size`` at a time. Each batch is
+    parsed concurrently on the render engine and written back with a single
+    executemany UPDATE, then committed, so the job can be interrupted and resumed.
+    ``last_edited_at`` is written back unchanged so that the backfill does not
+    reorder listings or look like an edit to the in-memory file service.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        SQLAlchemy async database session.
+    batch_size : int, optional
+        Rows fetched, parsed and written per batch (default: 32). Keep this below
+        the render engine's queue size.
+
+    Returns
+    -------
+    int
+        Number of files updated.
+    """
+    columns: Select = select(File.id, File.source, File.derived_source_hash, File.last_edited_at)
+    updated = 0
+    last_id = 0
+    while True:
+        result: Result[Any] = await db.execute(
+            columns.where(File.id > last_id)  # type: ignore[arg-type]
+            .order_by(File.id)
+            .limit(batch_size)
+        )
+        rows = result.all()
+        if not rows:
+            return updated
+        last_id = rows[-1].id
+
+        stale = [row for row in rows if row.derived_source_hash != source_digest(row.source)]
+        outcomes = await asyncio.gather(
+            *(extract_metadata(row.source) for row in stale), return_exceptions=True
+        )
+        values = []
+        for row, metadata in zip(stale, outcomes):
+            if isinstance(metadata, BaseException):
+                logger.error(f"Failed to extract metadata for file {row.id}: {metadata}")
+                continue
+            values.append(
+                {
+                    "id": row.id,
+                    "last_edited_at": row.last_edited_at,
+                    **_metadata_values(metadata, source_digest(row.source)),
+                }
+            )
+        if values:
+            await db.execute(update(File), values)
+            await db.commit()
+            updated += len(values)
+        logger.info(f"Backfilled metadata for {updated} files (up to id {last_id})")
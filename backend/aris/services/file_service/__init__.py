@@ -3,8 +3,22 @@
 from typing import Optional
 
 from .interface import FileServiceInterface
+from .invalidation import (
+    InvalidationBus,
+    InvalidationEvent,
+    LocalInvalidationBus,
+    PostgresInvalidationBus,
+    create_invalidation_bus,
+)
 from .memory_service import InMemoryFileService
 from .models import FileCreateData, FileData, FileUpdateData
+from .text_ops import (
+    SourceConflictError,
+    TextOperation,
+    TextOperationError,
+    apply_text_operations,
+    source_version,
+)
 
 
 # Global singleton instance (will be initialized by deps.py)
@@ -20,6 +34,16 @@ __all__ = [
     "FileCreateData",
     "FileUpdateData",
     "InMemoryFileService",
+    "InvalidationBus",
+    "InvalidationEvent",
+    "LocalInvalidationBus",
+    "PostgresInvalidationBus",
+    "create_invalidation_bus",
+    "SourceConflictError",
+    "TextOperation",
+    "TextOperationError",
+    "apply_text_operations",
+    "source_version",
     "file_service_instance",
     "auto_sync_enabled",
 ]
\ No newline at end of file
@@ -0,0 +1,239 @@
+"""Bulk writes of in-memory files to the database.
+
+Files are written with the dialect's native upsert, ``INSERT ... ON CONFLICT (id)
+DO UPDATE``, executed through Core in chunks: one executemany per chunk, and no
+row is read back or loaded into the ORM identity map first. The upsert never
+changes who owns a row or when it was created. Files that have no row yet are
+written with :func:`insert_files` instead, a plain INSERT that fails if their id
+is taken, and edits of existing rows can also be written with
+:func:`update_files`, which never inserts. Either way, the derived metadata
+columns are only re-extracted for files whose source changed since the database
+last got metadata for it (see ``FileData.metadata_digest``).
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...logging_config import get_logger
+from ...models.models import File as DbFile
+from ..file_metadata import metadata_columns, source_digest
+from .models import FileData
+
+
+logger = get_logger(__name__)
+
+# Dialects with INSERT ... ON CONFLICT, by name
+UPSERT_INSERTS: Dict[str, Callable] = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+# Columns of the files table that the in-memory file service owns
+FILE_COLUMNS = (
+    "title", "abstract", "source", "owner_id", "status", "created_at", "last_edited_at", "deleted_at",
+)
+METADATA_COLUMNS = ("derived_title", "derived_abstract", "outline", "derived_source_hash")
+# Columns an upsert overwrites on an existing row
+UPSERT_COLUMNS = ("title", "abstract", "source", "status", "last_edited_at", "deleted_at")
+# Columns an edit can change
+EDIT_COLUMNS = ("title", "abstract", "source", "status", "last_edited_at")
+
+
+def supports_bulk_upsert(db: AsyncSession) -> bool:
+    """Whether the database behind ``db`` supports :func:`upsert_files`."""
+    return db.get_bind().dialect.name in UPSERT_INSERTS
+
+
+def _upsert(dialect_insert: Callable, columns: Tuple[str, ...]):
+    statement = dialect_insert(DbFile.__table__)
+    return statement.on_conflict_do_update(
+        index_elements=[DbFile.__table__.c.id],
+        set_={column: statement.excluded[column] for column in columns},
+    )
+
+
+def _row(file_data: FileData, columns: Tuple[str, ...] = FILE_COLUMNS) -> Dict[str, Any]:
+    return {"id": file_data.id, **{column: getattr(file_data, column) for column in columns}}
+
+
+async def _extract_metadata(
+    files: List[FileData], rows: List[Dict[str, Any]], concurrency: int
+) -> None:
+    """Add the derived metadata columns to each row, parsing ``concurrency`` sources at a time."""
+    for i in range(0, len(rows), concurrency):
+        batch = list(zip(files[i:i + concurrency], rows[i:i + concurrency]))
+        columns = await asyncio.gather(*(metadata_columns(row["id"], row["source"]) for _, row in batch))
+        for (file_data, row), values in zip(batch, columns):
+            # Without metadata the row is written with none, and readers parse its source
+            row.update(values or dict.fromkeys(METADATA_COLUMNS))
+            if values is None or file_data.source != row["source"]:
+                continue
+            if not file_data.title:
+                cache = file_data.cache()
+                if cache.title is None:
+                    cache.title = values["derived_title"] or ""
+
+
+async def _split_by_metadata(
+    files: Sequence[FileData], rows: List[Dict[str, Any]], concurrency: int
+) -> Tuple[List[Dict[str, Any]], List[FileData], List[Dict[str, Any]]]:
+    """Split rows into those whose metadata is current and those that now carry fresh metadata.
+
+    Returns the current rows, and the files and rows whose metadata was extracted.
+    """
+    current: List[Dict[str, Any]] = []
+    stale_files: List[FileData] = []
+    stale: List[Dict[str, Any]] = []
+    for file_data, row in zip(files, rows):
+        if file_data.metadata_digest is not None and file_data.metadata_digest == source_digest(row["source"]):
+            current.append(row)
+        else:
+            stale_files.append(file_data)
+            stale.append(row)
+    await _extract_metadata(stale_files, stale, concurrency)
+    return current, stale_files, stale
+
+
+def _record_metadata(files: List[FileData], rows: List[Dict[str, Any]]) -> None:
+    """Remember which source the metadata written for each file was extracted from."""
+    for file_data, row in zip(files, rows):
+        file_data.metadata_digest = row["derived_source_hash"]
+
+
+async def upsert_files(
+    db: AsyncSession,
+    files: Sequence[FileData],
+    chunk_size: int = 1000,
+    metadata_concurrency: int = 32,
+) -> int:
+    """Insert or update the rows of ``files`` in chunked native upserts.
+
+    The caller commits. Each file is read when its chunk is written, so a chunk
+    always holds the latest state of its files. Rows that already exist keep
+    their ``owner_id`` and ``created_at``.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Database session on a PostgreSQL or SQLite database.
+    files : sequence of FileData
+        The files to write.
+    chunk_size : int, optional
+        Rows per executemany (default: 1000).
+    metadata_concurrency : int, optional
+        Sources parsed concurrently for their derived metadata (default: 32). Keep
+        this below the render engine's queue size.
+
+    Returns
+    -------
+    int
+        Number of rows written.
+
+    Raises
+    ------
+    NotImplementedError
+        If the database has no native upsert; see :func:`supports_bulk_upsert`.
+    """
+    dialect = db.get_bind().dialect.name
+    upsert_insert: Optional[Callable] = UPSERT_INSERTS.get(dialect)
+    if upsert_insert is None:
+        raise NotImplementedError(f"No bulk upsert for {dialect}")
+    keep_metadata = _upsert(upsert_insert, UPSERT_COLUMNS)
+    with_metadata = _upsert(upsert_insert, UPSERT_COLUMNS + METADATA_COLUMNS)
+
+    written = 0
+    for i in range(0, len(files), chunk_size):
+        chunk = files[i:i + chunk_size]
+        rows = [_row(file_data) for file_data in chunk]
+        current, stale_files, stale = await _split_by_metadata(chunk, rows, metadata_concurrency)
+        if current:
+            await db.execute(keep_metadata, current)
+        if stale:
+            await db.execute(with_metadata, stale)
+        _record_metadata(stale_files, stale)
+        written += len(rows)
+
+    logger.debug(f"Upserted {written} files")
+    return written
+
+
+async def insert_files(
+    db: AsyncSession,
+    files: Sequence[FileData],
+    chunk_size: int = 1000,
+    metadata_concurrency: int = 32,
+) -> int:
+    """Insert rows for files that are not in the database yet, in chunked executemany INSERTs.
+
+    Unlike :func:`upsert_files`, an id that is already taken is an error rather
+    than an update of someone else's row. The caller commits, or rolls back on
+    error.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Database session.
+    files : sequence of FileData
+        The files to write.
+    chunk_size : int, optional
+        Rows per executemany (default: 1000).
+    metadata_concurrency : int, optional
+        Sources parsed concurrently for their derived metadata (default: 32).
+
+    Returns
+    -------
+    int
+        Number of rows written.
+
+    Raises
+    ------
+    sqlalchemy.exc.IntegrityError
+        If a row with the id of one of the files exists.
+    """
+    written = 0
+    for i in range(0, len(files), chunk_size):
+        chunk = files[i:i + chunk_size]
+        rows = [_row(file_data) for file_data in chunk]
+        await _extract_metadata(list(chunk), rows, metadata_concurrency)
+        await db.execute(insert(DbFile), rows)
+        _record_metadata(list(chunk), rows)
+        written += len(rows)
+
+    logger.debug(f"Inserted {written} files")
+    return written
+
+
+async def update_files(
+    db: AsyncSession, files: Sequence[FileData], metadata_concurrency: int = 32
+) -> int:
+    """Write the edited columns of existing rows in one executemany UPDATE per kind of row.
+
+    Unlike :func:`upsert_files`, rows that were deleted from the database are not
+    recreated, and ownership and deletion columns are left alone. The caller commits.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Database session.
+    files : sequence of FileData
+        The files to write; they are read once, before the first await.
+    metadata_concurrency : int, optional
+        Sources parsed concurrently for their derived metadata (default: 32).
+
+    Returns
+    -------
+    int
+        Number of rows written.
+    """
+    rows = [_row(file_data, EDIT_COLUMNS) for file_data in files]
+    current, stale_files, stale = await _split_by_metadata(files, rows, metadata_concurrency)
+    if current:
+        await db.execute(update(DbFile), current)
+    if stale:
+        await db.execute(update(DbFile), stale)
+    _record_metadata(stale_files, stale)
+    return len(rows)
@@ -5,9 +5,10 @@ while maintaining consistent API for file operations.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Callable, List, Optional, Sequence
 
 from .models import FileCreateData, FileData, FileUpdateData
+from .text_ops import TextOperation
 
 
 class FileServiceInterface(ABC):
@@ -52,11 +53,13 @@ class FileServiceInterface(ABC):
         pass
     
     @abstractmethod
-    async def create_file(self, data: FileCreateData) -> FileData:
+    async def create_file(self, data: FileCreateData, db=None) -> FileData:
         """Create a new file.
         
         Args:
             data: File creation data
+            db: Optional database session; if given, the file is inserted right
+                away and the database allocates its ID
             
         Returns:
             Created FileData object with assigned ID
@@ -76,6 +79,31 @@ class FileServiceInterface(ABC):
         """
         pass
     
+    @abstractmethod
+    async def patch_file_source(
+        self,
+        file_id: int,
+        base_version: str,
+        operations: Sequence[TextOperation],
+        validate: Optional[Callable[[str], Any]] = None,
+    ) -> Optional[FileData]:
+        """Apply text operations to a file's source if it is still at a base version.
+        
+        Args:
+            file_id: Unique identifier of the file to edit
+            base_version: Version of the source the operations were computed against
+            operations: Sorted, non-overlapping operations against the base version
+            validate: Optional check of the edited source; raise to reject it
+            
+        Returns:
+            Edited FileData if file exists, None otherwise
+            
+        Raises:
+            SourceConflictError: If the source is no longer at the base version
+            TextOperationError: If the operations do not fit the base source
+        """
+        pass
+    
     @abstractmethod
     async def delete_file(self, file_id: int) -> bool:
         """Soft delete a file.
@@ -89,11 +117,12 @@ class FileServiceInterface(ABC):
         pass
     
     @abstractmethod
-    async def duplicate_file(self, file_id: int) -> Optional[FileData]:
+    async def duplicate_file(self, file_id: int, db=None) -> Optional[FileData]:
         """Create a duplicate of an existing file.
         
         Args:
             file_id: Unique identifier of the file to duplicate
+            db: Optional database session to insert the copy with
             
         Returns:
             New FileData object if original exists, None otherwise
@@ -127,6 +156,23 @@ class FileServiceInterface(ABC):
         """
         pass
     
+    @abstractmethod
+    async def get_content_etag(
+        self, file_id: int, db=None, section_name: Optional[str] = None, handrails: bool = True
+    ) -> Optional[str]:
+        """Get a strong ETag for a file's rendered HTML without rendering it.
+        
+        Args:
+            file_id: Unique identifier of the file
+            db: Optional database session; pass it iff the HTML is rendered with assets
+            section_name: Name of the section, or None for the whole document
+            handrails: Whether the section includes navigation handrails
+            
+        Returns:
+            Quoted ETag if file exists, None otherwise
+        """
+        pass
+    
     @abstractmethod
     async def get_file_title(self, file_id: int) -> Optional[str]:
         """Get the title for a file, extracted from RSM if needed.
@@ -140,20 +186,34 @@ class FileServiceInterface(ABC):
         pass
     
     @abstractmethod
-    async def sync_from_database(self, db) -> None:
-        """Load all files from database into memory.
+    async def invalidate_file_assets(self, file_id: int) -> None:
+        """Drop cached renders of a file that depend on its assets.
+        
+        Args:
+            file_id: Unique identifier of the file whose assets changed
+        """
+        pass
+    
+    @abstractmethod
+    async def sync_from_database(self, db, full: bool = False) -> None:
+        """Load files from database into memory.
+        
+        Implementations may sync incrementally, fetching only rows changed since
+        the previous sync, or only rows other workers announced as changed.
         
         Args:
             db: Database session
+            full: Force a full reload of every file
         """
         pass
     
     @abstractmethod
-    async def sync_to_database(self, db) -> None:
-        """Save all in-memory files to database.
+    async def sync_to_database(self, db, full: bool = False) -> None:
+        """Save in-memory files changed since they were last written to database.
         
         Args:
             db: Database session
+            full: Write every file, changed or not
         """
         pass
     
@@ -183,6 +243,19 @@ class FileServiceInterface(ABC):
         """
         pass
     
+    @abstractmethod
+    async def update_source_in_database(self, file_id: int, db) -> bool:
+        """Write only a file's source and edit time to the database.
+        
+        Args:
+            file_id: Unique identifier of the file
+            db: Database session
+            
+        Returns:
+            True if updated successfully, False otherwise
+        """
+        pass
+    
     @abstractmethod
     async def delete_file_in_database(self, file_id: int, db) -> bool:
         """Soft delete a specific file in database.
@@ -0,0 +1,238 @@
+"""Invalidation bus keeping the file services of several workers coherent.
+
+Each worker process holds its own :class:`InMemoryFileService`. After a worker
+commits a change to a file, it publishes an :class:`InvalidationEvent`, and every
+other worker reloads just that file on its next sync instead of scanning the files
+table on every request.
+
+:class:`PostgresInvalidationBus` delivers events with LISTEN/NOTIFY.
+:class:`LocalInvalidationBus` connects the services of a single process, for tests
+and for databases without notifications.
+"""
+
+import asyncio
+import json
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from ...logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+# PostgreSQL notification channel
+CHANNEL = "aris_file_invalidation"
+
+# Events per notification, keeping payloads well below PostgreSQL's 8000 byte limit
+EVENTS_PER_NOTIFICATION = 100
+
+
+class InvalidationEvent(NamedTuple):
+    """A committed change to a file."""
+
+    file_id: int
+    version: Optional[str]
+    """Version of the file's source after the change, or None if it was deleted."""
+
+    kind: str = "file"
+    """``"file"`` for changes to the row, ``"assets"`` for changes to its assets."""
+
+
+Handler = Callable[[InvalidationEvent], None]
+
+
+def dumps(origin: str, events: Sequence[InvalidationEvent]) -> str:
+    """Serialize events published by ``origin`` into a notification payload."""
+    return json.dumps({"origin": origin, "events": [list(event) for event in events]})
+
+
+def loads(payload: str) -> Tuple[str, List[InvalidationEvent]]:
+    """Inverse of :func:`dumps`."""
+    data = json.loads(payload)
+    return data["origin"], [InvalidationEvent(*event) for event in data["events"]]
+
+
+class InvalidationBus(ABC):
+    """Deliver the events published by each subscriber to every other subscriber.
+
+    Delivery is best effort. ``epoch`` changes whenever events may have been missed:
+    when the bus starts listening and whenever it reconnects. Subscribers must then
+    catch up from the database before relying on the bus again.
+    """
+
+    def __init__(self) -> None:
+        self.origin = uuid.uuid4().hex
+        self.epoch = 0
+        self._handler: Optional[Handler] = None
+
+    @property
+    @abstractmethod
+    def listening(self) -> bool:
+        """Whether events published by others are currently being delivered."""
+
+    @abstractmethod
+    async def start(self, handler: Handler) -> None:
+        """Start delivering events published by others to ``handler``."""
+
+    @abstractmethod
+    async def publish(self, events: Sequence[InvalidationEvent]) -> None:
+        """Deliver ``events`` to every other subscriber."""
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Stop delivering events."""
+
+    def _deliver(self, origin: str, events: Sequence[InvalidationEvent]) -> None:
+        if origin == self.origin or self._handler is None:
+            return
+        for event in events:
+            try:
+                self._handler(event)
+            except Exception as e:
+                logger.error(f"Failed to handle invalidation of file {event.file_id}: {e}")
+
+
+# Subscribers of LocalInvalidationBus instances that do not bring their own
+_local_subscribers: Set["LocalInvalidationBus"] = set()
+
+
+class LocalInvalidationBus(InvalidationBus):
+    """Invalidation bus between the file services of one process.
+
+    Args:
+        subscribers: Buses that see each other's events; defaults to every local bus
+            in the process.
+    """
+
+    def __init__(self, subscribers: Optional[Set["LocalInvalidationBus"]] = None):
+        super().__init__()
+        self.subscribers = _local_subscribers if subscribers is None else subscribers
+
+    @property
+    def listening(self) -> bool:
+        return self in self.subscribers
+
+    async def start(self, handler: Handler) -> None:
+        self._handler = handler
+        self.subscribers.add(self)
+        self.epoch += 1
+
+    async def publish(self, events: Sequence[InvalidationEvent]) -> None:
+        for bus in list(self.subscribers):
+            bus._deliver(self.origin, events)
+
+    async def stop(self) -> None:
+        self.subscribers.discard(self)
+
+
+class PostgresInvalidationBus(InvalidationBus):
+    """Invalidation bus over PostgreSQL LISTEN/NOTIFY.
+
+    Listens on a dedicated asyncpg connection, which must not go through a
+    transaction-pooling proxy. If the connection drops, it is re-established every
+    ``reconnect_delay`` seconds; events published meanwhile are sent once it is back.
+
+    Args:
+        dsn: libpq connection string or ``postgresql://`` URL.
+        reconnect_delay: Seconds between reconnection attempts.
+    """
+
+    def __init__(self, dsn: str, reconnect_delay: float = 1.0):
+        super().__init__()
+        self.dsn = dsn
+        self.reconnect_delay = reconnect_delay
+        self._connection: Optional[Any] = None  # asyncpg.Connection
+        self._connection_lock = asyncio.Lock()
+        self._backlog: List[str] = []
+        self._reconnecting: Optional[asyncio.Task] = None
+        self._stopped = False
+
+    @property
+    def listening(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def start(self, handler: Handler) -> None:
+        self._handler = handler
+        self._stopped = False
+        await self._connect()
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        connection = await asyncpg.connect(self.dsn)
+        await connection.add_listener(CHANNEL, self._on_notification)
+        connection.add_termination_listener(self._on_termination)
+        self._connection = connection
+        self.epoch += 1
+        logger.info("Listening for file invalidations")
+        await self._send_backlog()
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            origin, events = loads(payload)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Ignoring malformed invalidation payload: {e}")
+            return
+        self._deliver(origin, events)
+
+    def _on_termination(self, connection) -> None:
+        if connection is not self._connection:
+            return
+        self._connection = None
+        if not self._stopped:
+            logger.warning("Lost the file invalidation connection, reconnecting")
+            self._reconnecting = asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        while not self._stopped and not self.listening:
+            try:
+                await self._connect()
+            except Exception as e:
+                logger.warning(f"Failed to reconnect for file invalidations: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def publish(self, events: Sequence[InvalidationEvent]) -> None:
+        for i in range(0, len(events), EVENTS_PER_NOTIFICATION):
+            self._backlog.append(dumps(self.origin, events[i:i + EVENTS_PER_NOTIFICATION]))
+        await self._send_backlog()
+
+    async def _send_backlog(self) -> None:
+        async with self._connection_lock:
+            while self._backlog:
+                connection = self._connection
+                if connection is None or connection.is_closed():
+                    return
+                try:
+                    await connection.execute("SELECT pg_notify($1, $2)", CHANNEL, self._backlog[0])
+                except Exception as e:
+                    logger.warning(f"Deferring file invalidations until reconnected: {e}")
+                    return
+                self._backlog.pop(0)
+
+    async def stop(self) -> None:
+        self._stopped = True
+        if self._reconnecting is not None:
+            self._reconnecting.cancel()
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            await connection.close()
+
+
+def create_invalidation_bus(kind: str, dsn: str = "") -> Optional[InvalidationBus]:
+    """Build the invalidation bus named by the ``FILE_INVALIDATION_BUS`` setting.
+
+    Args:
+        kind: ``"postgres"``, ``"local"``, or empty for none.
+        dsn: Connection string for the PostgreSQL bus.
+
+    Returns:
+        The bus, or None if ``kind`` is empty.
+    """
+    if not kind:
+        return None
+    if kind == "local":
+        return LocalInvalidationBus()
+    if kind == "postgres":
+        return PostgresInvalidationBus(dsn)
+    raise ValueError(f"Unknown FILE_INVALIDATION_BUS: {kind!r}")
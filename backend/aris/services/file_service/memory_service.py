@@ -1,26 +1,73 @@
 """In-memory file service implementation."""
 
 import asyncio
-from datetime import UTC, datetime
-from typing import Any, Dict, List, Optional, Set
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, cast
 
-import rsm
-from bs4 import BeautifulSoup
-from sqlalchemy import select
+from sqlalchemy import Select, func, or_, select, update
 from sqlalchemy.engine import Result
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ...config import settings
 from ...logging_config import get_logger
 from ...models.models import File as DbFile
+from ...models.models import FileAsset
+from ..asset_resolver import FileAssetResolver, file_assets_digest, invalidate_asset_bundle
+from ..file_metadata import metadata_columns, persisted_title, refresh_file_metadata
+from ..render_cache import render_key
+from ..render_engine import IndexedHTML, RenderEngineError, get_render_engine
+from .bulk import insert_files, supports_bulk_upsert, upsert_files
 from .interface import FileServiceInterface
+from .invalidation import InvalidationBus, InvalidationEvent
 from .models import FileCreateData, FileData, FileUpdateData
+from .single_flight import SingleFlight
+from .text_ops import SourceConflictError, TextOperation, apply_text_operations, source_version
+from .write_behind import WriteBehindQueue
 
 
 logger = get_logger(__name__)
 
 
+def _as_utc(timestamp: Optional[datetime]) -> Optional[datetime]:
+    """Attach UTC to the naive datetimes SQLite hands back; everything is stored as UTC."""
+    if timestamp is not None and timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=UTC)
+    return timestamp
+
+
 class InMemoryFileService(FileServiceInterface):
-    """In-memory implementation of file service."""
+    """In-memory implementation of file service.
+    
+    Concurrency model: ``self._lock`` only guards structural changes to the file
+    indexes (creating files, syncing from the database). Mutations of a single
+    file take that file's own lock, so edits to different documents never wait on
+    each other. Reads take no lock at all: they run between awaits on the event
+    loop and therefore always observe a consistent snapshot of the indexes. Renders
+    run without holding any lock and only cache their output if the source they
+    rendered is still current. Concurrent cache misses for the same document and
+    source share a single render through ``self._renders``.
+    
+    With write-behind enabled (see :meth:`start_write_behind`), edits are written
+    to the database by a background :class:`WriteBehindQueue` instead of on the
+    request path, and syncs keep the in-memory state of files still waiting to be
+    written.
+    
+    With an invalidation bus attached (see :meth:`attach_invalidation_bus`), every
+    committed write is announced to the services of the other workers, and syncs
+    from the database only reload the files others announced.
+    """
+    
+    # Rows edited within this window before the high-water mark are re-read on every
+    # incremental sync. This absorbs coarse timestamp precision (SQLite's
+    # CURRENT_TIMESTAMP has one-second resolution) and commits that land slightly
+    # after the timestamp they were stamped with.
+    SYNC_OVERLAP = timedelta(seconds=2)
+    
+    # Counting the live rows to detect drift scans the whole table, so incremental
+    # syncs do it at most this often.
+    DRIFT_CHECK_INTERVAL = timedelta(seconds=60)
     
     def __init__(self):
         """Initialize the in-memory file service."""
@@ -29,6 +76,20 @@ class InMemoryFileService(FileServiceInterface):
         self._next_id: int = 1
         self._lock = asyncio.Lock()
         self._initialized = False
+        self._synced = False
+        self._high_water_mark: Optional[datetime] = None
+        self._drift_checked_at: Optional[float] = None  # time.monotonic() of the last drift check
+        self._deleted_ids: Set[int] = set()  # soft deleted in memory, still indexed
+        self._asset_high_water_mark: Optional[datetime] = None
+        self._seen_asset_changes: Dict[int, datetime] = {}  # asset_id -> updated_at within overlap
+        self._file_locks: Dict[int, asyncio.Lock] = {}
+        self._renders = SingleFlight()
+        self._write_behind: Optional[WriteBehindQueue] = None
+        self._unsaved: Set[int] = set()  # changed in memory since last written to the database
+        self._new_ids: Set[int] = set()  # created in memory, no row in the database yet
+        self._bus: Optional[InvalidationBus] = None
+        self._bus_epoch: Optional[int] = None  # bus epoch when memory last caught up with the database
+        self._stale_ids: Set[int] = set()  # announced by other workers since the last sync
     
     async def initialize(self) -> None:
         """Initialize the service."""
@@ -37,35 +98,169 @@ class InMemoryFileService(FileServiceInterface):
                 logger.debug("Initializing InMemoryFileService")
                 self._initialized = True
     
+    def start_write_behind(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        interval: float = 2.0,
+        max_dirty: int = 100,
+    ) -> WriteBehindQueue:
+        """Persist edits from a background task from now on.
+        
+        Parameters
+        ----------
+        session_factory : callable
+            Creates the database sessions the background task writes with.
+        interval : float, optional
+            Longest time in seconds an edit waits in memory (default: 2.0).
+        max_dirty : int, optional
+            Edited files that trigger an early write (default: 100).
+        
+        Returns
+        -------
+        WriteBehindQueue
+            The started queue.
+        """
+        if self._write_behind is None:
+            self._write_behind = WriteBehindQueue(
+                self._get_live_file, session_factory, interval, max_dirty, on_written=self._publish_files
+            )
+        self._write_behind.start()
+        return self._write_behind
+    
+    async def stop_write_behind(self) -> None:
+        """Write every pending edit and go back to persisting on the request path."""
+        if self._write_behind is not None:
+            queue, self._write_behind = self._write_behind, None
+            await queue.stop()
+    
+    def get_write_behind_stats(self) -> Optional[Dict[str, Any]]:
+        """Return the dirty-queue depth and flush statistics, or None if write-behind is off."""
+        if self._write_behind is None:
+            return None
+        return {"dirty": self._write_behind.depth(), **self._write_behind.stats.as_dict()}
+    
+    def _schedule_write(self, file_id: int) -> bool:
+        """Mark a live file for the write-behind queue."""
+        write_behind = self._write_behind
+        if write_behind is None or not self._get_live_file(file_id):
+            return False
+        write_behind.mark_dirty(file_id)
+        return True
+    
+    def _is_write_pending(self, file_id: int) -> bool:
+        """Whether the in-memory state of a file is ahead of the database."""
+        return self._write_behind is not None and self._write_behind.is_pending(file_id)
+    
+    async def attach_invalidation_bus(self, bus: InvalidationBus) -> None:
+        """Exchange invalidations of committed writes with other workers through ``bus``.
+        
+        Once memory has caught up with the database, syncs only reload the files
+        other workers announced, as long as the bus keeps listening without gaps.
+        Otherwise syncs fall back to reading the change feed of the database.
+        
+        Parameters
+        ----------
+        bus : InvalidationBus
+            The bus to publish to and listen on.
+        """
+        await self.detach_invalidation_bus()
+        self._bus = bus
+        await bus.start(self._on_invalidation)
+    
+    async def detach_invalidation_bus(self) -> None:
+        """Stop exchanging invalidations and go back to reading the change feed on every sync."""
+        if self._bus is not None:
+            bus, self._bus = self._bus, None
+            self._bus_epoch = None
+            await bus.stop()
+    
+    def _on_invalidation(self, event: InvalidationEvent) -> None:
+        """Handle a write committed by another worker."""
+        if event.kind == "assets":
+            self._invalidate_assets(event.file_id)
+            return
+        # Title or status edits leave the source version unchanged, so always reload
+        # the row; an unchanged source keeps its caches when the row is applied.
+        logger.debug(f"File {event.file_id} changed elsewhere (source version {event.version})")
+        self._stale_ids.add(event.file_id)
+    
+    async def _publish_files(self, file_ids: Sequence[int]) -> None:
+        """Announce that the current state of some files was committed."""
+        if self._bus is None or not file_ids:
+            return
+        events = []
+        for file_id in file_ids:
+            file_data = self._get_live_file(file_id)
+            version = source_version(file_data.source) if file_data is not None else None
+            events.append(InvalidationEvent(file_id, version))
+        await self._publish(events)
+    
+    async def _publish(self, events: Sequence[InvalidationEvent]) -> None:
+        bus = self._bus
+        if bus is None:
+            return
+        try:
+            await bus.publish(events)
+        except Exception as e:
+            logger.error(f"Failed to publish invalidation of {len(events)} files: {e}")
+    
+    def _file_lock(self, file_id: int) -> asyncio.Lock:
+        """Return the lock serializing mutations of a single file."""
+        lock = self._file_locks.get(file_id)
+        if lock is None:
+            lock = self._file_locks[file_id] = asyncio.Lock()
+        return lock
+    
+    def _get_live_file(self, file_id: int) -> Optional[FileData]:
+        """Return the file if it exists and is not soft deleted."""
+        file_data = self._files.get(file_id)
+        if file_data and not file_data.is_deleted():
+            return file_data
+        return None
+    
     async def get_file(self, file_id: int) -> Optional[FileData]:
         """Get a single file by ID."""
-        async with self._lock:
-            file_data = self._files.get(file_id)
-            if file_data and not file_data.is_deleted():
-                return file_data
-            return None
+        return self._get_live_file(file_id)
     
     async def get_user_files(self, user_id: int) -> List[FileData]:
         """Get all files owned by a specific user."""
-        async with self._lock:
-            file_ids = self._user_files.get(user_id, set())
-            files = []
-            for file_id in file_ids:
-                file_data = self._files.get(file_id)
-                if file_data and not file_data.is_deleted():
-                    files.append(file_data)
-            return files
+        files = []
+        for file_id in tuple(self._user_files.get(user_id, ())):
+            file_data = self._get_live_file(file_id)
+            if file_data:
+                files.append(file_data)
+        return files
     
     async def get_all_files(self) -> List[FileData]:
         """Get all files in the system."""
-        async with self._lock:
-            return [
-                file_data for file_data in self._files.values()
-                if not file_data.is_deleted()
-            ]
+        return [
+            file_data for file_data in tuple(self._files.values())
+            if not file_data.is_deleted()
+        ]
     
-    async def create_file(self, data: FileCreateData) -> FileData:
-        """Create a new file."""
+    async def create_file(self, data: FileCreateData, db: Optional[AsyncSession] = None) -> FileData:
+        """Create a new file.
+        
+        With ``db``, the row is inserted and committed first and the database
+        allocates the id, so files created by different workers never share one.
+        Without it, the file only exists in memory until it is saved, under an id
+        allocated from memory, and saving it fails if that id was taken meanwhile.
+        
+        Parameters
+        ----------
+        data : FileCreateData
+            File creation data.
+        db : AsyncSession, optional
+            Database session to insert the row with.
+            
+        Returns
+        -------
+        FileData
+            The created file.
+        """
+        if db is not None:
+            return await self._insert_file(data, db)
+        
         async with self._lock:
             now = datetime.now(UTC)
             
@@ -93,14 +288,48 @@ class InMemoryFileService(FileServiceInterface):
             # Increment ID for next file
             self._next_id += 1
             
+            self._unsaved.add(file_data.id)
+            self._new_ids.add(file_data.id)
             logger.debug(f"Created file {file_data.id} for user {data.owner_id}")
             return file_data
     
+    async def _insert_file(self, data: FileCreateData, db: AsyncSession) -> FileData:
+        """Insert a row for a new file and keep it in memory under the id the database chose."""
+        now = datetime.now(UTC)
+        db_file = DbFile(
+            title=data.title,
+            abstract=data.abstract,
+            source=data.source,
+            owner_id=data.owner_id,
+            status=data.status,
+            created_at=now,
+            last_edited_at=now,
+        )
+        await refresh_file_metadata(db_file)
+        async with self._lock:
+            file_id: Optional[int] = None
+            try:
+                db.add(db_file)
+                await db.flush()
+                file_id = cast(int, db_file.id)
+                file_data = self._apply_db_file(db_file, None)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                if file_id is not None:
+                    self._forget_file(file_id)
+                raise
+            self._next_id = max(self._next_id, file_data.id + 1)
+        
+        logger.debug(f"Created file {file_data.id} for user {data.owner_id}")
+        await self._publish_files([file_data.id])
+        return file_data
+    
     async def update_file(self, file_id: int, updates: FileUpdateData) -> Optional[FileData]:
         """Update an existing file."""
-        async with self._lock:
-            file_data = self._files.get(file_id)
-            if not file_data or file_data.is_deleted():
+        async with self._file_lock(file_id):
+            file_data = self._get_live_file(file_id)
+            if not file_data:
                 return None
             
             if not updates.has_updates():
@@ -121,41 +350,95 @@ class InMemoryFileService(FileServiceInterface):
             # Update last edited timestamp
             file_data.last_edited_at = datetime.now(UTC)
             
+            self._unsaved.add(file_id)
             logger.debug(f"Updated file {file_id}")
             return file_data
     
+    async def patch_file_source(
+        self,
+        file_id: int,
+        base_version: str,
+        operations: Sequence[TextOperation],
+        validate: Optional[Callable[[str], Any]] = None,
+    ) -> Optional[FileData]:
+        """Apply text operations to a file's source if it is still at ``base_version``.
+        
+        Parameters
+        ----------
+        file_id : int
+            The ID of the file to edit.
+        base_version : str
+            :func:`source_version` of the source the operations were computed against.
+        operations : sequence of TextOperation
+            The edit, see :func:`apply_text_operations`.
+        validate : callable, optional
+            Called with the edited source before it is stored; raise to reject it.
+        
+        Returns
+        -------
+        FileData or None
+            The edited file, or None if it does not exist.
+        
+        Raises
+        ------
+        SourceConflictError
+            If the source is no longer at ``base_version``.
+        TextOperationError
+            If the operations do not fit the base source.
+        """
+        async with self._file_lock(file_id):
+            file_data = self._get_live_file(file_id)
+            if not file_data:
+                return None
+            
+            current_version = source_version(file_data.source)
+            if current_version != base_version:
+                raise SourceConflictError(current_version)
+            source = apply_text_operations(file_data.source, operations)
+            if validate is not None:
+                validate(source)
+            
+            if source != file_data.source:
+                file_data.source = source
+                file_data.clear_cache()
+            file_data.last_edited_at = datetime.now(UTC)
+            
+            self._unsaved.add(file_id)
+            logger.debug(f"Patched file {file_id} with {len(operations)} operations")
+            return file_data
+    
     async def delete_file(self, file_id: int) -> bool:
         """Soft delete a file."""
-        async with self._lock:
-            file_data = self._files.get(file_id)
-            if not file_data or file_data.is_deleted():
+        async with self._file_lock(file_id):
+            file_data = self._get_live_file(file_id)
+            if not file_data:
                 return False
             
             # Soft delete by setting timestamp
             file_data.deleted_at = datetime.now(UTC)
+            self._deleted_ids.add(file_id)
+            self._unsaved.add(file_id)
             
             logger.debug(f"Soft deleted file {file_id}")
             return True
     
-    async def duplicate_file(self, file_id: int) -> Optional[FileData]:
-        """Create a duplicate of an existing file."""
-        # First, check if original exists (without holding lock for create_file call)
-        async with self._lock:
-            original = self._files.get(file_id)
-            if not original or original.is_deleted():
-                return None
-            
-            # Create duplicate data
-            duplicate_data = FileCreateData(
-                title=f"{original.title} (copy)",
-                abstract=original.abstract,
-                source=original.source,
-                owner_id=original.owner_id,
-                status=original.status
-            )
+    async def duplicate_file(
+        self, file_id: int, db: Optional[AsyncSession] = None
+    ) -> Optional[FileData]:
+        """Create a duplicate of an existing file, inserting its row with ``db`` if given."""
+        original = self._get_live_file(file_id)
+        if not original:
+            return None
         
-        # Call create_file without holding the lock to avoid deadlock
-        return await self.create_file(duplicate_data)
+        # Create duplicate data
+        duplicate_data = FileCreateData(
+            title=f"{original.title} (copy)",
+            abstract=original.abstract,
+            source=original.source,
+            owner_id=original.owner_id,
+            status=original.status
+        )
+        return await self.create_file(duplicate_data, db)
     
     async def get_file_html(self, file_id: int, db: Optional[AsyncSession] = None) -> Optional[str]:
         """Get rendered HTML for a file's RSM content.
@@ -173,206 +456,639 @@ class InMemoryFileService(FileServiceInterface):
         Optional[str]
             Rendered HTML string, or None if file not found
         """
-        async with self._lock:
-            file_data = self._files.get(file_id)
-            if not file_data or file_data.is_deleted():
-                return None
-            
-            # Generate cache key based on whether we have database assets
-            cache_key = "html_with_assets" if db is not None else "html_no_assets"
-            
-            # Check cache first - use different cache for asset vs non-asset rendering
-            cached_html = getattr(file_data, f'_rendered_{cache_key}', None)
-            if cached_html is not None:
-                return str(cached_html)
+        file_data = self._get_live_file(file_id)
+        if not file_data:
+            return None
+        
+        # Check cache first - use different slots for asset vs non-asset rendering
+        with_assets = db is not None
+        cache = file_data.cache()
+        cached_html = cache.html_with_assets if with_assets else cache.html
+        if cached_html is not None:
+            return cached_html
+        
+        # No lock is held while rendering, so edits arriving meanwhile must not be
+        # shadowed by a stale cache entry: results are stored under the stamp they
+        # were computed for, and dropped if the file moved on in the meantime.
+        stamp = cache.stamp
+        # Each caller resolves assets with its own session; only the render, which
+        # touches no session, is shared between callers with the same assets.
+        asset_resolver = None
+        if db is not None:
+            asset_resolver = await FileAssetResolver.create_for_file(file_id, db, source=stamp.source)
+        assets = asset_resolver.digest() if asset_resolver is not None else None
+        rendered_html: str = await self._renders.do(
+            ("html", file_id, assets, stamp),
+            lambda: self._render_html(file_id, stamp.source, asset_resolver),
+        )
+        
+        # Cache the result
+        current = file_data.cache_for(stamp)
+        if current is not None:
+            if with_assets:
+                current.html_with_assets = rendered_html
+            else:
+                current.html = rendered_html
+        return rendered_html
+    
+    async def _render_html(
+        self, file_id: int, source: str, asset_resolver: Optional[FileAssetResolver]
+    ) -> str:
+        """Render RSM source to HTML with or without asset resolution."""
+        try:
+            if settings.RENDER_INCREMENTAL:
+                return await self._render_incremental(file_id, source, asset_resolver)
+            if asset_resolver is not None:
+                return await get_render_engine().render(source, handrails=True, asset_resolver=asset_resolver)
+            # Render without asset resolver (original behavior)
+            return await get_render_engine().render(source, handrails=True)
+        except RenderEngineError:
+            # Overload or timeout, not a problem with the source: don't cache a fallback
+            raise
+        except Exception as e:
+            logger.error(f"Failed to render RSM content for file {file_id}: {e}")
+            # Fallback to placeholder if rendering fails
+            return f"<p>Rendered: {source}</p>"
+    
+    async def _render_incremental(self, file_id: int, source: str, asset_resolver) -> str:
+        """Render RSM source, reusing the unchanged blocks of the file's previous render."""
+        file_data = self._files.get(file_id)
+        with_assets = asset_resolver is not None
+        previous = file_data.render_fragments.get(with_assets) if file_data else None
+        html, fragments = await get_render_engine().render_incremental(
+            source, handrails=True, asset_resolver=asset_resolver, fragments=previous
+        )
+        if file_data is not None:
+            # Fragments are addressed by content, so they are valid whatever the file's
+            # current source is
+            file_data.render_fragments[with_assets] = fragments
+        return html
+    
+    async def get_content_etag(
+        self,
+        file_id: int,
+        db: Optional[AsyncSession] = None,
+        section_name: Optional[str] = None,
+        handrails: bool = True,
+    ) -> Optional[str]:
+        """Get a strong ETag for rendered HTML, derived from everything the render depends on.
+        
+        The tag is the render cache key of the output: it changes with the source, the
+        assets, the handrails flag and the renderer version, and is identical across
+        processes for identical inputs.
+        
+        Parameters
+        ----------
+        file_id : int
+            The ID of the file
+        db : AsyncSession, optional
+            Database session, given iff the HTML is rendered with assets as by
+            ``get_file_html(file_id, db)``
+        section_name : str, optional
+            Section as passed to ``get_file_section``, or None for the whole document
+        handrails : bool
+            Handrails flag of the section
             
-            # Render RSM content with or without asset resolution
-            try:
-                if db is not None:
-                    # Render with database asset resolver
-                    from ..asset_resolver import FileAssetResolver
-                    asset_resolver = await FileAssetResolver.create_for_file(file_id, db)
-                    rendered_html = await asyncio.to_thread(rsm.render, file_data.source, handrails=True, asset_resolver=asset_resolver)
-                else:
-                    # Render without asset resolver (original behavior)
-                    rendered_html = await asyncio.to_thread(rsm.render, file_data.source, handrails=True)
-                
-                rendered_html = str(rendered_html)
-                
-                # Cache the result
-                setattr(file_data, f'_rendered_{cache_key}', rendered_html)
-                return rendered_html
-            except Exception as e:
-                logger.error(f"Failed to render RSM content for file {file_id}: {e}")
-                # Fallback to placeholder if rendering fails
-                fallback_html: str = f"<p>Rendered: {file_data.source}</p>"
-                setattr(file_data, f'_rendered_{cache_key}', fallback_html)
-                return fallback_html
+        Returns
+        -------
+        Optional[str]
+            Quoted ETag, or None if file not found
+        """
+        file_data = self._get_live_file(file_id)
+        if not file_data:
+            return None
+        if section_name is None:
+            kind = "content"
+            assets_digest = await file_assets_digest(file_id, db) if db is not None else ""
+        else:
+            kind, assets_digest = f"section:{section_name}", ""
+        return f'"{render_key(kind, file_data.source, handrails, assets_digest)}"'
     
     async def get_file_section(self, file_id: int, section_name: str, handrails: bool = True) -> Optional[str]:
-        """Get rendered HTML for a specific section of a file."""
-        async with self._lock:
-            file_data = self._files.get(file_id)
-            if not file_data or file_data.is_deleted():
-                return None
-            
-            # Check cache first
-            cache_key = f"{section_name}_{handrails}"
-            if cache_key in file_data._sections:
-                return file_data._sections[cache_key]
-            
-            # Extract and render section using actual RSM processing
-            try:
-                # Use RSM ProcessorApp to render the content with sections
-                app = rsm.app.ProcessorApp(plain=file_data.source, handrails=handrails)
-                await asyncio.to_thread(app.run)
-                html = app.translator.body
-                
-                # Use BeautifulSoup to extract the specific section
-                soup = BeautifulSoup(html, "lxml")
-                
-                # Try to find element by exact class match first
-                element = soup.find(attrs={"class": section_name})
-                if not element:
-                    # Try to find element that contains the section_name in its class list
-                    for elem in soup.find_all():
-                        if elem.get('class') and section_name in elem.get('class'):
-                            element = elem
-                            break
-                
-                section_html = str(element) if element else ""
-                
-                file_data._sections[cache_key] = section_html
-                return section_html
-            except Exception as e:
-                logger.error(f"Failed to extract section '{section_name}' for file {file_id}: {e}")
-                # Fallback to placeholder if extraction fails
-                section_html = f"<section>{section_name}: {file_data.source}</section>"
-                file_data._sections[cache_key] = section_html
-                return section_html
+        """Get rendered HTML for a specific section of a file.
+        
+        The body is rendered and indexed once per source and handrails flag; every
+        section is then a slice of that cached body.
+        """
+        file_data = self._get_live_file(file_id)
+        if not file_data:
+            return None
+        
+        # Check cache first
+        cache_key = f"{section_name}_{handrails}"
+        cache = file_data.cache()
+        if cache_key in cache.sections:
+            return cache.sections[cache_key]
+        
+        body = cache.bodies.get(handrails)
+        stamp = cache.stamp
+        if body is None:
+            body = await self._renders.do(
+                ("body", file_id, handrails, stamp),
+                lambda: self._render_indexed(file_id, stamp.source, handrails),
+            )
+        if body is None:
+            # Fallback to placeholder if rendering failed
+            section_html = f"<section>{section_name}: {stamp.source}</section>"
+        else:
+            section_html = body.section(section_name)
+        
+        current = file_data.cache_for(stamp)
+        if current is not None:
+            if body is not None:
+                current.bodies[handrails] = body
+            current.sections[cache_key] = section_html
+        return section_html
+    
+    async def _render_indexed(self, file_id: int, source: str, handrails: bool) -> Optional[IndexedHTML]:
+        """Render RSM source to body HTML indexed by section, or None if rendering fails."""
+        try:
+            return await get_render_engine().render_indexed(source, handrails=handrails)
+        except RenderEngineError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to render sections for file {file_id}: {e}")
+            return None
     
     async def get_file_title(self, file_id: int) -> Optional[str]:
         """Get the title for a file, extracted from RSM if needed."""
-        async with self._lock:
-            file_data = self._files.get(file_id)
-            if not file_data or file_data.is_deleted():
-                return None
-            
-            # If file has an explicit title, use it
-            if file_data.title:
-                return file_data.title
-            
-            # Check cache first
-            if file_data._extracted_title is not None:
-                return file_data._extracted_title
-            
-            # Extract title from RSM content
-            try:
-                app = rsm.app.ParserApp(plain=file_data.source)
-                await asyncio.to_thread(app.run)
-                extracted_title = str(app.transformer.tree.title) if app.transformer.tree.title else ""
-                file_data._extracted_title = extracted_title
-                return extracted_title
-            except Exception as e:
-                logger.error(f"Failed to extract title for file {file_id}: {e}")
-                # Fallback to empty string
-                file_data._extracted_title = ""
-                return ""
+        file_data = self._get_live_file(file_id)
+        if not file_data:
+            return None
+        
+        # If file has an explicit title, use it
+        if file_data.title:
+            return file_data.title
+        
+        # Check cache first
+        cache = file_data.cache()
+        if cache.title is not None:
+            return cache.title
+        
+        stamp = cache.stamp
+        extracted_title: str = await self._renders.do(
+            ("title", file_id, stamp),
+            lambda: self._extract_title(file_id, stamp.source),
+        )
+        
+        current = file_data.cache_for(stamp)
+        if current is not None:
+            current.title = extracted_title
+        return extracted_title
+    
+    async def _extract_title(self, file_id: int, source: str) -> str:
+        """Parse RSM source and return its title, or an empty string."""
+        # Extract title from RSM content
+        try:
+            return await get_render_engine().parse_title(source)
+        except RenderEngineError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to extract title for file {file_id}: {e}")
+            # Fallback to empty string
+            return ""
     
-    async def sync_from_database(self, db: AsyncSession) -> None:
-        """Load all files from database into memory."""
+    def get_render_stats(self) -> Dict[str, int]:
+        """Return render deduplication counters.
+        
+        Returns
+        -------
+        Dict[str, int]
+            ``executed`` renders that actually ran, ``coalesced`` requests that reused
+            a concurrent render of the same document and source, and ``in_flight``
+            renders currently running.
+        """
+        return {**self._renders.stats.as_dict(), "in_flight": self._renders.in_flight()}
+    
+    async def sync_from_database(self, db: AsyncSession, full: bool = False) -> None:
+        """Bring the in-memory state up to date with the database.
+
+        The first sync loads every non-deleted file. Later syncs are incremental: only
+        rows whose ``last_edited_at`` or ``deleted_at`` moved past the stored high-water
+        mark are fetched, and cached renders of files whose source did not change are
+        kept. A full reload happens when ``full`` is set, while no row has set the
+        high-water mark yet, or automatically when the number of live rows in the
+        database no longer matches memory (e.g. rows that were removed out of band).
+        That count is checked at most every ``DRIFT_CHECK_INTERVAL``. Asset rows are followed the same way through
+        ``file_assets.updated_at``, invalidating renders of files whose assets changed,
+        including changes made by other processes.
+
+        With a listening invalidation bus attached, once memory has caught up, syncs
+        only reload the rows other workers announced since the last sync. A single
+        aggregate query over the latest id and timestamps still guards against rows
+        changed without an announcement (e.g. by hand, or while a message was lost);
+        if it finds any, the sync falls back to an incremental one.
+
+        Parameters
+        ----------
+        db : AsyncSession
+            Database session to read from.
+        full : bool, optional
+            Force a full reload instead of an incremental sync (default: False).
+        """
         if db is None:
             logger.warning("Cannot sync from database: no database session provided")
             return
             
         async with self._lock:
-            logger.debug("Syncing files from database to memory")
-            
-            # Clear existing data
-            self._files.clear()
-            self._user_files.clear()
-            
-            # Load all non-deleted files from database
-            result: Result[Any] = await db.execute(select(DbFile).where(DbFile.deleted_at.is_(None)))
-            db_files = result.scalars().all()
-            
-            # Convert database files to in-memory format
-            max_id = 0
-            for db_file in db_files:
-                file_data = FileData(
-                    id=db_file.id,
-                    title=db_file.title or "",
-                    abstract=db_file.abstract or "",
-                    source=db_file.source or "",
-                    owner_id=db_file.owner_id,
-                    status=db_file.status,
-                    created_at=db_file.created_at,
-                    last_edited_at=db_file.last_edited_at,
-                    deleted_at=db_file.deleted_at
+            bus = self._bus
+            epoch = bus.epoch if bus is not None and bus.listening else None
+            if not full and self._synced and epoch is not None and epoch == self._bus_epoch:
+                if not await self._has_unannounced_changes(db):
+                    await self._refresh_stale_files(db)
+                    return
+                logger.debug("Rows changed without an announcement, syncing incrementally")
+            
+            # Announcements received from here on are not covered by this sync
+            self._stale_ids.clear()
+            if full or not self._synced or self._high_water_mark is None:
+                await self._full_sync_from_database(db)
+            else:
+                await self._incremental_sync_from_database(db)
+            await self._sync_asset_changes(db)
+            self._bus_epoch = epoch
+    
+    async def _has_unannounced_changes(self, db: AsyncSession) -> bool:
+        """Whether the database has rows newer than memory, read from the latest id and timestamps."""
+        result: Result[Any] = await db.execute(
+            select(func.max(DbFile.id), func.max(DbFile.last_edited_at), func.max(DbFile.deleted_at))
+        )
+        row: Any = result.one()
+        max_id, last_edited_at, deleted_at = row
+        if max_id is not None and max_id >= self._next_id:
+            return True
+        latest = max(
+            (timestamp for timestamp in (_as_utc(last_edited_at), _as_utc(deleted_at)) if timestamp),
+            default=None,
+        )
+        mark = self._high_water_mark
+        return latest is not None and (mark is None or latest > mark)
+    
+    async def _refresh_stale_files(self, db: AsyncSession) -> None:
+        """Reload the rows of the files other workers announced."""
+        if not self._stale_ids:
+            return
+        file_ids = sorted(self._stale_ids)
+        self._stale_ids.clear()
+        try:
+            result: Result[Any] = await db.execute(select(DbFile).where(DbFile.id.in_(file_ids)))
+        except BaseException:
+            self._stale_ids.update(file_ids)
+            raise
+        
+        found = set()
+        for db_file in result.scalars().all():
+            found.add(db_file.id)
+            if db_file.deleted_at is not None:
+                self._forget_file(db_file.id)
+            else:
+                self._apply_db_file(db_file, self._files.get(db_file.id))
+            self._next_id = max(self._next_id, db_file.id + 1)
+        for file_id in set(file_ids) - found:
+            self._forget_file(file_id)
+        
+        logger.debug(f"Reloaded {len(file_ids)} files announced by other workers")
+    
+    async def _full_sync_from_database(self, db: AsyncSession) -> None:
+        """Reload all non-deleted files, reusing cached data of unchanged files."""
+        logger.debug("Syncing files from database to memory")
+        
+        # Load all non-deleted files from database
+        result: Result[Any] = await db.execute(select(DbFile).where(DbFile.deleted_at.is_(None)))
+        db_files = result.scalars().all()
+        
+        previous = self._files
+        self._files = {}
+        self._user_files = {}
+        self._deleted_ids = set()
+        self._high_water_mark = None
+        self._asset_high_water_mark = None
+        self._seen_asset_changes = {}
+        
+        # Convert database files to in-memory format
+        max_id = 0
+        for db_file in db_files:
+            file_data = self._apply_db_file(db_file, previous.get(db_file.id))
+            if file_data is previous.get(db_file.id):
+                # Asset changes may have been missed along with whatever caused the reload
+                file_data.invalidate_assets()
+            max_id = max(max_id, db_file.id)
+        
+        # Files not written yet are ahead of the database, keep them
+        for file_id in self._unsaved:
+            file_data = previous.get(file_id)
+            if file_data is None or file_id in self._files:
+                continue
+            self._files[file_id] = file_data
+            self._user_files.setdefault(file_data.owner_id, set()).add(file_id)
+            if file_data.is_deleted():
+                self._deleted_ids.add(file_id)
+            max_id = max(max_id, file_id)
+        
+        # Set next ID to be one greater than max existing ID
+        self._next_id = max_id + 1
+        self._synced = True
+        self._drift_checked_at = time.monotonic()
+        
+        logger.debug(f"Loaded {len(db_files)} files from database")
+    
+    async def _incremental_sync_from_database(self, db: AsyncSession) -> None:
+        """Fetch only rows edited or deleted since the last sync."""
+        query = select(DbFile)
+        if self._high_water_mark is not None:
+            since = self._high_water_mark - self.SYNC_OVERLAP
+            query = query.where(
+                or_(DbFile.last_edited_at >= since, DbFile.deleted_at >= since)  # type: ignore[arg-type]
+            )
+        result: Result[Any] = await db.execute(query)
+        db_files = result.scalars().all()
+        
+        for db_file in db_files:
+            if db_file.deleted_at is not None:
+                self._forget_file(db_file.id)
+                self._advance_high_water_mark(db_file.deleted_at)
+            else:
+                self._apply_db_file(db_file, self._files.get(db_file.id))
+            self._next_id = max(self._next_id, db_file.id + 1)
+        
+        # Rows that disappear without a timestamp (hard deletes, a swapped database)
+        # never show up in the change feed; fall back to a full reload when the live
+        # row count tells us memory has drifted.
+        now = time.monotonic()
+        interval = self.DRIFT_CHECK_INTERVAL.total_seconds()
+        if self._drift_checked_at is None or now - self._drift_checked_at >= interval:
+            self._drift_checked_at = now
+            count_result: Result[Any] = await db.execute(
+                select(func.count(DbFile.id)).where(DbFile.deleted_at.is_(None))
+            )
+            live_in_db = count_result.scalar_one()
+            live_in_memory = len(self._files) - len(self._deleted_ids)
+            if live_in_db != live_in_memory:
+                logger.debug(
+                    f"Incremental sync drift ({live_in_db} rows in database, "
+                    f"{live_in_memory} in memory), doing a full reload"
                 )
-                
-                self._files[db_file.id] = file_data
-                
-                # Update user index
-                if db_file.owner_id not in self._user_files:
-                    self._user_files[db_file.owner_id] = set()
-                self._user_files[db_file.owner_id].add(db_file.id)
-                
-                # Track max ID for auto-increment
-                max_id = max(max_id, db_file.id)
-            
-            # Set next ID to be one greater than max existing ID
-            self._next_id = max_id + 1
-            
-            logger.debug(f"Loaded {len(db_files)} files from database")
-    
-    async def sync_to_database(self, db: AsyncSession) -> None:
-        """Save all in-memory files to database."""
+                await self._full_sync_from_database(db)
+                return
+        
+        logger.debug(f"Incrementally synced {len(db_files)} changed files from database")
+    
+    def _apply_db_file(self, db_file: DbFile, existing: Optional[FileData]) -> FileData:
+        """Store a database row in memory, keeping caches if its source is unchanged."""
+        loaded = self._file_data_from_row(db_file)
+        file_id = loaded.id
+        if existing is not None and self._is_write_pending(file_id):
+            # The row is older than the edits waiting to be written
+            file_data = existing
+        elif existing is not None and existing.source == loaded.source:
+            file_data = existing
+            file_data.title = loaded.title
+            file_data.abstract = loaded.abstract
+            file_data.status = loaded.status
+            file_data.created_at = loaded.created_at
+            file_data.last_edited_at = loaded.last_edited_at
+            file_data.deleted_at = loaded.deleted_at
+            if file_data.owner_id != loaded.owner_id:
+                self._user_files.get(file_data.owner_id, set()).discard(file_id)
+                file_data.owner_id = loaded.owner_id
+        else:
+            if existing is not None:
+                self._user_files.get(existing.owner_id, set()).discard(existing.id)
+                # Blocks the edit left untouched can still be reused
+                loaded.render_fragments = existing.render_fragments
+            file_data = loaded
+        
+        if file_data is not existing or not self._is_write_pending(file_id):
+            self._unsaved.discard(file_id)
+            file_data.metadata_digest = cast(Optional[str], db_file.derived_source_hash)
+        self._files[file_id] = file_data
+        self._deleted_ids.discard(file_id)
+        self._new_ids.discard(file_id)
+        
+        # Update user index
+        self._user_files.setdefault(loaded.owner_id, set()).add(file_id)
+        
+        self._advance_high_water_mark(loaded.last_edited_at)
+        self._seed_title(file_data, db_file)
+        return file_data
+    
+    @staticmethod
+    def _file_data_from_row(db_file: DbFile) -> FileData:
+        """Copy the columns of a files row into a new FileData."""
+        return FileData(
+            id=cast(int, db_file.id),
+            title=cast(Optional[str], db_file.title) or "",
+            abstract=cast(Optional[str], db_file.abstract) or "",
+            source=cast(Optional[str], db_file.source) or "",
+            owner_id=cast(int, db_file.owner_id),
+            status=db_file.status,
+            created_at=cast(datetime, db_file.created_at),
+            last_edited_at=cast(datetime, db_file.last_edited_at),
+            deleted_at=cast(Optional[datetime], db_file.deleted_at),
+        )
+    
+    @staticmethod
+    def _seed_title(file_data: FileData, db_file: DbFile) -> None:
+        """Prime the title cache with the title persisted in the database, if current."""
+        if file_data.title or file_data.source != (db_file.source or ""):
+            return
+        cache = file_data.cache()
+        if cache.title is None:
+            cache.title = persisted_title(db_file)
+    
+    def _forget_file(self, file_id: int) -> None:
+        """Drop a file and its index entry from memory."""
+        file_data = self._files.pop(file_id, None)
+        self._deleted_ids.discard(file_id)
+        self._unsaved.discard(file_id)
+        self._new_ids.discard(file_id)
+        lock = self._file_locks.get(file_id)
+        if lock is not None and not lock.locked():
+            del self._file_locks[file_id]
+        if file_data is not None:
+            self._user_files.get(file_data.owner_id, set()).discard(file_id)
+    
+    def _advance_high_water_mark(self, timestamp: Optional[datetime]) -> None:
+        """Move the sync high-water mark forward to ``timestamp`` if it is newer."""
+        timestamp = _as_utc(timestamp)
+        if timestamp is None:
+            return
+        if self._high_water_mark is None or timestamp > self._high_water_mark:
+            self._high_water_mark = timestamp
+    
+    async def _sync_asset_changes(self, db: AsyncSession) -> None:
+        """Invalidate renders of files whose assets changed since the last sync."""
+        if self._asset_high_water_mark is None:
+            # Nothing is cached against assets we have not seen yet, so start from now
+            result: Result[Any] = await db.execute(select(func.max(FileAsset.updated_at)))
+            self._asset_high_water_mark = _as_utc(result.scalar_one()) or datetime(1970, 1, 1, tzinfo=UTC)
+            return
+        
+        high_water_mark = self._asset_high_water_mark
+        since = high_water_mark - self.SYNC_OVERLAP
+        query: Select = select(FileAsset.id, FileAsset.file_id, FileAsset.updated_at)
+        result = await db.execute(
+            query.where(FileAsset.updated_at >= since)  # type: ignore[arg-type]
+        )
+        for row in result.all():
+            updated_at = _as_utc(row.updated_at)
+            # The overlap window returns recent changes again; only act on each once
+            if updated_at is None or self._seen_asset_changes.get(row.id) == updated_at:
+                continue
+            self._seen_asset_changes[row.id] = updated_at
+            file_data = self._files.get(row.file_id)
+            if file_data is not None:
+                file_data.invalidate_assets()
+            high_water_mark = max(high_water_mark, updated_at)
+        self._asset_high_water_mark = high_water_mark
+        
+        horizon = high_water_mark - self.SYNC_OVERLAP
+        self._seen_asset_changes = {
+            asset_id: updated_at
+            for asset_id, updated_at in self._seen_asset_changes.items()
+            if updated_at >= horizon
+        }
+    
+    async def invalidate_file_assets(self, file_id: int) -> None:
+        """Invalidate cached renders and decoded assets of a file after one of its assets changed.
+        
+        Parameters
+        ----------
+        file_id : int
+            The ID of the file whose assets were created, updated or deleted.
+        """
+        self._invalidate_assets(file_id)
+        if self._bus is not None:
+            await self._publish([InvalidationEvent(file_id, None, "assets")])
+    
+    def _invalidate_assets(self, file_id: int) -> None:
+        invalidate_asset_bundle(file_id)
+        file_data = self._files.get(file_id)
+        if file_data is not None:
+            file_data.invalidate_assets()
+    
+    async def sync_to_database(self, db: AsyncSession, full: bool = False) -> None:
+        """Save in-memory files changed since they were last written to the database.
+        
+        Files created in memory are inserted (see :func:`insert_files`), so a file
+        whose id was taken meanwhile makes the sync fail instead of overwriting the
+        other row. On PostgreSQL and SQLite the others are written with chunked
+        native upserts (see :func:`upsert_files`), otherwise one row at a time.
+        
+        Parameters
+        ----------
+        db : AsyncSession
+            Database session to write to.
+        full : bool, optional
+            Write every file, changed or not (default: False).
+        """
         if db is None:
             logger.warning("Cannot sync to database: no database session provided")
             return
             
         async with self._lock:
-            logger.debug("Syncing all files from memory to database")
-            
-            for file_data in self._files.values():
-                await self._save_or_update_file_in_db(file_data, db)
+            file_ids = list(self._files) if full else [i for i in self._unsaved if i in self._files]
+            logger.debug(f"Syncing {len(file_ids)} files from memory to database")
+            # Edits landing while the files are written mark them unsaved again
+            self._unsaved.difference_update(file_ids)
+            files = [self._files[file_id] for file_id in file_ids]
+            new = [file_data for file_data in files if file_data.id in self._new_ids]
+            existing = [file_data for file_data in files if file_data.id not in self._new_ids]
+            try:
+                if new:
+                    await insert_files(db, new)
+                if supports_bulk_upsert(db):
+                    await upsert_files(db, existing)
+                else:
+                    for file_data in existing:
+                        await self._save_or_update_file_in_db(file_data, db)
+                await db.commit()
+            except BaseException:
+                self._unsaved.update(file_ids)
+                raise
+            self._new_ids.difference_update(file_ids)
             
-            await db.commit()
-            logger.debug(f"Synced {len(self._files)} files to database")
+            logger.debug(f"Synced {len(files)} files to database")
+        await self._publish_files(file_ids)
     
     async def save_file_to_database(self, file_id: int, db: AsyncSession) -> bool:
         """Save a specific file to database."""
-        async with self._lock:
+        async with self._file_lock(file_id):
             file_data = self._files.get(file_id)
             if not file_data:
                 return False
             
-            success = await self._save_or_update_file_in_db(file_data, db)
+            success = await self._write_file(file_data, db)
             if success:
-                await db.commit()
                 logger.debug(f"Saved file {file_id} to database")
             return success
     
     async def update_file_in_database(self, file_id: int, db: AsyncSession) -> bool:
-        """Update a specific file in database."""
-        async with self._lock:
+        """Update a specific file in database, or schedule the write with write-behind enabled."""
+        if self._write_behind is not None:
+            return self._schedule_write(file_id)
+        
+        async with self._file_lock(file_id):
             file_data = self._files.get(file_id)
             if not file_data:
                 return False
             
-            success = await self._save_or_update_file_in_db(file_data, db)
+            success = await self._write_file(file_data, db)
             if success:
-                await db.commit()
                 logger.debug(f"Updated file {file_id} in database")
             return success
     
+    async def update_source_in_database(self, file_id: int, db: AsyncSession) -> bool:
+        """Write a file's source and edit time to the database without loading its row.
+        
+        Used after :meth:`patch_file_source`: the row is updated by a single UPDATE
+        of the columns an edit changes, so the previous source is never read back.
+        With write-behind enabled, the write is scheduled instead.
+        """
+        if self._write_behind is not None:
+            return self._schedule_write(file_id)
+        if db is None:
+            return False
+        
+        async with self._file_lock(file_id):
+            file_data = self._get_live_file(file_id)
+            if not file_data:
+                return False
+            
+            values: Dict[str, Any] = {"source": file_data.source, "last_edited_at": file_data.last_edited_at}
+            columns = await metadata_columns(file_id, file_data.source)
+            if columns is not None:
+                values.update(columns)
+            try:
+                result = await db.execute(
+                    update(DbFile)
+                    .where(DbFile.id == file_id, DbFile.deleted_at.is_(None))
+                    .values(**values)
+                )
+            except Exception as e:
+                logger.error(f"Failed to update source of file {file_id} in database: {e}")
+                return False
+            if result.rowcount == 0:
+                return False
+            await db.commit()
+            self._unsaved.discard(file_id)
+            
+            if columns is not None:
+                file_data.metadata_digest = columns["derived_source_hash"]
+            if columns is not None and not file_data.title:
+                cache = file_data.cache()
+                if cache.title is None:
+                    cache.title = columns["derived_title"] or ""
+            logger.debug(f"Updated source of file {file_id} in database")
+        await self._publish_files([file_id])
+        return True
+    
     async def delete_file_in_database(self, file_id: int, db: AsyncSession) -> bool:
         """Soft delete a specific file in database."""
         if db is None:
             return False
             
-        async with self._lock:
+        async with self._file_lock(file_id):
             file_data = self._files.get(file_id)
             if not file_data or not file_data.is_deleted():
                 return False
@@ -381,13 +1097,47 @@ class InMemoryFileService(FileServiceInterface):
             result: Result[Any] = await db.execute(select(DbFile).where(DbFile.id == file_id))
             db_file = result.scalars().first()
             
-            if db_file:
-                db_file.deleted_at = file_data.deleted_at
-                await db.commit()
-                logger.debug(f"Soft deleted file {file_id} in database")
-                return True
+            if not db_file:
+                return False
             
+            db_file.deleted_at = file_data.deleted_at
+            await db.commit()
+            self._unsaved.discard(file_id)
+            logger.debug(f"Soft deleted file {file_id} in database")
+        await self._publish_files([file_id])
+        return True
+    
+    async def _write_file(self, file_data: FileData, db: AsyncSession) -> bool:
+        """Insert a new file or update an existing one, and commit.
+        
+        A new file whose id is taken in the database is not written, and is dropped
+        from memory: the id belongs to the row another process created.
+        """
+        if db is None:
+            return False
+        file_id = file_data.id
+        try:
+            if file_id in self._new_ids:
+                await insert_files(db, [file_data])
+            elif supports_bulk_upsert(db):
+                await upsert_files(db, [file_data])
+            elif not await self._save_or_update_file_in_db(file_data, db):
+                return False
+            await db.commit()
+        except IntegrityError as e:
+            logger.error(f"Failed to create file {file_id}, its id is taken in the database: {e}")
+            await db.rollback()
+            if file_id in self._new_ids:
+                self._forget_file(file_id)
+            return False
+        except Exception as e:
+            logger.error(f"Failed to save file {file_id} to database: {e}")
+            await db.rollback()
             return False
+        self._new_ids.discard(file_id)
+        self._unsaved.discard(file_id)
+        await self._publish_files([file_id])
+        return True
     
     async def _save_or_update_file_in_db(self, file_data: FileData, db: AsyncSession) -> bool:
         """Helper method to save or update a file in the database."""
@@ -422,6 +1172,9 @@ class InMemoryFileService(FileServiceInterface):
                 )
                 db.add(db_file)
             
+            await refresh_file_metadata(db_file)
+            file_data.metadata_digest = cast(Optional[str], db_file.derived_source_hash)
+            self._seed_title(file_data, db_file)
             return True
         except Exception as e:
             logger.error(f"Failed to save file {file_data.id} to database: {e}")
@@ -2,14 +2,56 @@
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, NamedTuple, Optional
 
 from ...models.models import FileStatus
+from ..render_cache import renderer_version
+from ..render_engine.sections import IndexedHTML
+
+
+class CacheStamp(NamedTuple):
+    """Everything a file's derived values depend on.
+
+    Cached values are only served while the stamp they were computed under equals
+    the file's current stamp. ``source`` is compared by identity first, so checking
+    a stamp is cheap for the unchanged source object.
+    """
+    
+    source: str
+    assets_version: int
+    renderer_version: str
+
+
+@dataclass
+class FileCache:
+    """Values derived from a file, all valid for a single stamp."""
+    
+    stamp: CacheStamp
+    html: Optional[str] = None
+    """Full HTML rendered without database assets."""
+    
+    html_with_assets: Optional[str] = None
+    """Full HTML rendered with the file's database assets."""
+    
+    bodies: Dict[bool, IndexedHTML] = field(default_factory=dict)
+    """Body HTML with its section offsets, keyed by handrails flag."""
+    
+    sections: Dict[str, str] = field(default_factory=dict)
+    """Extracted section HTML keyed by ``f"{section_name}_{handrails}"``."""
+    
+    title: Optional[str] = None
+    """Title extracted from the source."""
 
 
 @dataclass
 class FileData:
-    """In-memory representation of a file with caching capabilities."""
+    """In-memory representation of a file with caching capabilities.
+    
+    Derived values live in a :class:`FileCache` stamped with the source, the
+    version of the file's assets and the renderer version. Any of those changing
+    makes :meth:`cache` hand out a fresh, empty entry, so stale values are never
+    served even if a writer forgets to call :meth:`clear_cache`.
+    """
     
     id: int
     title: str
@@ -21,20 +63,72 @@ class FileData:
     last_edited_at: datetime
     deleted_at: Optional[datetime] = None
     
-    # Cached computed fields
-    _rendered_html: Optional[str] = field(default=None, init=False)
-    _sections: Dict[str, str] = field(default_factory=dict, init=False)
-    _extracted_title: Optional[str] = field(default=None, init=False)
+    # Bumped whenever an asset of this file is created, changed or deleted
+    assets_version: int = field(default=0, init=False, compare=False)
+    # HTML of the top-level blocks of the latest render, by whether assets were
+    # resolved. Kept across edits so that re-renders only translate changed blocks.
+    render_fragments: Dict[bool, Dict[str, str]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    # Digest of the source the database's derived metadata columns were extracted
+    # from, as far as this process knows. Writes only re-extract metadata when the
+    # source no longer matches it.
+    metadata_digest: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _cache: Optional[FileCache] = field(default=None, init=False, repr=False, compare=False)
     
     def is_deleted(self) -> bool:
         """Check if the file is soft deleted."""
         return self.deleted_at is not None
     
+    def cache_stamp(self) -> CacheStamp:
+        """Return the stamp derived values must carry to be served now."""
+        return CacheStamp(self.source, self.assets_version, renderer_version())
+    
+    def cache(self) -> FileCache:
+        """Return the cache entry for the current stamp, replacing a stale one."""
+        stamp = self.cache_stamp()
+        if self._cache is None or self._cache.stamp != stamp:
+            self._cache = FileCache(stamp)
+        return self._cache
+    
+    def cache_for(self, stamp: CacheStamp) -> Optional[FileCache]:
+        """Return the cache entry to store values computed under ``stamp``.
+        
+        Returns None if the file changed while the values were being computed, in
+        which case they must not be cached.
+        """
+        cache = self.cache()
+        return cache if cache.stamp == stamp else None
+    
+    def invalidate_assets(self) -> None:
+        """Invalidate derived values after the file's assets changed."""
+        self.assets_version += 1
+    
     def clear_cache(self) -> None:
         """Clear all cached computed values."""
-        self._rendered_html = None
-        self._sections.clear()
-        self._extracted_title = None
+        self._cache = None
+    
+    # Shorthands for the cache slots
+    
+    @property
+    def _rendered_html(self) -> Optional[str]:
+        return self.cache().html
+    
+    @_rendered_html.setter
+    def _rendered_html(self, value: Optional[str]) -> None:
+        self.cache().html = value
+    
+    @property
+    def _sections(self) -> Dict[str, str]:
+        return self.cache().sections
+    
+    @property
+    def _extracted_title(self) -> Optional[str]:
+        return self.cache().title
+    
+    @_extracted_title.setter
+    def _extracted_title(self, value: Optional[str]) -> None:
+        self.cache().title = value
 
 
 @dataclass
@@ -64,4 +158,4 @@ class FileUpdateData:
             self.abstract is not None,
             self.source is not None,
             self.status is not None
-        ])
\ No newline at end of file
+        ])
@@ -0,0 +1,66 @@
+"""Single-flight execution of concurrent identical renders."""
+
+import asyncio
+import functools
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+@dataclass
+class SingleFlightStats:
+    """Counters describing how much work a SingleFlight group saved."""
+
+    executed: int = 0
+    """Number of calls that actually ran their function."""
+
+    coalesced: int = 0
+    """Number of calls that awaited another caller's in-flight result instead."""
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"executed": self.executed, "coalesced": self.coalesced}
+
+
+class SingleFlight:
+    """Deduplicate concurrent async calls that share a key.
+
+    The first caller for a key starts the work as a task; every caller that arrives
+    while that task is pending awaits the same task instead of repeating the work.
+    Callers are shielded from each other: cancelling one waiter (e.g. a client that
+    disconnected) does not cancel the shared task. Results are not cached once the
+    task completes; caching is the caller's concern.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.stats = SingleFlightStats()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn()`` unless a call with the same key is already in flight.
+
+        Args:
+            key: Identifies calls that are interchangeable.
+            fn: Zero-argument coroutine function doing the work.
+
+        Returns:
+            The result of the (possibly shared) call. Exceptions propagate to every waiter.
+        """
+        task = self._in_flight.get(key)
+        if task is None or task.done():
+            self.stats.executed += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        else:
+            self.stats.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved in case every waiter was cancelled
+            task.exception()
+
+    def in_flight(self) -> int:
+        """Return the number of distinct keys currently being computed."""
+        return len(self._in_flight)
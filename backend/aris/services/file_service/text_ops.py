@@ -0,0 +1,73 @@
+"""Text operations applied to a file's source, for edits sent as deltas.
+
+An edit is a list of :class:`TextOperation` against a *base version* of the
+source, identified by :func:`source_version`. All offsets refer to the base
+version and count Unicode code points. Operations must be sorted by offset and
+must not overlap, so the new source is assembled in a single pass over the base.
+"""
+
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from ..file_metadata import source_digest
+
+
+class TextOperationError(ValueError):
+    """The operations do not describe a valid edit of the base source."""
+
+
+class SourceConflictError(Exception):
+    """The base version of an edit is not the current version of the source."""
+
+    def __init__(self, current_version: str):
+        super().__init__("Source has changed since the base version")
+        self.current_version = current_version
+
+
+@dataclass(frozen=True)
+class TextOperation:
+    """Replace ``delete`` code points at ``offset`` of the base source with ``insert``."""
+
+    offset: int
+    delete: int = 0
+    insert: str = ""
+
+
+def source_version(source: str) -> str:
+    """Return the version identifier of a file source."""
+    return source_digest(source)
+
+
+def apply_text_operations(source: str, operations: Sequence[TextOperation]) -> str:
+    """Apply ``operations`` to ``source`` and return the edited source.
+
+    Parameters
+    ----------
+    source : str
+        The base source the operations were computed against.
+    operations : sequence of TextOperation
+        Operations sorted by offset, whose deleted ranges do not overlap.
+
+    Returns
+    -------
+    str
+        The edited source.
+
+    Raises
+    ------
+    TextOperationError
+        If an operation is out of range or overlaps the previous one.
+    """
+    parts: List[str] = []
+    position = 0
+    for operation in operations:
+        if operation.offset < position or operation.delete < 0:
+            raise TextOperationError("Operations must be sorted and must not overlap")
+        end = operation.offset + operation.delete
+        if end > len(source):
+            raise TextOperationError("Operation is out of range of the base source")
+        parts.append(source[position:operation.offset])
+        parts.append(operation.insert)
+        position = end
+    parts.append(source[position:])
+    return "".join(parts)
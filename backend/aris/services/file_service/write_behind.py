@@ -0,0 +1,183 @@
+"""Write-behind persistence of edited files.
+
+With write-behind enabled, an edit only changes the in-memory file and marks it
+dirty. A background task writes dirty files to the database every ``interval``
+seconds, or as soon as ``max_dirty`` files are waiting, with executemany
+UPDATEs per batch (see :func:`update_files`). Edits to the same file between two flushes coalesce into a
+single write of its latest state. Pending edits are flushed on graceful
+shutdown; a crash loses at most one interval of edits.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...logging_config import get_logger
+from .bulk import update_files
+from .models import FileData
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class WriteBehindStats:
+    """Counters describing the work of a WriteBehindQueue."""
+
+    flushes: int = 0
+    """Number of flushes that wrote at least one file."""
+
+    written: int = 0
+    """Number of file rows written."""
+
+    failures: int = 0
+    """Number of flushes that failed; their files stay dirty and are retried."""
+
+    consecutive_failures: int = 0
+    """Number of flushes that failed since the last one that succeeded."""
+
+    last_flush_ms: float = 0.0
+    """Duration of the latest flush in milliseconds."""
+
+    max_flush_ms: float = 0.0
+    """Duration of the slowest flush in milliseconds."""
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "flushes": self.flushes,
+            "written": self.written,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+        }
+
+
+class WriteBehindQueue:
+    """Coalesce edited files in memory and persist them from a background task.
+
+    Args:
+        lookup: Returns the live in-memory file for an ID, or None once it is deleted.
+        session_factory: Creates the database sessions flushes run in.
+        interval: Longest time in seconds a dirty file waits before it is written.
+        max_dirty: Number of dirty files that triggers a flush before the interval ends.
+        batch_size: Files written per UPDATE. Their metadata is extracted concurrently,
+            so keep this below the render engine's queue size.
+        on_written: Awaited with the IDs of each batch once it is committed.
+    """
+
+    def __init__(
+        self,
+        lookup: Callable[[int], Optional[FileData]],
+        session_factory: Callable[[], AsyncSession],
+        interval: float = 2.0,
+        max_dirty: int = 100,
+        batch_size: int = 32,
+        on_written: Optional[Callable[[List[int]], Awaitable[None]]] = None,
+    ):
+        self.lookup = lookup
+        self.session_factory = session_factory
+        self.interval = interval
+        self.max_dirty = max_dirty
+        self.batch_size = batch_size
+        self.on_written = on_written
+        self.stats = WriteBehindStats()
+        # Insertion-ordered, so files are written in the order they were first edited
+        self._dirty: Dict[int, None] = {}
+        self._flushing: Set[int] = set()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def mark_dirty(self, file_id: int) -> None:
+        """Schedule the current state of a file to be written."""
+        self._dirty[file_id] = None
+        if len(self._dirty) >= self.max_dirty:
+            self._wakeup.set()
+
+    def is_pending(self, file_id: int) -> bool:
+        """Whether the database may not hold the latest in-memory state of a file yet."""
+        return file_id in self._dirty or file_id in self._flushing
+
+    def depth(self) -> int:
+        """Return the number of files waiting to be written."""
+        return len(self._dirty)
+
+    def start(self) -> None:
+        """Start the background flush task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and write every pending file."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write every dirty file to the database.
+
+        Returns:
+            The number of files written. If writing fails, the files that were not
+            written stay dirty and the error is logged.
+        """
+        async with self._flush_lock:
+            if not self._dirty:
+                return 0
+            file_ids = list(self._dirty)
+            self._dirty = {}
+            self._flushing = set(file_ids)
+            start = time.perf_counter()
+            written = 0
+            try:
+                async with self.session_factory() as db:
+                    for i in range(0, len(file_ids), self.batch_size):
+                        batch = file_ids[i:i + self.batch_size]
+                        written += await self._write_batch(db, batch)
+                        self._flushing.difference_update(batch)
+                self.stats.consecutive_failures = 0
+            except Exception as e:
+                self.stats.failures += 1
+                self.stats.consecutive_failures += 1
+                logger.error(f"Failed to write {len(self._flushing)} edited files to database: {e}")
+                for file_id in file_ids:
+                    if file_id in self._flushing:
+                        self._dirty.setdefault(file_id, None)
+            finally:
+                self._flushing = set()
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.stats.last_flush_ms = elapsed_ms
+            self.stats.max_flush_ms = max(self.stats.max_flush_ms, elapsed_ms)
+            if written:
+                self.stats.flushes += 1
+                self.stats.written += written
+                logger.debug(f"Wrote {written} edited files to database in {elapsed_ms:.1f}ms")
+            return written
+
+    async def _write_batch(self, db: AsyncSession, file_ids: List[int]) -> int:
+        files = [file_data for file_data in map(self.lookup, file_ids) if file_data is not None]
+        if not files:
+            return 0
+        written = await update_files(db, files, metadata_concurrency=self.batch_size)
+        await db.commit()
+        if self.on_written is not None:
+            await self.on_written([file_data.id for file_data in files])
+        return written
@@ -0,0 +1,103 @@
+"""Short-lived cache of authenticated users, keyed by user id.
+
+Every authenticated request resolves the user named by its JWT. Looking it up
+in the database each time costs a round trip on the hot path of every route, so
+resolved users are kept here for a few seconds. Code that changes a user must
+call :func:`invalidate_principal` after committing. Other processes only notice
+the change once their entry expires, which bounds staleness by the TTL.
+
+Cached values are detached snapshots of the user's columns. Concurrent requests
+can share them safely: no session ever tracks or refreshes them. Relationships
+are not loaded on snapshots, so routes needing them must query the user.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, cast
+
+from sqlalchemy import inspect
+
+from ..config import settings
+from ..models import User
+
+
+def _snapshot(user: User) -> User:
+    """Copy the column values of ``user`` into a new, transient instance."""
+    values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+    return User(**values)
+
+
+class PrincipalCache:
+    """TTL and LRU bounded mapping from user id to a snapshot of the user.
+
+    Args:
+        ttl: Seconds an entry is served after it was stored. 0 disables caching.
+        max_entries: Entries kept before the least recently used is evicted.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple[float, User]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(self, user_id: int) -> Optional[User]:
+        """Return the cached user, or None if absent or expired."""
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self._misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self._hits += 1
+        return entry[1]
+
+    def set(self, user: User) -> User:
+        """Cache a snapshot of ``user`` and return it."""
+        snapshot = _snapshot(user)
+        if self.ttl <= 0:
+            return snapshot
+        user_id = cast(int, user.id)
+        self._entries[user_id] = (time.monotonic() + self.ttl, snapshot)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_id: int) -> None:
+        """Forget the cached user, if any."""
+        self._invalidations += 1
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, miss and invalidation counters and the hit ratio."""
+        lookups = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "invalidations": self._invalidations,
+            "entries": len(self._entries),
+            "hit_ratio": self._hits / lookups if lookups else 0.0,
+        }
+
+
+_principal_cache: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get the global principal cache."""
+    global _principal_cache
+    if _principal_cache is None:
+        _principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS)
+    return _principal_cache
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Drop a user from the principal cache after changing or deleting them."""
+    get_principal_cache().invalidate(user_id)
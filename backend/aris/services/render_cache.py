@@ -0,0 +1,322 @@
+"""Content-addressed cache for RSM render results.
+
+Entries are keyed by a hash of everything that determines the output of a render:
+the kind of work, the RSM source, the handrails flag, a digest of the assets
+available to the render and the installed rsm version. Identical documents
+therefore share one entry no matter which file or user they belong to.
+
+The cache has two tiers. An in-process LRU bounded by the total size of its
+values, and an optional SQLite file that survives restarts and is shared by every
+worker process on the host. Disk entries are zlib-compressed and evicted by last
+access once the file grows past its budget.
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
+from typing import Any, Callable, Dict, Optional, TypeVar, Union
+
+from ..config import settings
+from ..logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def _rsm_version() -> str:
+    try:
+        return metadata.version("rsm-markup")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+_RSM_VERSION = _rsm_version()
+_renderer_generation = 0
+
+
+def renderer_version() -> str:
+    """Identify the renderer whose output is currently being cached.
+
+    Combines the installed rsm version with a generation counter bumped by
+    :func:`invalidate_renderer`, for rsm code that changes without a new version.
+    """
+    return f"{_RSM_VERSION}#{_renderer_generation}"
+
+
+def invalidate_renderer() -> None:
+    """Mark every render produced so far in this process as stale."""
+    global _renderer_generation
+    _renderer_generation += 1
+
+
+def render_key(
+    kind: str,
+    source: str,
+    handrails: bool = True,
+    assets_digest: str = "",
+    version: Optional[str] = None,
+) -> str:
+    """Return the content address of a render.
+
+    Args:
+        kind: Which render task produced the value, e.g. ``"render"`` or ``"title"``.
+        source: The RSM source.
+        handrails: The handrails flag passed to RSM.
+        assets_digest: Digest of the assets visible to the render, empty if none.
+        version: Renderer version, defaulting to :func:`renderer_version`.
+
+    Returns:
+        A hex SHA-256 digest.
+    """
+    h = hashlib.sha256()
+    for part in (kind, version or renderer_version(), str(int(handrails)), assets_digest):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    h.update(source.encode("utf-8"))
+    return h.hexdigest()
+
+
+class MemoryTier:
+    """LRU mapping from cache key to value, bounded by total size of the values.
+
+    Text values count by their UTF-8 size, bytes by their length.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, tuple[Union[str, bytes], int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Union[str, bytes]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: str, value: Union[str, bytes]) -> None:
+        size = len(value) if isinstance(value, bytes) else len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+        self._entries[key] = (value, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size -= evicted
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+
+class DiskTier:
+    """SQLite-backed store shared between processes.
+
+    All access goes through a single thread that owns the connection, so callers on
+    the event loop never block on disk I/O or on another process holding the lock.
+    """
+
+    # Check the file size against the budget every this many writes
+    PRUNE_EVERY = 100
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render-cache")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS render_cache ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+                " size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_render_cache_accessed_at"
+                " ON render_cache (accessed_at)"
+            )
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _get(self, key: str) -> Optional[str]:
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM render_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute(
+                "UPDATE render_cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def _set(self, key: str, value: str) -> None:
+        blob = zlib.compress(value.encode("utf-8"))
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO render_cache (key, value, size, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Evict least recently accessed entries until the tier fits its budget."""
+        conn = self._connect()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM render_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        evict = []
+        for key, size in conn.execute("SELECT key, size FROM render_cache ORDER BY accessed_at"):
+            evict.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        with conn:
+            conn.executemany("DELETE FROM render_cache WHERE key = ?", evict)
+
+    def _clear(self) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM render_cache")
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._run(self._get, key)
+
+    async def set(self, key: str, value: str) -> None:
+        await self._run(self._set, key, value)
+
+    async def prune(self) -> None:
+        await self._run(self._prune)
+
+    async def clear(self) -> None:
+        await self._run(self._clear)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._executor.submit(self._conn.close).result()
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+
+class RenderCache:
+    """Two-tier content-addressed cache of render results.
+
+    Disk errors are logged and treated as misses; the cache never fails a render.
+    """
+
+    def __init__(self, max_bytes: int, disk_path: str = "", disk_max_bytes: int = 0):
+        self.rsm_version = _RSM_VERSION
+        self.memory = MemoryTier(max_bytes)
+        self.disk = DiskTier(disk_path, disk_max_bytes) if disk_path else None
+        self._hits = {"memory": 0, "disk": 0}
+        self._misses = 0
+
+    def key(self, kind: str, source: str, handrails: bool = True, assets_digest: str = "") -> str:
+        """Return the content address of a render, see :func:`render_key`."""
+        version = f"{self.rsm_version}#{_renderer_generation}"
+        return render_key(kind, source, handrails, assets_digest, version)
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look a key up in memory, then on disk, promoting disk hits to memory."""
+        value = self.memory.get(key)
+        if isinstance(value, str):
+            self._hits["memory"] += 1
+            return value
+        if self.disk is not None:
+            try:
+                text = await self.disk.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"Render cache disk read failed: {e}")
+                text = None
+            if text is not None:
+                self._hits["disk"] += 1
+                self.memory.set(key, text)
+                return text
+        self._misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        """Store a value in both tiers."""
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                await self.disk.set(key, value)
+            except sqlite3.Error as e:
+                logger.warning(f"Render cache disk write failed: {e}")
+
+    def get_compressed(self, key: str, encoding: str) -> Optional[bytes]:
+        """Return a compressed variant of a cached body, from memory only."""
+        value = self.memory.get(f"{key}:{encoding}")
+        return value if isinstance(value, bytes) else None
+
+    def set_compressed(self, key: str, encoding: str, body: bytes) -> None:
+        """Store a compressed variant of a body, sharing the memory tier's budget."""
+        self.memory.set(f"{key}:{encoding}", body)
+
+    async def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        self.memory.clear()
+        if self.disk is not None:
+            await self.disk.clear()
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit and miss counters and the memory tier's occupancy."""
+        return {
+            "memory_hits": self._hits["memory"],
+            "disk_hits": self._hits["disk"],
+            "misses": self._misses,
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.size,
+        }
+
+
+_render_cache: Optional[RenderCache] = None
+
+
+def get_render_cache() -> Optional[RenderCache]:
+    """Get the global render cache, or None if caching is disabled."""
+    global _render_cache
+    if _render_cache is None and settings.RENDER_CACHE_MAX_BYTES > 0:
+        _render_cache = RenderCache(
+            settings.RENDER_CACHE_MAX_BYTES,
+            settings.RENDER_CACHE_PATH,
+            settings.RENDER_CACHE_DISK_MAX_BYTES,
+        )
+    return _render_cache
+
+
+def close_render_cache() -> None:
+    """Release the global render cache's disk connection."""
+    global _render_cache
+    if _render_cache is not None:
+        _render_cache.close()
+        _render_cache = None
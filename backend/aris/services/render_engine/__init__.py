@@ -0,0 +1,79 @@
+"""Render engine package running RSM work off the event loop."""
+
+import os
+from typing import Optional
+
+from ...config import settings
+from ..render_cache import get_render_cache
+from .interface import (
+    RenderEngine,
+    RenderEngineError,
+    RenderQueueFullError,
+    RenderSourceTooLargeError,
+    RenderTimeoutError,
+)
+from .process_engine import ProcessRenderEngine
+from .sections import IndexedHTML, index_sections
+from .thread_engine import ThreadRenderEngine
+
+
+_render_engine: Optional[RenderEngine] = None
+
+
+def create_render_engine() -> RenderEngine:
+    """Build a render engine backed by the global render cache from the application settings."""
+    engine = _create_engine()
+    engine.cache = get_render_cache()
+    return engine
+
+
+def _create_engine() -> RenderEngine:
+    workers = settings.RENDER_WORKERS or min(4, os.cpu_count() or 1)
+    if settings.RENDER_ENGINE == "thread":
+        return ThreadRenderEngine(
+            workers,
+            settings.RENDER_MAX_QUEUE,
+            settings.RENDER_TIMEOUT_SECONDS,
+            settings.RENDER_MAX_SOURCE_BYTES,
+        )
+    if settings.RENDER_ENGINE == "process":
+        return ProcessRenderEngine(
+            workers,
+            settings.RENDER_MAX_QUEUE,
+            settings.RENDER_TIMEOUT_SECONDS,
+            settings.RENDER_MAX_TASKS_PER_WORKER,
+            settings.RENDER_MAX_SOURCE_BYTES,
+        )
+    raise ValueError(f"Unknown RENDER_ENGINE: {settings.RENDER_ENGINE!r}")
+
+
+def get_render_engine() -> RenderEngine:
+    """Get the global render engine, creating it on first use."""
+    global _render_engine
+    if _render_engine is None:
+        _render_engine = create_render_engine()
+    return _render_engine
+
+
+async def shutdown_render_engine() -> None:
+    """Stop the global render engine's workers."""
+    global _render_engine
+    if _render_engine is not None:
+        await _render_engine.shutdown()
+        _render_engine = None
+
+
+__all__ = [
+    "IndexedHTML",
+    "RenderEngine",
+    "RenderEngineError",
+    "RenderQueueFullError",
+    "RenderSourceTooLargeError",
+    "RenderTimeoutError",
+    "ProcessRenderEngine",
+    "ThreadRenderEngine",
+    "create_render_engine",
+    "get_render_engine",
+    "index_sections",
+    "shutdown_render_engine",
+]
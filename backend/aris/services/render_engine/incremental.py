@@ -0,0 +1,179 @@
+"""Incremental rendering of RSM documents, reusing the HTML of unchanged blocks.
+
+Parsing and transforming a document is cheap next to translating it to HTML, and
+an edit usually touches a single top-level block. Every render therefore parses
+and transforms the whole source, so that numbering and cross-references are
+always resolved against the current document, and then translates only the
+top-level blocks whose fingerprint is not among the fragments of the previous
+render.
+
+A block's fingerprint covers everything its translation reads: the attributes of
+every node in it (but not their source positions, which shift with any edit
+above), the numbers and reference texts of the nodes it refers to, and its next
+sibling. Blocks holding a table of contents depend on the whole outline and are
+always translated.
+"""
+
+import hashlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import rsm
+from rsm import nodes
+from rsm.app import Task
+from rsm.translator import HandrailsTranslator, Translator
+
+
+# Node attributes that do not reach the HTML output
+IGNORED_ATTRIBUTES = frozenset({"_parent", "_children", "start_point", "end_point"})
+
+# The manuscript's source only reaches the output outside of any block
+IGNORED_MANUSCRIPT_ATTRIBUTES = IGNORED_ATTRIBUTES | {"src"}
+
+
+def _safe(get) -> Any:
+    try:
+        return get()
+    except Exception:
+        return None
+
+
+def _describe(value: Any) -> Any:
+    """Reduce an attribute value to what the translator may read from it."""
+    if isinstance(value, nodes.Node):
+        return (
+            type(value).__name__,
+            value.nodeid,
+            value.label,
+            _safe(lambda: value.full_number),
+            _safe(lambda: str(value.reftext)),
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(_describe(item) for item in value)
+    return repr(value)
+
+
+def _describe_node(node: nodes.Node, ignored: frozenset = IGNORED_ATTRIBUTES) -> Tuple:
+    attributes = tuple(
+        (name, _describe(value))
+        for name, value in sorted(vars(node).items())
+        if name not in ignored
+    )
+    number = _safe(lambda: node.full_number) if getattr(node, "number", None) is not None else None
+    return type(node).__name__, number, attributes
+
+
+def fingerprint_block(block: nodes.Node, salt: str) -> Optional[str]:
+    """Return the fingerprint of a top-level block, or None if it must always be translated."""
+    digest = hashlib.blake2b(salt.encode("utf-8"), digest_size=16)
+    digest.update(repr(_describe_node(block)).encode("utf-8"))
+    for node in block.traverse():
+        if isinstance(node, nodes.Contents):
+            return None
+        digest.update(repr(_describe_node(node)).encode("utf-8"))
+    sibling = block.next_sibling()
+    if sibling is not None:
+        text = getattr(sibling, "text", "")
+        digest.update(f"{type(sibling).__name__}:{text[:1]}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class _IncrementalTranslation:
+    """Translation loop of :class:`rsm.translator.Translator` with fragment reuse.
+
+    ``previous`` maps fingerprints to the HTML of blocks from an earlier render.
+    After :meth:`translate`, ``fragments`` holds the fingerprinted blocks of this
+    render, and ``reused`` counts the blocks that were not translated again.
+    """
+
+    # Provided by the rsm translator this is mixed into
+    Action: Any
+    push_visit: Callable[..., None]
+    push_leave: Callable[..., None]
+
+    def __init__(self, previous: Dict[str, str], salt: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.previous = previous
+        self.salt = salt
+        self.fragments: Dict[str, str] = {}
+        self.reused = 0
+
+    def translate(self, tree: nodes.Manuscript, new: bool = True) -> str:
+        if new:
+            self.body = ""
+        self.tree = tree
+        manuscript = repr(_describe_node(tree, IGNORED_MANUSCRIPT_ATTRIBUTES))
+        blocks = {
+            id(child): fingerprint_block(child, self.salt + manuscript) for child in tree.children
+        }
+
+        stack: List[Any] = []
+        self.push_visit(stack, tree)
+        while stack:
+            node, action, method = stack.pop()
+            if action == "record":
+                recorded = blocks[id(node)]
+                if recorded is not None:
+                    self.fragments[recorded] = self.body[method:]
+                continue
+            fingerprint = blocks.get(id(node)) if action == "visit" else None
+            if fingerprint is not None and fingerprint in self.previous:
+                self.body += self.previous[fingerprint]
+                self.fragments[fingerprint] = self.previous[fingerprint]
+                self.reused += 1
+                continue
+            command = method(self, node)
+            if action == "visit":
+                if fingerprint is not None:
+                    stack.append(self.Action(node, "record", len(self.body)))
+                if command.defers:
+                    self.push_leave(stack, node)
+                for child in reversed(node.children):
+                    self.push_visit(stack, child)
+            command.execute(self)
+
+        return self.body
+
+
+class IncrementalTranslator(_IncrementalTranslation, Translator):
+    pass
+
+
+class IncrementalHandrailsTranslator(_IncrementalTranslation, HandrailsTranslator):
+    pass
+
+
+def render_incremental(
+    source: str,
+    handrails: bool = True,
+    asset_resolver: Optional[Any] = None,
+    fragments: Optional[Dict[str, str]] = None,
+) -> Tuple[str, Dict[str, str]]:
+    """Render RSM source like ``rsm.render``, reusing fragments of an earlier render.
+
+    Args:
+        source: RSM markup.
+        handrails: Whether to include handrails in the output.
+        asset_resolver: Optional resolver for assets referenced by the source. Fragments
+            are only reused if it exposes a ``digest()`` of its assets.
+        fragments: Fragments returned by the previous render of the same document.
+
+    Returns:
+        The rendered HTML, identical to ``rsm.render(source, handrails=handrails)``,
+        and the fragments to pass to the next render.
+    """
+    digest = "" if asset_resolver is None else _safe(getattr(asset_resolver, "digest", None))
+    if digest is None:
+        fragments = {}
+    salt = f"{rsm.__name__}:{getattr(rsm, '__version__', '')}:{handrails}:{digest}:"
+
+    cls = IncrementalHandrailsTranslator if handrails else IncrementalTranslator
+    options = {"add_source": False} if handrails else {}
+    translator = cls(fragments or {}, salt, asset_resolver=asset_resolver, **options)
+
+    app = rsm.app.ProcessorApp(
+        plain=source, handrails=handrails, add_source=False, asset_resolver=asset_resolver
+    )
+    app.pop_task()
+    app.add_task(Task("translator", translator, translator.translate))
+    html = app.run()
+    return str(html), translator.fragments
@@ -0,0 +1,294 @@
+"""Interface shared by render engine implementations."""
+
+import asyncio
+import json
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ...logging_config import get_logger
+from ..render_cache import RenderCache
+from . import tasks
+from .sections import IndexedHTML
+
+
+logger = get_logger(__name__)
+
+
+class RenderEngineError(Exception):
+    """Base class for render engine failures unrelated to the RSM syntax itself.
+
+    Attributes:
+        retry_after: Suggested number of seconds before retrying, or None if
+            retrying the same request cannot succeed.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RenderQueueFullError(RenderEngineError):
+    """Raised when a render is rejected because the engine's queue is full."""
+
+
+class RenderTimeoutError(RenderEngineError):
+    """Raised when a render does not finish within the configured timeout."""
+
+
+class RenderSourceTooLargeError(RenderEngineError):
+    """Raised when the source exceeds the engine's maximum render size."""
+
+
+class RenderEngine(ABC):
+    """Run RSM parsing and rendering off the event loop.
+
+    Implementations only differ in where the work runs; admission control and
+    timeouts are shared. At most ``workers + max_queue`` renders may be outstanding
+    at once, further submissions fail fast with :class:`RenderQueueFullError`. A
+    render that timed out stays outstanding until its worker actually finishes it.
+    Sources larger than ``max_source_bytes`` are refused before they reach a
+    worker. Exceptions raised by RSM itself propagate unchanged to the caller.
+
+    When ``cache`` is set, results are looked up by content address before any work
+    is submitted. Renders with an asset resolver are only cached if the resolver
+    exposes a ``digest()`` of its assets.
+    """
+
+    # Weight of the latest render in the moving average of render durations
+    DURATION_SMOOTHING = 0.2
+
+    def __init__(self, workers: int, max_queue: int, timeout: float, max_source_bytes: int = 0):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.max_source_bytes = max_source_bytes
+        self._outstanding = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._mean_duration = 0.0
+        self.cache: Optional[RenderCache] = None
+
+    async def render(
+        self, source: str, handrails: bool = True, asset_resolver: Optional[Any] = None
+    ) -> str:
+        """Render RSM source to HTML.
+
+        Args:
+            source: RSM markup.
+            handrails: Whether to include handrails in the output.
+            asset_resolver: Optional resolver for assets referenced by the source. It must
+                be picklable when the engine runs in separate processes.
+
+        Returns:
+            The rendered HTML.
+        """
+        self._check_size(source)
+        if asset_resolver is None:
+            assets_digest: Optional[str] = ""
+        else:
+            digest = getattr(asset_resolver, "digest", None)
+            assets_digest = digest() if callable(digest) else None
+        return await self._cached(
+            "render",
+            source,
+            handrails,
+            assets_digest,
+            lambda: self._submit(tasks.render, source, handrails, asset_resolver),
+        )
+
+    async def render_incremental(
+        self,
+        source: str,
+        handrails: bool = True,
+        asset_resolver: Optional[Any] = None,
+        fragments: Optional[Dict[str, str]] = None,
+    ) -> Tuple[str, Dict[str, str]]:
+        """Render RSM source to HTML, translating only blocks changed since an earlier render.
+
+        The HTML is the same as :meth:`render` returns, and shares its cache entries.
+
+        Args:
+            source: RSM markup.
+            handrails: Whether to include handrails in the output.
+            asset_resolver: Optional resolver for assets referenced by the source.
+            fragments: Fragments returned by an earlier render of the same document.
+
+        Returns:
+            The rendered HTML and the fragments to pass to the next render. On a
+            cache hit nothing is rendered and ``fragments`` is returned unchanged.
+        """
+        self._check_size(source)
+        if asset_resolver is None:
+            assets_digest: Optional[str] = ""
+        else:
+            digest = getattr(asset_resolver, "digest", None)
+            assets_digest = digest() if callable(digest) else None
+
+        new_fragments = fragments or {}
+
+        async def compute() -> str:
+            nonlocal new_fragments
+            html: str
+            html, new_fragments = await self._submit(
+                tasks.render_incremental, source, handrails, asset_resolver, fragments
+            )
+            return html
+
+        html = await self._cached("render", source, handrails, assets_digest, compute)
+        return html, new_fragments
+
+    async def render_body(self, source: str, handrails: bool = True) -> str:
+        """Run the RSM processor and return the translated HTML body."""
+        self._check_size(source)
+        return await self._cached(
+            "body", source, handrails, "", lambda: self._submit(tasks.render_body, source, handrails)
+        )
+
+    async def render_indexed(self, source: str, handrails: bool = True) -> IndexedHTML:
+        """Render the HTML body together with the offsets of its sections.
+
+        Any section can then be sliced out of the result without rendering or parsing
+        the document again.
+        """
+        self._check_size(source)
+        result = await self._cached(
+            "indexed",
+            source,
+            handrails,
+            "",
+            lambda: self._submit(tasks.render_indexed, source, handrails),
+        )
+        return IndexedHTML.loads(result)
+
+    async def parse_title(self, source: str) -> str:
+        """Return the title of an RSM document, or an empty string.
+
+        Parsing is not subject to ``max_source_bytes`` so that listings never fail on
+        a single oversized document.
+        """
+        return await self._cached(
+            "title", source, False, "", lambda: self._submit(tasks.parse_title, source)
+        )
+
+    async def parse_metadata(self, source: str) -> Dict[str, Any]:
+        """Return the title, plain-text abstract and section outline of an RSM document.
+
+        Like :meth:`parse_title`, this is not subject to ``max_source_bytes``.
+        """
+        result = await self._cached(
+            "metadata", source, False, "", lambda: self._submit(tasks.parse_metadata, source)
+        )
+        metadata: Dict[str, Any] = json.loads(result)
+        return metadata
+
+    async def _cached(
+        self,
+        kind: str,
+        source: str,
+        handrails: bool,
+        assets_digest: Optional[str],
+        compute: Callable[[], Awaitable[str]],
+    ) -> str:
+        """Return the cached result for a render, computing and storing it on a miss."""
+        if self.cache is None or assets_digest is None:
+            return await compute()
+        key = self.cache.key(kind, source, handrails, assets_digest)
+        result = await self.cache.get(key)
+        if result is None:
+            result = await compute()
+            await self.cache.set(key, result)
+        return result
+
+    @property
+    def max_outstanding(self) -> int:
+        """Maximum number of running plus queued renders."""
+        return self.workers + self.max_queue
+
+    def is_saturated(self) -> bool:
+        """Whether a new submission would currently be rejected."""
+        return self._outstanding >= self.max_outstanding
+
+    def retry_after(self) -> int:
+        """Estimate in whole seconds when the current backlog will have drained."""
+        backlog = self._mean_duration * self._outstanding / max(self.workers, 1)
+        return max(1, math.ceil(backlog))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return engine configuration and counters."""
+        return {
+            "engine": self.name,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "max_source_bytes": self.max_source_bytes,
+            "outstanding": self._outstanding,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+            "mean_duration_ms": round(self._mean_duration * 1000, 2),
+        }
+
+    def _check_size(self, source: str) -> None:
+        # Cheap upper bound first: a UTF-8 character takes at most four bytes
+        if not self.max_source_bytes or len(source) * 4 <= self.max_source_bytes:
+            return
+        size = len(source.encode("utf-8"))
+        if size > self.max_source_bytes:
+            self._rejected += 1
+            raise RenderSourceTooLargeError(
+                f"Source is {size} bytes, the maximum is {self.max_source_bytes}"
+            )
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.is_saturated():
+            self._rejected += 1
+            raise RenderQueueFullError(
+                f"Render queue full ({self._outstanding} renders outstanding)",
+                retry_after=self.retry_after(),
+            )
+
+        self._outstanding += 1
+        start = time.perf_counter()
+        try:
+            future = self._dispatch(fn, *args)
+        except BaseException:
+            self._outstanding -= 1
+            raise
+        # Count the render until its worker finishes it, even after it timed out
+        future.add_done_callback(self._release)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self._timed_out += 1
+            logger.error(f"{fn.__name__} timed out after {time.perf_counter() - start:.3f}s")
+            self._on_timeout(future)
+            raise RenderTimeoutError(
+                f"Render did not finish within {self.timeout}s", retry_after=self.retry_after()
+            ) from None
+        self._completed += 1
+        duration = time.perf_counter() - start
+        self._mean_duration += self.DURATION_SMOOTHING * (duration - self._mean_duration)
+        return result
+
+    def _release(self, _future: "asyncio.Future[Any]") -> None:
+        self._outstanding -= 1
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """Short identifier of the engine implementation."""
+
+    @abstractmethod
+    def _dispatch(self, fn: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        """Start ``fn(*args)`` on a worker and return a future for its result."""
+
+    def _on_timeout(self, future: "asyncio.Future[Any]") -> None:
+        """Hook called when a dispatched render exceeded the timeout."""
+
+    async def start(self) -> None:
+        """Start workers ahead of the first render."""
+
+    async def shutdown(self) -> None:
+        """Stop all workers."""
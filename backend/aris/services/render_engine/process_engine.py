@@ -0,0 +1,144 @@
+"""Render engine running RSM in a pool of worker processes."""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set
+
+from ...logging_config import get_logger
+from . import tasks
+from .interface import RenderEngine
+
+
+logger = get_logger(__name__)
+
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    """Return a start method that supports worker recycling.
+
+    Forked workers cannot be recycled by ``ProcessPoolExecutor``. The fork server
+    imports rsm once, so recycled workers start warm.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([tasks.__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class _Pool:
+    """A process pool together with the renders dispatched to it."""
+
+    def __init__(self, executor: ProcessPoolExecutor):
+        self.executor = executor
+        self.pending: Set["asyncio.Future[Any]"] = set()
+        self.abandoned: Set["asyncio.Future[Any]"] = set()
+        self.retired = False
+
+
+class ProcessRenderEngine(RenderEngine):
+    """Run renders in worker processes so they do not contend for the GIL.
+
+    Workers import and warm up rsm when they start and are replaced after
+    ``max_tasks_per_worker`` renders to cap memory growth. A render that exceeds the
+    timeout cannot be interrupted inside its worker, so the pool running it is
+    retired: new renders go to a fresh pool, and the old pool's processes are killed
+    as soon as the renders still running there have finished.
+    """
+
+    name = "process"
+
+    def __init__(
+        self,
+        workers: int,
+        max_queue: int,
+        timeout: float,
+        max_tasks_per_worker: int,
+        max_source_bytes: int = 0,
+    ):
+        super().__init__(workers, max_queue, timeout, max_source_bytes)
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._pool: Optional[_Pool] = None
+        self._retired: Set[_Pool] = set()
+        self._pool_of: Dict["asyncio.Future[Any]", _Pool] = {}
+        self._pools_started = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "max_tasks_per_worker": self.max_tasks_per_worker,
+            "pools_started": self._pools_started,
+            "retired_pools": len(self._retired),
+        }
+
+    def _current_pool(self) -> _Pool:
+        if self._pool is None:
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=_mp_context(),
+                initializer=tasks.warm_up,
+                max_tasks_per_child=self.max_tasks_per_worker or None,
+            )
+            self._pool = _Pool(executor)
+            self._pools_started += 1
+        return self._pool
+
+    def _dispatch(self, fn: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        pool = self._current_pool()
+        future = asyncio.wrap_future(pool.executor.submit(fn, *args))
+        pool.pending.add(future)
+        self._pool_of[future] = pool
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: "asyncio.Future[Any]") -> None:
+        pool = self._pool_of.pop(future, None)
+        if pool is None:
+            return
+        pool.pending.discard(future)
+        pool.abandoned.discard(future)
+        if pool.retired:
+            self._reap(pool)
+
+    def _on_timeout(self, future: "asyncio.Future[Any]") -> None:
+        pool = self._pool_of.get(future)
+        if pool is None:
+            return
+        pool.abandoned.add(future)
+        if not pool.retired:
+            logger.warning("Retiring render worker pool after a render timeout")
+            self._retire(pool)
+        self._reap(pool)
+
+    def _retire(self, pool: _Pool) -> None:
+        pool.retired = True
+        self._retired.add(pool)
+        if self._pool is pool:
+            self._pool = None
+
+    def _reap(self, pool: _Pool) -> None:
+        """Stop a retired pool once only abandoned renders are left in it."""
+        if not pool.pending <= pool.abandoned:
+            return
+        if pool.abandoned:
+            # ProcessPoolExecutor has no public way to kill its workers before 3.14
+            for process in list(getattr(pool.executor, "_processes", {}).values()):
+                process.kill()
+        pool.executor.shutdown(wait=False, cancel_futures=True)
+        self._retired.discard(pool)
+
+    async def start(self) -> None:
+        """Spawn and warm up all workers by giving each of them a trivial task."""
+        pool = self._current_pool()
+        await asyncio.gather(
+            *(asyncio.wrap_future(pool.executor.submit(tasks.worker_pid)) for _ in range(self.workers))
+        )
+
+    async def shutdown(self) -> None:
+        pools = list(self._retired)
+        if self._pool is not None:
+            pools.append(self._pool)
+        for pool in pools:
+            self._retire(pool)
+            pool.abandoned |= pool.pending
+            self._reap(pool)
@@ -0,0 +1,118 @@
+"""Index the sections of rendered HTML so they can be served as slices.
+
+The index is built once, next to the render, by a single scan of the markup. A
+section is then ``html[start:end]`` of the cached document: no second render and
+no parse of the whole document per request.
+"""
+
+import json
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+
+# Elements that never have an end tag
+VOID_ELEMENTS = frozenset(
+    {
+        "area", "base", "br", "col", "embed", "hr", "img", "input",
+        "link", "meta", "param", "source", "track", "wbr",
+    }
+)
+
+
+class IndexedHTML(NamedTuple):
+    """Rendered HTML with the offsets of its named elements.
+
+    ``sections`` maps a class name to the ``(start, end)`` string offsets of the
+    first element in document order carrying that class, from the ``<`` of its start
+    tag to just past its end tag. An element is also indexed under its whole class
+    attribute when that lists several classes.
+    """
+
+    html: str
+    sections: Dict[str, Tuple[int, int]]
+
+    def section(self, name: str) -> str:
+        """Return the markup of the first element with class ``name``, or an empty string."""
+        span = self.sections.get(name)
+        return self.html[span[0]:span[1]] if span else ""
+
+    def dumps(self) -> str:
+        """Serialize for the render cache, which stores text."""
+        return json.dumps({"html": self.html, "sections": self.sections})
+
+    @classmethod
+    def loads(cls, data: str) -> "IndexedHTML":
+        """Inverse of :meth:`dumps`."""
+        parsed = json.loads(data)
+        return cls(parsed["html"], {name: tuple(span) for name, span in parsed["sections"].items()})
+
+
+class _SectionIndexer(HTMLParser):
+    def __init__(self, html: str):
+        super().__init__(convert_charrefs=False)
+        self.html = html
+        self.line_starts = [0] + [match.end() for match in re.finditer("\n", html)]
+        self.sections: Dict[str, Tuple[int, int]] = {}
+        self.claimed: Set[str] = set()
+        # Open elements as (tag, start offset, class names they are the first of)
+        self.stack: List[Tuple[str, int, List[str]]] = []
+
+    def position(self) -> int:
+        line, column = self.getpos()
+        return self.line_starts[line - 1] + column
+
+    def claim(self, attrs) -> List[str]:
+        value = next((v for k, v in attrs if k == "class" and v), None)
+        if value is None:
+            return []
+        names = value.split()
+        if len(names) > 1:
+            names.append(value)
+        names = [name for name in names if name not in self.claimed]
+        self.claimed.update(names)
+        return names
+
+    def close_element(self, names: List[str], start: int, end: int) -> None:
+        for name in names:
+            self.sections[name] = (start, end)
+
+    def handle_starttag(self, tag, attrs):
+        start = self.position()
+        names = self.claim(attrs)
+        if tag in VOID_ELEMENTS:
+            self.close_element(names, start, start + len(self.get_starttag_text() or ""))
+        else:
+            self.stack.append((tag, start, names))
+
+    def handle_startendtag(self, tag, attrs):
+        start = self.position()
+        self.close_element(self.claim(attrs), start, start + len(self.get_starttag_text() or ""))
+
+    def handle_endtag(self, tag):
+        if not any(open_tag == tag for open_tag, _, _ in self.stack):
+            return
+        start = self.position()
+        end = self.html.find(">", start) + 1 or len(self.html)
+        # Elements left open inside this one end where it does
+        while True:
+            open_tag, open_start, names = self.stack.pop()
+            if open_tag == tag:
+                self.close_element(names, open_start, end)
+                return
+            self.close_element(names, open_start, start)
+
+    def finish(self) -> Dict[str, Tuple[int, int]]:
+        self.close()
+        while self.stack:
+            _, start, names = self.stack.pop()
+            self.close_element(names, start, len(self.html))
+        return self.sections
+
+
+def index_sections(html: str) -> IndexedHTML:
+    """Scan ``html`` once and return it with the offsets of its named elements."""
+    indexer = _SectionIndexer(html)
+    indexer.feed(html)
+    return IndexedHTML(html, indexer.finish())
+
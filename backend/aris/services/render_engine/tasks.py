@@ -0,0 +1,95 @@
+"""RSM work units executed by render engine workers.
+
+These are plain module-level functions so they can be pickled and run in worker
+processes. They look ``rsm`` attributes up at call time.
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import rsm
+
+from . import incremental
+from .sections import index_sections
+
+
+WARM_UP_SOURCE = ":rsm:\n# Warm up\n\nWarming up the *renderer*.\n::"
+
+
+def render(source: str, handrails: bool = True, asset_resolver: Optional[Any] = None) -> str:
+    """Render RSM source to a full HTML document."""
+    if asset_resolver is None:
+        return str(rsm.render(source, handrails=handrails))
+    return str(rsm.render(source, handrails=handrails, asset_resolver=asset_resolver))
+
+
+def render_incremental(
+    source: str,
+    handrails: bool = True,
+    asset_resolver: Optional[Any] = None,
+    fragments: Optional[Dict[str, str]] = None,
+) -> Tuple[str, Dict[str, str]]:
+    """Render RSM source to HTML, reusing unchanged blocks of an earlier render."""
+    return incremental.render_incremental(source, handrails, asset_resolver, fragments)
+
+
+def render_body(source: str, handrails: bool = True) -> str:
+    """Run the RSM processor and return the translated HTML body."""
+    app = rsm.app.ProcessorApp(plain=source, handrails=handrails)
+    app.run()
+    return str(app.translator.body)
+
+
+def render_indexed(source: str, handrails: bool = True) -> str:
+    """Render the HTML body and index its sections in the same pass.
+
+    Returns the serialized :class:`~.sections.IndexedHTML`.
+    """
+    return index_sections(render_body(source, handrails)).dumps()
+
+
+def parse_title(source: str) -> str:
+    """Parse RSM source and return its title, or an empty string."""
+    app = rsm.app.ParserApp(plain=source)
+    app.run()
+    title = app.transformer.tree.title
+    return str(title) if title else ""
+
+
+def parse_metadata(source: str) -> str:
+    """Parse RSM source once and return its title, abstract and outline as JSON.
+
+    The abstract is reduced to plain text. The outline lists every section heading
+    in document order as ``{"title": ..., "level": ...}``.
+    """
+    app = rsm.app.ParserApp(plain=source)
+    app.run()
+    tree = app.transformer.tree
+    abstract = next(iter(tree.traverse(nodeclass=rsm.nodes.Abstract)), None)
+    abstract_text = ""
+    if abstract is not None:
+        abstract_text = "".join(
+            str(node.text) for node in abstract.traverse(nodeclass=rsm.nodes.Text)
+        )
+    outline = [
+        {"title": str(section.title), "level": int(section.level)}
+        for section in tree.traverse(nodeclass=rsm.nodes.Section)
+    ]
+    return json.dumps(
+        {
+            "title": str(tree.title) if tree.title else "",
+            "abstract": " ".join(abstract_text.split()),
+            "outline": outline,
+        }
+    )
+
+
+def warm_up() -> None:
+    """Exercise the parser and translator once so the first real render is fast."""
+    render(WARM_UP_SOURCE)
+
+
+def worker_pid() -> int:
+    """Return the process id of the worker running this task."""
+    return os.getpid()
@@ -0,0 +1,37 @@
+"""Render engine running RSM in a thread pool inside the API process."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .interface import RenderEngine
+
+
+class ThreadRenderEngine(RenderEngine):
+    """Run renders on a dedicated thread pool.
+
+    Renders still contend for the GIL with the event loop, so this engine is meant
+    for development and tests, where it keeps ``rsm`` monkeypatchable. A timed out
+    render cannot be interrupted; its thread is freed when the render returns.
+    """
+
+    name = "thread"
+
+    def __init__(self, workers: int, max_queue: int, timeout: float, max_source_bytes: int = 0):
+        super().__init__(workers, max_queue, timeout, max_source_bytes)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="rsm-render"
+            )
+        return self._executor
+
+    def _dispatch(self, fn: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        return asyncio.wrap_future(self._get_executor().submit(fn, *args))
+
+    async def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,94 @@
+"""Benchmark asset listing response size and latency for a user with many assets.
+
+Compares loading full rows and serializing them with their base64 content, as
+the listing endpoints used to, against the metadata-only listing that defers
+the content column.
+
+Usage:
+    python -m benchmarks.bench_asset_listing [--assets 100] [--kib 64] [--requests 20]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from aris.crud import FileAssetDB, FileAssetMetaOut, FileAssetOut
+from aris.models import Base, File, FileAsset, User
+
+
+async def _seed(session, n_assets: int, asset_bytes: int) -> None:
+    await session.execute(insert(User).values(id=1, name="Bench", email="bench@example.com", password_hash="x"))
+    await session.execute(insert(File).values(id=1, owner_id=1, source=":rsm:\n# Figures\n::"))
+    session.add_all(
+        FileAsset(
+            filename=f"figure-{i}.png",
+            mime_type="image/png",
+            content=os.urandom(asset_bytes),
+            file_id=1,
+            owner_id=1,
+        )
+        for i in range(n_assets)
+    )
+    await session.commit()
+
+
+async def _full_rows(session):
+    result = await session.execute(
+        select(FileAsset).where(FileAsset.owner_id == 1, FileAsset.deleted_at.is_(None))
+    )
+    return result.scalars().all()
+
+
+async def _time_listing(Session, load, adapter: TypeAdapter, n_requests: int) -> tuple[float, int]:
+    """Return mean latency in milliseconds and the response size in bytes."""
+    total, body = 0.0, b""
+    for _ in range(n_requests):
+        async with Session() as session:
+            start = time.perf_counter()
+            assets = await load(session)
+            body = adapter.dump_json(adapter.validate_python(assets, from_attributes=True))
+            total += time.perf_counter() - start
+    return total / n_requests * 1000, len(body)
+
+
+async def run(n_assets: int, asset_kib: int, n_requests: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        async with Session() as session:
+            await _seed(session, n_assets, asset_kib * 1024)
+
+        variants = {
+            "full rows": (_full_rows, TypeAdapter(list[FileAssetOut])),
+            "metadata": (
+                lambda session: FileAssetDB.list_user_assets(1, session),
+                TypeAdapter(list[FileAssetMetaOut]),
+            ),
+        }
+        print(f"{n_assets} assets of {asset_kib} KiB")
+        print(f"{'variant':>10} {'latency (ms)':>13} {'response (KiB)':>15}")
+        for name, (load, adapter) in variants.items():
+            latency, size = await _time_listing(Session, load, adapter, n_requests)
+            print(f"{name:>10} {latency:>13.2f} {size / 1024:>15.1f}")
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assets", type=int, default=100, help="Assets owned by the user")
+    parser.add_argument("--kib", type=int, default=64, help="Size of each asset in KiB")
+    parser.add_argument("--requests", type=int, default=20, help="Listings timed per variant")
+    args = parser.parse_args()
+    asyncio.run(run(args.assets, args.kib, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark per-request file sync cost as the files table grows.
+
+Every route in ``aris/routes/file.py`` calls ``InMemoryFileService.sync_from_database``
+before touching the in-memory state. This compares a full reload against the
+incremental change-feed sync, simulating one edited document between requests.
+
+Usage:
+    python -m benchmarks.bench_file_sync [--sizes 500,2000,8000] [--requests 20]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from aris.models import Base, File, User
+from aris.services.file_service import InMemoryFileService
+
+
+SOURCE = ":rsm:\n# Benchmark document\n\n" + "Some paragraph text. " * 200 + "\n::"
+
+
+async def _seed(session, n_files: int) -> None:
+    await session.execute(insert(User).values(id=1, name="Bench", email="bench@example.com", password_hash="x"))
+    long_ago = datetime.now(UTC) - timedelta(days=1)
+    await session.execute(
+        insert(File),
+        [
+            {
+                "owner_id": 1,
+                "source": SOURCE,
+                "title": "",
+                "last_edited_at": long_ago + timedelta(seconds=i),
+                "created_at": long_ago,
+            }
+            for i in range(n_files)
+        ],
+    )
+    await session.commit()
+
+
+async def _time_requests(session, service: InMemoryFileService, n_requests: int, full: bool) -> float:
+    """Return mean sync latency in milliseconds, editing one file before each request."""
+    total = 0.0
+    for i in range(n_requests):
+        await session.execute(
+            update(File)
+            .where(File.id == (i % 10) + 1)
+            .values(source=f"{SOURCE} {i}", last_edited_at=datetime.now(UTC))
+        )
+        await session.commit()
+        start = time.perf_counter()
+        await service.sync_from_database(session, full=full)
+        total += time.perf_counter() - start
+    return total / n_requests * 1000
+
+
+async def run(sizes: list[int], n_requests: int) -> None:
+    print(f"{'rows':>8} {'full sync (ms)':>16} {'incremental (ms)':>18}")
+    for n_files in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            Session = async_sessionmaker(engine, expire_on_commit=False)
+            async with Session() as session:
+                await _seed(session, n_files)
+                service = InMemoryFileService()
+                await service.sync_from_database(session)
+                full_ms = await _time_requests(session, service, n_requests, full=True)
+                incremental_ms = await _time_requests(session, service, n_requests, full=False)
+            await engine.dispose()
+        print(f"{n_files:>8} {full_ms:>16.2f} {incremental_ms:>18.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="500,2000,8000", help="Comma-separated table sizes")
+    parser.add_argument("--requests", type=int, default=20, help="Requests timed per size")
+    args = parser.parse_args()
+    asyncio.run(run([int(s) for s in args.sizes.split(",")], args.requests))
+
+
+if __name__ == "__main__":
+    main()
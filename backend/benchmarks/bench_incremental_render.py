@@ -0,0 +1,86 @@
+"""Benchmark edit-to-preview latency of full and incremental renders.
+
+For every document, appends a word to one paragraph in the middle of the source
+and times rendering the edited source from scratch against re-rendering it with
+the fragments of the previous render. Documents are read from the rsm-examples
+folder when it exists, and generated otherwise.
+
+Usage:
+    python -m benchmarks.bench_incremental_render [--path DIR] [--sections 150] [--repeat 5]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import rsm
+
+from aris.services.render_engine.incremental import render_incremental
+
+
+EXAMPLES = Path("./.venv/lib/python3.13/site-packages/rsm-examples/")
+
+
+def _generated(n_sections: int) -> str:
+    sections = "\n".join(
+        f"## Section {i}\n:label: sec-{i}\n\n"
+        f"Paragraph {i} with $x^{i}$, *emphasis* and a reference to :ref:sec-{(i + 1) % n_sections}::.\n\n"
+        f":theorem:\n  :label: thm-{i}\n\n  Statement {i}.\n\n::\n"
+        for i in range(n_sections)
+    )
+    return f":rsm:\n# Benchmark\n\n{sections}\n::"
+
+
+def _edit(source: str) -> str:
+    """Append a word to the paragraph closest to the middle of the source."""
+    middle = source.find("\n\n", len(source) // 2)
+    if middle == -1:
+        return source.replace("::", "edited ::", 1)
+    return source[:middle] + " edited" + source[middle:]
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_document(name: str, source: str, repeat: int) -> None:
+    _, fragments = render_incremental(source)
+    edited = _edit(source)
+
+    full = rsm.render(edited, handrails=True)
+    html, _ = render_incremental(edited, fragments=fragments)
+    assert html == full, f"{name}: incremental render differs from full render"
+
+    full_ms = _best_ms(lambda: rsm.render(edited, handrails=True), repeat)
+    incremental_ms = _best_ms(lambda: render_incremental(edited, fragments=fragments), repeat)
+    print(f"{name:40s} {len(source) / 1024:8.1f} KiB {full_ms:10.1f} ms {incremental_ms:10.1f} ms")
+
+
+def run(path: Path, n_sections: int, repeat: int) -> None:
+    documents = sorted(path.glob("*.rsm")) if path.is_dir() else []
+    print(f"{'document':40s} {'source':>12s} {'full':>13s} {'incremental':>13s}")
+    if not documents:
+        run_document(f"generated ({n_sections} sections)", _generated(n_sections), repeat)
+    for document in documents:
+        try:
+            run_document(document.name, document.read_text(), repeat)
+        except rsm.RSMApplicationError as e:
+            print(f"{document.name:40s} skipped: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", type=Path, default=EXAMPLES, help="Folder of .rsm documents")
+    parser.add_argument("--sections", type=int, default=150, help="Sections of the generated document")
+    parser.add_argument("--repeat", type=int, default=5, help="Renders timed per variant, best kept")
+    args = parser.parse_args()
+    run(args.path, args.sections, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
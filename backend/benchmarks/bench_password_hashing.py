@@ -0,0 +1,75 @@
+"""Benchmark event-loop lag during a simulated login storm.
+
+Fires a burst of concurrent password verifications, as a wave of logins would,
+while a heartbeat task measures how late the event loop wakes it up. Verifying
+inline (what the login route used to do) stalls every other coroutine for the
+whole storm; the password hasher's thread pool keeps the loop responsive.
+
+Usage:
+    python -m benchmarks.bench_password_hashing [--logins 50] [--workers 2]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from aris.security import PasswordHasher, hash_password, verify_password
+
+
+HEARTBEAT_SECONDS = 0.005
+
+
+async def _heartbeat(lags: list[float], stop: asyncio.Event) -> None:
+    """Record how much later than requested each short sleep returns."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        lags.append(time.perf_counter() - start - HEARTBEAT_SECONDS)
+
+
+async def _inline_login(password: str, hashed: str) -> bool:
+    await asyncio.sleep(0)  # the request arrives
+    return verify_password(password, hashed)
+
+
+async def _storm(login, n_logins: int) -> tuple[float, float, float]:
+    """Return wall time, p99 and max loop lag in milliseconds for a login storm."""
+    lags: list[float] = []
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(lags, stop))
+    await asyncio.sleep(HEARTBEAT_SECONDS * 2)
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(n_logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await heartbeat
+    p99 = statistics.quantiles(lags, n=100)[98] if len(lags) > 1 else lags[0]
+    return elapsed * 1000, p99 * 1000, max(lags) * 1000
+
+
+async def run(n_logins: int, workers: int) -> None:
+    password = "correct horse battery staple"
+    hashed = hash_password(password)
+    hasher = PasswordHasher(workers, max_queue=n_logins)
+    variants = {
+        "inline": lambda: _inline_login(password, hashed),
+        "executor": lambda: hasher.verify(password, hashed),
+    }
+    print(f"{'variant':>9} {'storm (ms)':>11} {'p99 lag (ms)':>13} {'max lag (ms)':>13}")
+    for name, login in variants.items():
+        elapsed, p99, worst = await _storm(login, n_logins)
+        print(f"{name:>9} {elapsed:>11.1f} {p99:>13.1f} {worst:>13.1f}")
+    hasher.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=50, help="Concurrent logins in the storm")
+    parser.add_argument("--workers", type=int, default=2, help="Password hasher threads")
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.workers))
+
+
+if __name__ == "__main__":
+    main()
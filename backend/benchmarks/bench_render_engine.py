@@ -0,0 +1,54 @@
+"""Benchmark render throughput of the thread and process render engines.
+
+Submits a burst of concurrent renders of a mid-sized document and reports the
+wall-clock throughput of each engine. The thread engine serializes on the GIL;
+the process engine should scale with the number of workers.
+
+Usage:
+    python -m benchmarks.bench_render_engine [--workers 4] [--renders 32]
+"""
+
+import argparse
+import asyncio
+import time
+
+from aris.services.render_engine import ProcessRenderEngine, ThreadRenderEngine
+
+
+SOURCE = (
+    ":rsm:\n# Benchmark document\n\n"
+    + "".join(f"## Section {i}\n\nSome *emphasized* paragraph text with $x^{i}$.\n\n" for i in range(150))
+    + "::"
+)
+
+
+async def _throughput(engine, n_renders: int) -> float:
+    """Return renders per second for a burst of ``n_renders`` concurrent renders."""
+    await engine.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(engine.render(SOURCE) for _ in range(n_renders)))
+    elapsed = time.perf_counter() - start
+    await engine.shutdown()
+    return n_renders / elapsed
+
+
+async def run(workers: int, n_renders: int) -> None:
+    engines = {
+        "thread": ThreadRenderEngine(workers, max_queue=n_renders, timeout=600),
+        "process": ProcessRenderEngine(workers, max_queue=n_renders, timeout=600, max_tasks_per_worker=0),
+    }
+    print(f"{'engine':>8} {'renders/s':>10}")
+    for name, engine in engines.items():
+        print(f"{name:>8} {await _throughput(engine, n_renders):>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4, help="Workers per engine")
+    parser.add_argument("--renders", type=int, default=32, help="Concurrent renders submitted")
+    args = parser.parse_args()
+    asyncio.run(run(args.workers, args.renders))
+
+
+if __name__ == "__main__":
+    main()
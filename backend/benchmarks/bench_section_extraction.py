@@ -0,0 +1,70 @@
+"""Benchmark extracting sections from a rendered document.
+
+Compares rendering the body and parsing it with BeautifulSoup for every section
+request, as section endpoints used to, against rendering and indexing the body
+once and slicing each section out of it.
+
+Usage:
+    python -m benchmarks.bench_section_extraction [--sections 50] [--requests 20]
+"""
+
+import argparse
+import time
+
+import rsm
+from bs4 import BeautifulSoup
+
+from aris.services.render_engine import tasks
+from aris.services.render_engine.sections import IndexedHTML
+
+
+NAMES = ("minimap", "level-2", "manuscript", "paragraph")
+
+
+def _source(n_sections: int) -> str:
+    sections = "\n\n".join(
+        f"## Section {i}\n\nParagraph {i} with *emphasis* and :span: a span ::." for i in range(n_sections)
+    )
+    return f":rsm:\n# Benchmark\n\n{sections}\n::"
+
+
+def _render_and_parse(source: str, name: str) -> str:
+    soup = BeautifulSoup(tasks.render_body(source), "lxml")
+    element = soup.find(attrs={"class": name})
+    return str(element) if element else ""
+
+
+def run(n_sections: int, n_requests: int) -> None:
+    source = _source(n_sections)
+    rsm.render(source)  # warm up the parser
+
+    start = time.perf_counter()
+    for i in range(n_requests):
+        _render_and_parse(source, NAMES[i % len(NAMES)])
+    parse_ms = (time.perf_counter() - start) / n_requests * 1000
+
+    start = time.perf_counter()
+    cached = tasks.render_indexed(source)
+    index_ms = (time.perf_counter() - start) * 1000
+    indexed = IndexedHTML.loads(cached)
+    start = time.perf_counter()
+    for i in range(n_requests):
+        indexed.section(NAMES[i % len(NAMES)])
+    slice_ms = (time.perf_counter() - start) / n_requests * 1000
+
+    print(f"{n_sections} sections, {len(indexed.html) / 1024:.1f} KiB of HTML")
+    print(f"render and parse per request: {parse_ms:10.3f} ms")
+    print(f"render and index once:        {index_ms:10.3f} ms")
+    print(f"slice per request:            {slice_ms:10.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=50, help="Sections in the document")
+    parser.add_argument("--requests", type=int, default=20, help="Section requests timed")
+    args = parser.parse_args()
+    run(args.sections, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark writing edited in-memory files back to the database.
+
+Compares the per-row path that ``sync_to_database`` used to take, a SELECT and an
+ORM update per file, against chunked native upserts of only the files changed in
+memory. Every file is edited before each timed write, so both paths extract the
+derived metadata of every source. Metadata is extracted on the thread render
+engine, so that worker processes starting up do not skew either path.
+
+Usage:
+    python -m benchmarks.bench_sync_to_database [--files 10000] [--dirty 100]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import UTC, datetime
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from aris.config import settings
+from aris.models import Base, File, User
+from aris.services.file_service import FileUpdateData, InMemoryFileService
+from aris.services.render_engine import shutdown_render_engine
+
+
+def _source(i: int, edit: int) -> str:
+    return f":rsm:\n# Document {i}\n\n## Section\n\nParagraph of document {i}, edit {edit}.\n::"
+
+
+async def _seed(session, n_files: int) -> None:
+    await session.execute(insert(User).values(id=1, name="Bench", email="bench@example.com", password_hash="x"))
+    now = datetime.now(UTC)
+    await session.execute(
+        insert(File),
+        [
+            {"owner_id": 1, "source": _source(i, 0), "title": "", "last_edited_at": now, "created_at": now}
+            for i in range(n_files)
+        ],
+    )
+    await session.commit()
+
+
+async def _edit(service: InMemoryFileService, file_ids, edit: int) -> None:
+    for file_id in file_ids:
+        await service.update_file(file_id, FileUpdateData(source=_source(file_id, edit)))
+
+
+async def _per_row(service: InMemoryFileService, session) -> float:
+    start = time.perf_counter()
+    for file_data in await service.get_all_files():
+        await service._save_or_update_file_in_db(file_data, session)
+    await session.commit()
+    return time.perf_counter() - start
+
+
+async def _bulk(service: InMemoryFileService, session) -> float:
+    start = time.perf_counter()
+    await service.sync_to_database(session)
+    return time.perf_counter() - start
+
+
+async def run(n_files: int, n_dirty: int) -> None:
+    settings.RENDER_ENGINE = "thread"
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        async with Session() as session:
+            await _seed(session, n_files)
+            service = InMemoryFileService()
+            await service.sync_from_database(session)
+            file_ids = [file_data.id for file_data in await service.get_all_files()]
+
+            await _edit(service, file_ids, 1)
+            per_row = await _per_row(service, session)
+            session.expunge_all()
+            await _edit(service, file_ids, 2)
+            bulk = await _bulk(service, session)
+            await _edit(service, file_ids[:n_dirty], 3)
+            bulk_dirty = await _bulk(service, session)
+            idle = await _bulk(service, session)
+        await engine.dispose()
+    await shutdown_render_engine()
+
+    print(f"{n_files} files")
+    print(f"per-row SELECT and ORM update, all edited: {per_row * 1000:10.1f} ms")
+    print(f"bulk upsert, all edited:                   {bulk * 1000:10.1f} ms")
+    print(f"bulk upsert, {n_dirty:>5} edited:                {bulk_dirty * 1000:10.1f} ms")
+    print(f"bulk upsert, none edited:                  {idle * 1000:10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=10000, help="Documents in memory and in the table")
+    parser.add_argument("--dirty", type=int, default=100, help="Documents edited before the partial write")
+    args = parser.parse_args()
+    asyncio.run(run(args.files, args.dirty))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,21 @@
 import importlib
 import os
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.exception_handlers import http_exception_handler
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from aris.deps import get_db
+from aris.compression import CompressionMiddleware
+from aris.config import settings
+from aris.crud.pagination import NEXT_CURSOR_HEADER
+from aris.deps import ENGINE, ArisSession, get_db, get_file_service
+from aris.exceptions import password_hasher_busy_exception, render_unavailable_exception
 from aris.health import HealthResponse, perform_health_check
 from aris.logging_config import get_logger, setup_logging
 from aris.routes import (
@@ -27,6 +33,15 @@ from aris.routes import (
     user_router,
     user_settings_router,
 )
+from aris.routes.file import SOURCE_VERSION_HEADER
+from aris.security import PasswordHasherBusyError, shutdown_password_hasher
+from aris.services.file_service.invalidation import create_invalidation_bus
+from aris.services.render_cache import close_render_cache, get_render_cache, invalidate_renderer
+from aris.services.render_engine import (
+    RenderEngineError,
+    get_render_engine,
+    shutdown_render_engine,
+)
 
 
 # Initialize logging before anything else
@@ -34,6 +49,39 @@ setup_logging()
 logger = get_logger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start render workers before serving and stop them and the password hasher on shutdown.
+
+    With write-behind enabled, pending file edits are written before the render
+    workers, which extract their metadata, are stopped, and before the invalidation
+    bus that announces them to other workers is detached.
+    """
+    await get_render_engine().start()
+    if settings.FILE_WRITE_BEHIND:
+        (await get_file_service()).start_write_behind(
+            ArisSession,
+            interval=settings.FILE_WRITE_BEHIND_INTERVAL_SECONDS,
+            max_dirty=settings.FILE_WRITE_BEHIND_MAX_DIRTY,
+        )
+    dsn = settings.FILE_INVALIDATION_DSN or ENGINE.url.set(drivername="postgresql").render_as_string(
+        hide_password=False
+    )
+    bus = create_invalidation_bus(settings.FILE_INVALIDATION_BUS, dsn)
+    if bus is not None:
+        try:
+            await (await get_file_service()).attach_invalidation_bus(bus)
+        except Exception as e:
+            # Syncs keep reading the change feed of the database
+            logger.error(f"Failed to attach file invalidation bus: {e}")
+    yield
+    await (await get_file_service()).stop_write_behind()
+    await (await get_file_service()).detach_invalidation_bus()
+    await shutdown_render_engine()
+    close_render_cache()
+    shutdown_password_hasher()
+
+
 # API metadata for documentation
 logger.info("Starting Aris backend application")
 app = FastAPI(
@@ -109,6 +157,7 @@ app = FastAPI(
         {"name": "public", "description": "Public preprint access without authentication"},
         {"name": "health", "description": "System health and status monitoring"},
     ],
+    lifespan=lifespan,
 )
 
 
@@ -241,6 +290,12 @@ async def reload_rsm():
         
         logger.info(f"Reloaded RSM modules: {reloaded_modules}")
         
+        # Editable installs keep their version number, so cached renders may be stale
+        invalidate_renderer()
+        render_cache = get_render_cache()
+        if render_cache is not None:
+            await render_cache.clear()
+        
         return {
             "status": "success",
             "message": "RSM modules reloaded successfully",
@@ -281,7 +336,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, SOURCE_VERSION_HEADER, "ETag"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
 
 # Include routers with proper tags
 logger.info("Registering API routers")
@@ -299,6 +356,20 @@ app.include_router(copilot_router, tags=["copilot"])
 logger.info("All routers registered successfully")
 
 
+@app.exception_handler(RenderEngineError)
+async def render_engine_error_handler(request: Request, error: RenderEngineError):
+    """Answer overloaded or oversized renders with 503/413 instead of a server error."""
+    logger.warning(f"Render refused for {request.method} {request.url.path}: {error}")
+    return await http_exception_handler(request, render_unavailable_exception(error))
+
+
+@app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_handler(request: Request, error: PasswordHasherBusyError):
+    """Shed login and registration bursts with 503 instead of queueing them unboundedly."""
+    logger.warning(f"Password operation refused for {request.method} {request.url.path}: {error}")
+    return await http_exception_handler(request, password_hasher_busy_exception(error))
+
+
 @app.middleware("http")
 async def add_no_cache_headers(request, call_next):
     response = await call_next(request)
@@ -0,0 +1,33 @@
+"""
+Extract and persist derived metadata (title, abstract, outline) for existing files.
+
+Only rows whose metadata is missing or was extracted from an older source are
+parsed, so the script is safe to re-run and resumes where it stopped.
+
+Usage:
+    python scripts/backfill_file_metadata.py [--batch-size 32]
+"""
+
+import argparse
+import asyncio
+
+from aris import ArisSession
+from aris.services.file_metadata import backfill_file_metadata
+from aris.services.render_engine import get_render_engine, shutdown_render_engine
+
+
+async def main(batch_size: int):
+    await get_render_engine().start()
+    try:
+        async with ArisSession() as session:
+            updated = await backfill_file_metadata(session, batch_size=batch_size)
+    finally:
+        await shutdown_render_engine()
+    print(f"Backfilled metadata for {updated} files.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=32, help="Files parsed per batch")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -46,6 +46,18 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ["COPILOT_PROVIDER"] = "mock"
 # Disable email service during tests to prevent real API calls
 os.environ["RESEND_API_KEY"] = ""
+# Render in-process so tests can monkeypatch rsm. Parallel test runs oversubscribe the
+# CPU, so pathological documents get a generous timeout; engine tests set their own.
+os.environ["RENDER_ENGINE"] = "thread"
+os.environ["RENDER_TIMEOUT_SECONDS"] = "600"
+# Tests monkeypatch rsm, which the render cache key cannot see; cache tests opt in
+os.environ["RENDER_CACHE_MAX_BYTES"] = "0"
+# Incremental renders bypass rsm.render for the same reason; incremental tests opt in
+os.environ["RENDER_INCREMENTAL"] = "false"
+# Every test recreates the database, so user ids repeat; principal cache tests opt in
+os.environ["PRINCIPAL_CACHE_TTL_SECONDS"] = "0"
+# Asset ids repeat too, and some tests mock the queries; asset cache tests opt in
+os.environ["ASSET_CACHE_MAX_BYTES"] = "0"
 
 from aris.config import settings
 from aris.deps import get_db
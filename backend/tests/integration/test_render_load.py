@@ -0,0 +1,80 @@
+"""Load test: heavy renders must not stall unrelated endpoints.
+
+Before renders moved off the event loop, one large manuscript posted to
+``/render`` froze the whole worker for the duration of the render. This test
+keeps several heavy renders in flight on the process render engine and checks
+that latency of a cheap authenticated endpoint stays far below a render's cost.
+"""
+
+import asyncio
+import statistics
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from aris.services import render_engine
+
+
+HEAVY_SOURCE = (
+    ":rsm:\n# Heavy manuscript\n\n"
+    + "".join(
+        f"## Section {i}\n\nSome *emphasized* text with $x^{i}$ and more words here.\n\n"
+        for i in range(200)
+    )
+    + "::"
+)
+HEAVY_RENDERS = 6
+PROBES = 40
+
+
+@pytest.fixture
+async def process_engine(monkeypatch):
+    engine = render_engine.ProcessRenderEngine(
+        workers=2, max_queue=HEAVY_RENDERS, timeout=300, max_tasks_per_worker=0
+    )
+    monkeypatch.setattr(render_engine, "_render_engine", engine)
+    await engine.start()
+    yield engine
+    await engine.shutdown()
+
+
+def _p99(samples):
+    return statistics.quantiles(samples, n=100, method="inclusive")[98]
+
+
+class TestRenderLoad:
+    """Heavy renders run beside, not in front of, other requests."""
+
+    async def test_unrelated_endpoint_latency_bounded_during_heavy_renders(
+        self, client: AsyncClient, authenticated_user, process_engine
+    ):
+        headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+
+        # Cost of a single heavy render on an idle engine: what every request
+        # used to wait for when rendering blocked the event loop.
+        start = time.perf_counter()
+        response = await client.post("/render", json={"source": HEAVY_SOURCE})
+        single_render = time.perf_counter() - start
+        assert response.status_code == 200
+
+        renders = [
+            asyncio.create_task(client.post("/render", json={"source": HEAVY_SOURCE}))
+            for _ in range(HEAVY_RENDERS)
+        ]
+        while process_engine.stats()["outstanding"] < process_engine.workers:
+            await asyncio.sleep(0.005)
+
+        latencies = []
+        for _ in range(PROBES):
+            if process_engine.stats()["outstanding"] == 0:
+                break
+            start = time.perf_counter()
+            response = await client.get("/me", headers=headers)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200
+
+        responses = await asyncio.gather(*renders)
+        assert all(r.status_code == 200 for r in responses)
+        assert len(latencies) >= PROBES // 2, "renders finished before enough probes ran"
+        assert _p99(latencies) < single_render / 2
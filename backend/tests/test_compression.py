@@ -0,0 +1,212 @@
+"""Test response compression."""
+
+import asyncio
+import base64
+import gzip
+import zlib
+
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from aris import compression
+from aris.compression import CompressionMiddleware, compress, negotiate
+from aris.services import render_cache
+from aris.services.render_cache import RenderCache
+
+
+def test_negotiate_prefers_server_order_on_ties():
+    """Test that equally acceptable encodings follow the server preference."""
+    assert negotiate("gzip, br", ["br", "gzip"]) == "br"
+    assert negotiate("gzip, br", ["gzip"]) == "gzip"
+
+
+def test_negotiate_honours_q_values():
+    """Test that q-values rank encodings and q=0 refuses one."""
+    assert negotiate("br;q=0.5, gzip", ["br", "gzip"]) == "gzip"
+    assert negotiate("gzip;q=0", ["gzip"]) is None
+    assert negotiate("identity", ["br", "gzip"]) is None
+    assert negotiate("", ["gzip"]) is None
+
+
+def test_negotiate_wildcard():
+    """Test that a wildcard accepts any encoding not refused by name."""
+    assert negotiate("*", ["br", "gzip"]) == "br"
+    assert negotiate("*, br;q=0", ["br", "gzip"]) == "gzip"
+
+
+def test_compress_round_trips():
+    """Test compressing a whole body."""
+    data = b"<p>hello</p>" * 100
+    assert gzip.decompress(compress(data, "gzip")) == data
+
+
+def _app(chunks):
+    async def large(request):
+        return PlainTextResponse("x" * 4096)
+
+    async def small(request):
+        return PlainTextResponse("x" * 10)
+
+    async def stream(request):
+        async def body():
+            for chunk in chunks:
+                yield chunk
+
+        return StreamingResponse(body(), media_type="text/html")
+
+    routes = [Route("/large", large), Route("/small", small), Route("/stream", stream)]
+    return CompressionMiddleware(Starlette(routes=routes), minimum_size=1024)
+
+
+async def _call(app, path, accept_encoding="gzip"):
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.Event().wait()  # the client never disconnects
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages
+
+
+async def test_middleware_compresses_large_bodies():
+    """Test that large text responses are compressed with a matching length."""
+    start, body = await _call(_app([]), "/large")
+    headers = dict(start["headers"])
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"accept-encoding" in headers[b"vary"].lower()
+    assert int(headers[b"content-length"]) == len(body["body"])
+    assert gzip.decompress(body["body"]) == b"x" * 4096
+
+
+async def test_middleware_skips_small_and_unaccepted():
+    """Test that small bodies and clients without a shared encoding get plain bodies."""
+    start, _ = await _call(_app([]), "/small")
+    assert b"content-encoding" not in dict(start["headers"])
+
+    start, body = await _call(_app([]), "/large", accept_encoding="identity")
+    assert b"content-encoding" not in dict(start["headers"])
+    assert body["body"] == b"x" * 4096
+
+
+async def test_middleware_flushes_each_streamed_chunk():
+    """Test that streamed responses are flushed chunk by chunk."""
+    chunks = [b"<section>" + b"a" * 2000 + b"</section>", b"<section>tail</section>"]
+    messages = await _call(_app(chunks), "/stream")
+    headers = dict(messages[0]["headers"])
+    bodies = [m for m in messages[1:] if m["body"]]
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    # Each chunk is decodable on arrival, before the stream ends
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(bodies[0]["body"]) == chunks[0]
+    assert decoder.decompress(b"".join(m["body"] for m in messages[2:])) == chunks[1]
+    assert messages[-1]["more_body"] is False
+
+
+async def test_json_listing_is_compressed(client: AsyncClient, authenticated_user):
+    """Test that JSON listings are compressed."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    for i in range(20):
+        await client.post(
+            "/files",
+            headers=headers,
+            json={"title": f"Doc {i}", "owner_id": authenticated_user["user_id"], "source": ":rsm:x::"},
+        )
+
+    response = await client.get("/files", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 20
+
+
+async def test_raw_asset_is_not_compressed(client: AsyncClient, authenticated_user):
+    """Test that binary assets are served as stored."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    file_id = (
+        await client.post(
+            "/files",
+            headers=headers,
+            json={"title": "Doc", "owner_id": authenticated_user["user_id"], "source": ":rsm:x::"},
+        )
+    ).json()["id"]
+    response = await client.post(
+        "/assets",
+        headers=headers,
+        json={
+            "filename": "figure.png",
+            "mime_type": "image/png",
+            "content": base64.b64encode(b"\x89PNG" + b"\0" * 4096).decode(),
+            "file_id": file_id,
+        },
+    )
+    asset_id = response.json()["id"]
+
+    response = await client.get(f"/assets/{asset_id}/raw", headers=headers)
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+async def test_rendered_content_reuses_cached_variant(client: AsyncClient, authenticated_user, monkeypatch):
+    """Test that rendered content is compressed once and served from the render cache."""
+    from aris.services.file_service import InMemoryFileService
+
+    monkeypatch.setattr(render_cache, "_render_cache", RenderCache(1_000_000))
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    source = ":rsm:\n" + "\n\n".join(f"Paragraph {i} of the document." for i in range(200)) + "\n::"
+    file_id = (
+        await client.post(
+            "/files",
+            headers=headers,
+            json={"title": "Doc", "owner_id": authenticated_user["user_id"], "source": source},
+        )
+    ).json()["id"]
+
+    first = await client.get(f"/files/{file_id}/content", headers=headers)
+
+    async def no_render(*args, **kwargs):
+        raise AssertionError("content was rendered")
+
+    monkeypatch.setattr(InMemoryFileService, "get_file_html", no_render)
+    second = await client.get(f"/files/{file_id}/content", headers=headers)
+
+    assert first.headers["content-encoding"] == second.headers["content-encoding"] == "gzip"
+    assert first.headers["etag"].startswith('W/"')
+    assert second.text == first.text
+    assert "Paragraph 199" in second.text
+
+
+async def test_minimum_size_counts_bytes(monkeypatch):
+    """Test that the compression threshold applies to the encoded body, not its characters."""
+    from starlette.requests import Request
+
+    monkeypatch.setattr(render_cache, "_render_cache", RenderCache(1_000_000))
+    monkeypatch.setattr(compression.settings, "COMPRESSION_MINIMUM_SIZE", 1024)
+    request = Request({"type": "http", "headers": [(b"accept-encoding", b"gzip")]})
+
+    async def body():
+        return "图" * 600  # 600 characters, 1800 bytes
+
+    response = await compression.cached_compressed_response(request, "key", body, "text/html", {})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(response.body).decode("utf-8") == "图" * 600
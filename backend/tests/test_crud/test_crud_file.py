@@ -60,7 +60,7 @@ async def test_duplicate_file(mock_extract_title, db_session, test_user):
     assert duplicate.owner_id == file.owner_id
 
 
-@patch("aris.crud.file.rsm.render", return_value="<div>HTML</div>")
+@patch("rsm.render", return_value="<div>HTML</div>")
 async def test_get_file_html(mock_render, db_session, test_user):
     file = await create_file("<p>HTML</p>", owner_id=test_user.id, db=db_session)
     html = await get_file_html(file.id, db_session)
@@ -24,7 +24,7 @@ async def test_create_asset(db_session, test_user, test_file):
     assert asset.id
     assert asset.filename == "test.txt"
     assert asset.mime_type == "text/plain"
-    assert asset.content == "dGVzdCBjb250ZW50"
+    assert asset.content == b"test content"
     assert asset.file_id == test_file.id
     assert asset.owner_id == test_user.id
     assert asset.uploaded_at
@@ -164,7 +164,7 @@ async def test_update_asset(db_session, test_user, test_file):
     updated_asset = await FileAssetDB.update_asset(asset, update_payload, db_session)
 
     assert updated_asset.filename == "updated.txt"
-    assert updated_asset.content == "dXBkYXRlZA=="
+    assert updated_asset.content == b"updated"
     assert updated_asset.mime_type == "text/plain"  # unchanged
     assert updated_asset.id == asset.id
 
@@ -183,7 +183,41 @@ async def test_update_asset_partial(db_session, test_user, test_file):
     updated_asset = await FileAssetDB.update_asset(asset, update_payload, db_session)
 
     assert updated_asset.filename == "new_name.txt"
-    assert updated_asset.content == "b3JpZ2luYWw="  # unchanged
+    assert updated_asset.content == b"original"  # unchanged
+
+
+async def test_asset_size_and_hash_follow_content(db_session, test_user, test_file):
+    """Test that size and content hash are kept in sync with the content"""
+    import hashlib
+
+    payload = FileAssetCreate(
+        filename="data.txt", mime_type="text/plain", content="b3JpZ2luYWw=", file_id=test_file.id
+    )
+    asset = await FileAssetDB.create_asset(payload, test_user.id, db_session)
+    assert asset.size == len(b"original")
+    assert asset.content_hash == hashlib.sha256(b"original").hexdigest()
+
+    asset = await FileAssetDB.update_asset(asset, FileAssetUpdate(content="dXBkYXRlZA=="), db_session)
+    assert asset.size == len(b"updated")
+    assert asset.content_hash == hashlib.sha256(b"updated").hexdigest()
+
+
+async def test_list_user_assets_defers_content(db_session, test_user, test_file):
+    """Test that listings load metadata only"""
+    from sqlalchemy.exc import InvalidRequestError
+
+    payload = FileAssetCreate(
+        filename="big.bin", mime_type="application/octet-stream", content="AAAA", file_id=test_file.id
+    )
+    await FileAssetDB.create_asset(payload, test_user.id, db_session)
+    db_session.expunge_all()
+
+    assets = await FileAssetDB.list_user_assets(test_user.id, db_session, file_id=test_file.id)
+
+    assert [a.filename for a in assets] == ["big.bin"]
+    assert assets[0].size == 3
+    with pytest.raises(InvalidRequestError):
+        assets[0].content
 
 
 async def test_soft_delete_asset(db_session, test_user, test_file):
@@ -240,3 +274,26 @@ async def test_file_asset_update_validation():
     # Invalid string should raise
     with pytest.raises(ValueError, match="Invalid base64-encoded string"):
         FileAssetUpdate(content="invalid_base64")
+
+
+async def test_plain_text_content_is_stored_verbatim(db_session, test_user, test_file):
+    """Test that text sent with content_encoding="utf-8" is never decoded as base64"""
+    payload = FileAssetCreate(
+        filename="word.txt",
+        mime_type="text/plain",
+        content="abcd",  # also valid base64
+        file_id=test_file.id,
+        content_encoding="utf-8",
+    )
+    asset = await FileAssetDB.create_asset(payload, test_user.id, db_session)
+    assert asset.content == b"abcd"
+
+    update = FileAssetUpdate(content="Zm9v", content_encoding="utf-8")
+    asset = await FileAssetDB.update_asset(asset, update, db_session)
+    assert asset.content == b"Zm9v"
+
+
+async def test_text_content_without_encoding_must_be_base64():
+    """Test that text content is not stored as-is just because it is not valid base64"""
+    with pytest.raises(ValueError, match="Invalid base64-encoded string"):
+        FileAssetCreate(filename="a.txt", mime_type="text/plain", content="not base64!", file_id=1)
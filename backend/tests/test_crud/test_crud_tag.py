@@ -8,6 +8,7 @@ from aris.crud.tag import (
     add_tag_to_file,
     create_tag,
     get_user_file_tags,
+    get_user_files_tags,
     get_user_tags,
     remove_tag_from_file,
     soft_delete_tag,
@@ -99,6 +100,25 @@ async def test_get_user_file_tags(db_session, test_user):
     assert tag_names == {"T1", "T2"}
 
 
+async def test_get_user_files_tags_groups_by_file(db_session, test_user):
+    tagged = File(owner_id=test_user.id)
+    untagged = File(owner_id=test_user.id)
+    tag1 = Tag(name="T1", color="red", user_id=test_user.id)
+    tag2 = Tag(name="T2", color="green", user_id=test_user.id)
+    deleted_tag = Tag(name="Gone", color="red", user_id=test_user.id)
+    db_session.add_all([tagged, untagged, tag1, tag2, deleted_tag])
+    await db_session.commit()
+
+    for tag in (tag1, tag2, deleted_tag):
+        await add_tag_to_file(test_user.id, tagged.id, tag.id, db_session)
+    await soft_delete_tag(deleted_tag.id, test_user.id, db_session)
+
+    tags = await get_user_files_tags(test_user.id, db_session)
+
+    assert set(tags) == {tagged.id}
+    assert {t.name for t in tags[tagged.id]} == {"T1", "T2"}
+
+
 
 
 async def test_create_tag_without_name_raises(db_session, test_user):
@@ -156,13 +156,104 @@ async def test_get_user_files_with_tags_returns_tags(db_session, test_user):
 
     with (
         patch("aris.crud.user.extract_title", return_value="Mock Title"),
-        patch("aris.crud.user.get_user_file_tags", return_value=["tag1", "tag2"]),
+        patch("aris.crud.user.get_user_files_tags", return_value={_file.id: ["tag1", "tag2"]}),
     ):
         files = await get_user_files(test_user.id, with_tags=True, db=db_session)
 
     assert files[0]["tags"] == ["tag1", "tag2"]
 
 
+async def test_get_user_files_query_count_is_constant(db_session, test_user):
+    from sqlalchemy import event
+
+    from aris.crud.file import create_file
+    from aris.crud.tag import add_tag_to_file, create_tag
+
+    async def count_listing_queries():
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sync_engine = db_session.bind.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", record)
+        try:
+            files = await get_user_files(test_user.id, with_tags=True, db=db_session)
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", record)
+        return files, len(statements)
+
+    tag = await create_tag(test_user.id, "Tag", "red", db_session)
+
+    async def add_files(n):
+        for i in range(n):
+            file = await create_file(f":rsm:\n# Doc {i}\n::", test_user.id, db=db_session)
+            await add_tag_to_file(test_user.id, file.id, tag.id, db_session)
+
+    await add_files(2)
+    files, small = await count_listing_queries()
+    assert len(files) == 2
+
+    await add_files(20)
+    files, large = await count_listing_queries()
+    assert len(files) == 22
+    assert all([t.name for t in f["tags"]] == ["Tag"] for f in files)
+    assert large == small
+
+
+async def test_get_user_files_reads_sources_only_without_derived_title(db_session, test_user):
+    """Test that listed titles come from the derived title, parsing only rows without one."""
+    from sqlalchemy import event
+
+    from aris.crud.user import get_user_files_page
+    from aris.models import File
+    from aris.services.file_metadata import refresh_file_metadata
+
+    derived = File(owner_id=test_user.id, source=":rsm:\n# Derived\n::", last_edited_at=datetime(2021, 1, 1))
+    await refresh_file_metadata(derived)
+    raw = File(owner_id=test_user.id, source=":rsm:\n# Parsed\n::", last_edited_at=datetime(2020, 1, 1))
+    db_session.add_all([derived, raw])
+    await db_session.commit()
+    db_session.expunge_all()
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sync_engine = db_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        page, _ = await get_user_files_page(test_user.id, False, db_session, fields={"id", "title"})
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record)
+
+    assert page == [{"id": derived.id, "title": "Derived"}, {"id": raw.id, "title": "Parsed"}]
+    assert len([statement for statement in statements if "files.source" in statement]) == 1
+
+
+async def test_get_user_files_page_breaks_timestamp_ties_by_id(db_session, test_user):
+    from aris.crud.user import get_user_files_page
+    from aris.models import File
+
+    same_time = datetime(2025, 1, 1)
+    files = [File(owner_id=test_user.id, source="s", title="", last_edited_at=same_time) for _ in range(5)]
+    db_session.add_all(files)
+    await db_session.commit()
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = await get_user_files_page(
+            test_user.id, False, db_session, limit=2, cursor=cursor, fields={"id"}
+        )
+        assert all(set(f) == {"id"} for f in page)
+        seen.extend(f["id"] for f in page)
+        if cursor is None:
+            break
+
+    assert seen == sorted((f.id for f in files), reverse=True)
+
+
 async def test_get_user_files_without_tags_returns_empty_list(db_session, test_user):
     from unittest.mock import patch
 
@@ -16,9 +16,9 @@ def test_fileassetcreate_invalid_image_content_raises():
         FileAssetCreate(filename="f.jpg", mime_type="image/jpeg", content="not_base64", file_id=999)
 
 
-def test_fileassetcreate_non_image_allows_bad_content():
+def test_fileassetcreate_plain_text_allows_bad_content():
     payload = FileAssetCreate(
-        filename="f.txt", mime_type="text/plain", content="not_base64!", file_id=1
+        filename="f.txt", mime_type="text/plain", content="not_base64!", file_id=1, content_encoding="utf-8"
     )
     assert payload.content == "not_base64!"
 
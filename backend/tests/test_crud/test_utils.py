@@ -54,7 +54,7 @@ async def test_extract_section_found(monkeypatch):
     monkeypatch.setattr(rsm.app, "ProcessorApp", lambda **kw: fake_app("ProcessorApp", **kw))
     file = File(source=":rsm: content ::")
     section = await extract_section(file, "section-name")
-    assert section == ""  # BeautifulSoup returns nothing with empty body
+    assert section == ""  # The body has no element with that class
 
 
 async def test_extract_section_not_found(monkeypatch):
@@ -38,7 +38,7 @@ class TestRenderPrivate:
         asset = FileAsset(
             filename="test_figure.html",
             mime_type="text/html",
-            content="<div class='test-figure'>Test Figure Content</div>",
+            content=b"<div class='test-figure'>Test Figure Content</div>",
             file_id=5,
             owner_id=authenticated_user['user_id']
         )
@@ -87,7 +87,7 @@ class TestRenderPrivate:
         asset = FileAsset(
             filename="private_asset.html",
             mime_type="text/html", 
-            content="<div>Private Asset</div>",
+            content=b"<div>Private Asset</div>",
             file_id=6,
             owner_id=authenticated_user['user_id']
         )
@@ -17,6 +17,72 @@ async def test_get_files_with_auth(client: AsyncClient, authenticated_user):
     assert isinstance(response.json(), list)
 
 
+async def test_get_files_paginated_with_fields(client: AsyncClient, authenticated_user):
+    """Test paging through files with a field projection."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    file_ids = []
+    for i in range(3):
+        response = await client.post(
+            "/files",
+            headers=headers,
+            json={"title": f"Doc {i}", "owner_id": authenticated_user["user_id"], "source": ":rsm:x::"},
+        )
+        file_ids.append(response.json()["id"])
+
+    first = await client.get("/files", headers=headers, params={"limit": 2, "fields": "title"})
+    cursor = first.headers["X-Next-Cursor"]
+    second = await client.get("/files", headers=headers, params={"limit": 2, "cursor": cursor})
+
+    assert first.json() == [{"id": file_ids[2], "title": "Doc 2"}, {"id": file_ids[1], "title": "Doc 1"}]
+    assert [f["id"] for f in second.json()] == [file_ids[0]]
+    assert "X-Next-Cursor" not in second.headers
+
+
+async def test_get_files_filter_by_status(client: AsyncClient, authenticated_user):
+    """Test that status filters the listing."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    await client.post(
+        "/files",
+        headers=headers,
+        json={"title": "Draft", "owner_id": authenticated_user["user_id"], "source": ":rsm:x::"},
+    )
+
+    response = await client.get("/files", headers=headers, params={"status": "DRAFT"})
+    assert response.status_code == 200
+    assert [f["title"] for f in response.json()] == ["Draft"]
+
+    response = await client.get("/files", headers=headers, params={"status": "PUBLISHED"})
+    assert response.status_code == 422
+
+
+async def test_get_files_paginated_by_tag(client: AsyncClient, authenticated_user):
+    """Test paging through the files carrying a tag."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    user_id = authenticated_user["user_id"]
+    tag = await client.post(f"/users/{user_id}/tags", headers=headers, json={"name": "Keep", "color": "red"})
+    tag_id = tag.json()["id"]
+    tagged = []
+    for i in range(5):
+        response = await client.post(
+            "/files",
+            headers=headers,
+            json={"title": f"Doc {i}", "owner_id": user_id, "source": ":rsm:x::"},
+        )
+        if i % 2 == 0:
+            tagged.append(response.json()["id"])
+            await client.post(f"/users/{user_id}/files/{tagged[-1]}/tags/{tag_id}", headers=headers)
+
+    params = {"limit": 2, "tag_id": tag_id, "fields": "id"}
+    first = await client.get("/files", headers=headers, params=params)
+    second = await client.get(
+        "/files", headers=headers, params={**params, "cursor": first.headers["X-Next-Cursor"]}
+    )
+
+    assert first.json() == [{"id": tagged[2]}, {"id": tagged[1]}]
+    assert second.json() == [{"id": tagged[0]}]
+    assert "X-Next-Cursor" not in second.headers
+
+
 async def test_create_file_valid_rsm_source(client: AsyncClient, authenticated_user):
     """Test creating a file with valid RSM source."""
     headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
@@ -272,6 +338,153 @@ async def test_get_file_content_section(client: AsyncClient, authenticated_user)
     assert response.headers["content-type"] == "text/html; charset=utf-8"
 
 
+async def _create_file(client, headers, user_id, source):
+    response = await client.post(
+        "/files",
+        headers=headers,
+        json={"title": "Doc", "owner_id": user_id, "source": source},
+    )
+    return response.json()["id"]
+
+
+async def test_get_file_content_not_modified(client: AsyncClient, authenticated_user, monkeypatch):
+    """Test that revalidating unchanged content returns 304 without rendering."""
+    from aris.services.file_service import InMemoryFileService
+
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    file_id = await _create_file(client, headers, authenticated_user["user_id"], ":rsm:# Heading\n::")
+
+    response = await client.get(f"/files/{file_id}/content", headers=headers)
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    async def no_render(*args, **kwargs):
+        raise AssertionError("content was rendered")
+
+    monkeypatch.setattr(InMemoryFileService, "get_file_html", no_render)
+    response = await client.get(f"/files/{file_id}/content", headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    # The 200 was compressed, which weakens its tag; the opaque value is the same
+    assert response.headers["etag"].removeprefix("W/") == etag.removeprefix("W/")
+
+
+async def test_get_file_content_etag_tracks_inputs(client: AsyncClient, authenticated_user):
+    """Test that edits to the source or the assets change the ETag."""
+    import base64
+
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    file_id = await _create_file(client, headers, authenticated_user["user_id"], ":rsm:# One\n::")
+    url = f"/files/{file_id}/content"
+    etags = [(await client.get(url, headers=headers)).headers["etag"]]
+
+    await client.put(f"/files/{file_id}", headers=headers, json={"source": ":rsm:# Two\n::"})
+    etags.append((await client.get(url, headers=headers)).headers["etag"])
+
+    await client.post(
+        "/assets",
+        headers=headers,
+        json={
+            "filename": "a.txt",
+            "mime_type": "text/plain",
+            "content": base64.b64encode(b"asset").decode(),
+            "file_id": file_id,
+        },
+    )
+    response = await client.get(url, headers={**headers, "If-None-Match": etags[-1]})
+    assert response.status_code == 200
+    etags.append(response.headers["etag"])
+
+    assert len(set(etags)) == 3
+    assert "<h1>Two</h1>" in response.text
+
+
+async def test_get_file_section_not_modified(client: AsyncClient, authenticated_user):
+    """Test conditional requests for sections, whose ETag depends on handrails."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    file_id = await _create_file(
+        client, headers, authenticated_user["user_id"], ":rsm:# Title\n\n## One\n\nText::"
+    )
+    url = f"/files/{file_id}/content/level-2"
+
+    etag = (await client.get(url, headers=headers)).headers["etag"]
+    response = await client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = await client.get(
+        url, params={"handrails": False}, headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+async def test_render_batch(client: AsyncClient, authenticated_user, second_authenticated_user, monkeypatch):
+    """Test rendering documents, sections and titles of several files in one call."""
+    from aris.services.render_engine import tasks
+
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    user_id = authenticated_user["user_id"]
+    first = await _create_file(client, headers, user_id, ":rsm:\n# First\n\n## Part\n\nOne.\n::")
+    second = await _create_file(client, headers, user_id, ":rsm:\n# Second\n\nTwo.\n::")
+    other_headers = {"Authorization": f"Bearer {second_authenticated_user['token']}"}
+    foreign = await _create_file(
+        client, other_headers, second_authenticated_user["user_id"], ":rsm:\n# Foreign\n::"
+    )
+
+    calls = []
+    render_indexed = tasks.render_indexed
+
+    def counting_render_indexed(source, handrails=True):
+        calls.append(source)
+        return render_indexed(source, handrails)
+
+    monkeypatch.setattr(tasks, "render_indexed", counting_render_indexed)
+    response = await client.post(
+        "/files/render-batch",
+        headers=headers,
+        json={
+            "items": [
+                {"file_id": first, "html": True, "sections": ["manuscript", "level-2"], "title": True},
+                {"file_id": second, "sections": ["level-2", "missing"]},
+                {"file_id": first, "sections": ["level-2"]},
+                {"file_id": foreign, "html": True},
+                {"file_id": 999999, "title": True},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["file_id"] for r in results] == [first, second, first, foreign, 999999]
+    assert "One." in results[0]["html"]
+    assert results[0]["title"] == "Doc"
+    assert results[0]["sections"]["manuscript"].startswith('<div class="manuscript"')
+    assert "Part" in results[0]["sections"]["level-2"]
+    assert results[2]["sections"]["level-2"] == results[0]["sections"]["level-2"]
+    assert results[1]["html"] is None and results[1]["sections"]["missing"] is None
+    assert results[3] == {"file_id": foreign, "html": None, "sections": {}, "title": None, "error": "File not found"}
+    assert results[4]["error"] == "File not found"
+    # One indexed render per document, shared by all of its sections
+    assert len(calls) == 2
+
+
+async def test_render_batch_validation(client: AsyncClient, authenticated_user):
+    """Test that empty and oversized batches are rejected."""
+    from aris.routes.file import MAX_BATCH_ITEMS
+
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    response = await client.post("/files/render-batch", headers=headers, json={"items": []})
+    assert response.status_code == 422
+
+    items = [{"file_id": 1, "html": True}] * (MAX_BATCH_ITEMS + 1)
+    response = await client.post("/files/render-batch", headers=headers, json={"items": items})
+    assert response.status_code == 422
+
+    response = await client.post("/files/render-batch", json={"items": [{"file_id": 1}]})
+    assert response.status_code == 401
+
+
 async def test_get_file_assets(client: AsyncClient, authenticated_user):
     """Test getting file assets."""
     headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
@@ -345,4 +558,120 @@ async def test_create_file_missing_required_fields(client: AsyncClient, authenti
         },
     )
 
-    assert response.status_code == 422  # Validation error
\ No newline at end of file
+    assert response.status_code == 422  # Validation error
+
+async def test_patch_file_applies_text_operations(client: AsyncClient, authenticated_user, db_session):
+    """Test that a patch edits the source in memory and in the database."""
+    from aris.models.models import File
+
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    file_id = await _create_file(client, headers, authenticated_user["user_id"], ":rsm:\n# Old\n\nBody.\n::")
+    version = (await client.get(f"/files/{file_id}", headers=headers)).json()["version"]
+
+    response = await client.patch(
+        f"/files/{file_id}",
+        headers=headers,
+        json={
+            "base_version": version,
+            "operations": [
+                {"offset": 8, "delete": 3, "insert": "New"},
+                {"offset": 13, "delete": 0, "insert": "Edited "},
+            ],
+        },
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert "source" not in data
+    assert data["version"] != version
+    updated = (await client.get(f"/files/{file_id}", headers=headers)).json()
+    assert updated["source"] == ":rsm:\n# New\n\nEdited Body.\n::"
+    assert updated["version"] == data["version"]
+    assert updated["title"] == "Doc"
+    db_file = await db_session.get(File, file_id, populate_existing=True)
+    assert db_file.source == ":rsm:\n# New\n\nEdited Body.\n::"
+    assert db_file.derived_title == "New"
+
+
+async def test_patch_file_rejects_stale_base(client: AsyncClient, authenticated_user):
+    """Test that a patch against an outdated version is refused with the current version."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    file_id = await _create_file(client, headers, authenticated_user["user_id"], ":rsm:\nOne\n::")
+    version = (await client.get(f"/files/{file_id}", headers=headers)).json()["version"]
+    patch = {"base_version": version, "operations": [{"offset": 9, "insert": " more"}]}
+
+    first = await client.patch(f"/files/{file_id}", headers=headers, json=patch)
+    second = await client.patch(f"/files/{file_id}", headers=headers, json=patch)
+
+    assert first.status_code == 200
+    assert second.status_code == 409
+    assert second.headers["x-source-version"] == first.json()["version"]
+    source = (await client.get(f"/files/{file_id}", headers=headers)).json()["source"]
+    assert source == ":rsm:\nOne more\n::"
+
+
+async def test_patch_file_rejects_invalid_operations(client: AsyncClient, authenticated_user):
+    """Test that out-of-range operations and malformed results leave the source unchanged."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    file_id = await _create_file(client, headers, authenticated_user["user_id"], ":rsm:\nOne\n::")
+    version = (await client.get(f"/files/{file_id}", headers=headers)).json()["version"]
+
+    out_of_range = await client.patch(
+        f"/files/{file_id}",
+        headers=headers,
+        json={"base_version": version, "operations": [{"offset": 5, "delete": 100}]},
+    )
+    malformed = await client.patch(
+        f"/files/{file_id}",
+        headers=headers,
+        json={"base_version": version, "operations": [{"offset": 0, "delete": 5}]},
+    )
+
+    assert out_of_range.status_code == 400
+    assert malformed.status_code == 400
+    assert malformed.json()["detail"] == "Malformed RSM source."
+    assert (await client.get(f"/files/{file_id}", headers=headers)).json()["version"] == version
+
+
+async def test_patch_file_of_other_user(client: AsyncClient, authenticated_user, db_session):
+    """Test that patching a file owned by someone else is forbidden."""
+    from aris.models.models import File, User
+
+    other = User(name="Other", email="other-patch@example.com", password_hash="x")
+    db_session.add(other)
+    await db_session.commit()
+    db_file = File(owner_id=other.id, source=":rsm:\nTheirs\n::", title="")
+    db_session.add(db_file)
+    await db_session.commit()
+
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    response = await client.patch(
+        f"/files/{db_file.id}",
+        headers=headers,
+        json={"base_version": "x", "operations": [{"offset": 0, "insert": "y"}]},
+    )
+
+    assert response.status_code == 403
+
+
+async def test_patch_file_not_saved(client: AsyncClient, authenticated_user, monkeypatch):
+    """Test that a patch the database did not store is not reported as a success."""
+    from aris.services.file_service import InMemoryFileService
+
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    file_id = await _create_file(client, headers, authenticated_user["user_id"], ":rsm:\nOne\n::")
+    version = (await client.get(f"/files/{file_id}", headers=headers)).json()["version"]
+
+    async def not_saved(self, file_id, db):
+        return False
+
+    monkeypatch.setattr(InMemoryFileService, "update_source_in_database", not_saved)
+    response = await client.patch(
+        f"/files/{file_id}",
+        headers=headers,
+        json={"base_version": version, "operations": [{"offset": 9, "insert": " more"}]},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert response.headers["x-source-version"] != version
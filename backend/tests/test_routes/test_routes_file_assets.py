@@ -165,6 +165,9 @@ async def test_list_assets_with_data(
     assert len(assets) == 1
     assert assets[0]["filename"] == "test.png"
     assert assets[0]["deleted_at"] is None
+    assert assets[0]["size"] == len(base64.b64decode(valid_base64_image))
+    assert len(assets[0]["content_hash"]) == 64
+    assert "content" not in assets[0]
 
 
 async def test_get_asset_without_auth(client: AsyncClient):
@@ -510,3 +513,220 @@ async def test_list_assets_excludes_deleted(
     assets = response.json()
     assert len(assets) == 1
     assert assets[0]["filename"] == "asset1.png"
+
+
+async def test_asset_changes_invalidate_cached_renders(
+    client: AsyncClient, authenticated_user, test_file, valid_base64_text, db_session
+):
+    """Test that creating, updating and deleting an asset invalidates the file's renders."""
+    from aris import get_file_service
+
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    file_service = await get_file_service()
+    await file_service.sync_from_database(db_session)
+    file_data = await file_service.get_file(test_file["id"])
+    versions = [file_data.assets_version]
+
+    response = await client.post(
+        "/assets",
+        headers=headers,
+        json={
+            "filename": "note.txt",
+            "mime_type": "text/plain",
+            "content": valid_base64_text,
+            "file_id": test_file["id"],
+        },
+    )
+    asset_id = response.json()["id"]
+    versions.append(file_data.assets_version)
+
+    await client.put(f"/assets/{asset_id}", headers=headers, json={"filename": "renamed.txt"})
+    versions.append(file_data.assets_version)
+
+    await client.delete(f"/assets/{asset_id}", headers=headers)
+    versions.append(file_data.assets_version)
+
+    assert versions == sorted(set(versions))
+
+
+async def _upload(client, headers, file_id, content, filename="data.bin", mime_type="application/octet-stream"):
+    response = await client.post(
+        "/assets",
+        headers=headers,
+        json={
+            "filename": filename,
+            "mime_type": mime_type,
+            "content": base64.b64encode(content).decode(),
+            "file_id": file_id,
+        },
+    )
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+async def test_assets_are_stored_as_raw_bytes(
+    client: AsyncClient, authenticated_user, test_file, valid_base64_image, db_session
+):
+    """Test that uploaded base64 content is stored decoded."""
+    from aris.models import FileAsset
+
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    asset_id = await _upload(client, headers, test_file["id"], base64.b64decode(valid_base64_image))
+
+    asset = await db_session.get(FileAsset, asset_id)
+    assert asset.content == base64.b64decode(valid_base64_image)
+
+
+async def test_get_asset_raw(client: AsyncClient, authenticated_user, test_file, valid_base64_image):
+    """Test that the raw endpoint serves the bytes with their own content type."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    png = base64.b64decode(valid_base64_image)
+    asset_id = await _upload(client, headers, test_file["id"], png, "fig.png", "image/png")
+
+    response = await client.get(f"/assets/{asset_id}/raw", headers=headers)
+
+    assert response.status_code == 200
+    assert response.content == png
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["content-length"] == str(len(png))
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"]
+
+
+async def test_get_asset_raw_not_modified(client: AsyncClient, authenticated_user, test_file):
+    """Test that a matching If-None-Match yields 304 and a changed asset does not."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    asset_id = await _upload(client, headers, test_file["id"], b"first")
+    etag = (await client.get(f"/assets/{asset_id}/raw", headers=headers)).headers["etag"]
+
+    response = await client.get(
+        f"/assets/{asset_id}/raw", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    await client.put(
+        f"/assets/{asset_id}", headers=headers, json={"content": base64.b64encode(b"second").decode()}
+    )
+    response = await client.get(
+        f"/assets/{asset_id}/raw", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.content == b"second"
+
+
+@pytest.mark.parametrize(
+    "range_header, expected, content_range",
+    [
+        ("bytes=0-3", b"0123", "bytes 0-3/10"),
+        ("bytes=6-", b"6789", "bytes 6-9/10"),
+        ("bytes=-3", b"789", "bytes 7-9/10"),
+        ("bytes=8-100", b"89", "bytes 8-9/10"),
+    ],
+)
+async def test_get_asset_raw_range(
+    client: AsyncClient, authenticated_user, test_file, range_header, expected, content_range
+):
+    """Test single byte-range requests."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    asset_id = await _upload(client, headers, test_file["id"], b"0123456789")
+
+    response = await client.get(f"/assets/{asset_id}/raw", headers={**headers, "Range": range_header})
+
+    assert response.status_code == 206
+    assert response.content == expected
+    assert response.headers["content-range"] == content_range
+    assert response.headers["content-length"] == str(len(expected))
+
+
+async def test_get_asset_raw_range_edge_cases(client: AsyncClient, authenticated_user, test_file):
+    """Test unsatisfiable, unsupported and stale ranges."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    asset_id = await _upload(client, headers, test_file["id"], b"0123456789")
+    url = f"/assets/{asset_id}/raw"
+
+    response = await client.get(url, headers={**headers, "Range": "bytes=10-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */10"
+
+    # Multiple ranges are not supported and fall back to the whole asset
+    response = await client.get(url, headers={**headers, "Range": "bytes=0-1,4-5"})
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+
+    # A range conditional on an outdated ETag also returns the whole asset
+    response = await client.get(url, headers={**headers, "Range": "bytes=0-1", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+
+
+async def test_get_asset_raw_invalid_range(client: AsyncClient, authenticated_user, test_file):
+    """Test that a syntactically invalid range is ignored and the whole asset served."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    asset_id = await _upload(client, headers, test_file["id"], b"0123456789")
+
+    response = await client.get(f"/assets/{asset_id}/raw", headers={**headers, "Range": "bytes=5-3"})
+
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+    assert "content-range" not in response.headers
+
+
+@pytest.mark.parametrize(
+    "filename, fallback, encoded",
+    [
+        ("图.png", "_.png", "%E5%9B%BE.png"),
+        ("naïve–x.png", "na_ve_x.png", "na%C3%AFve%E2%80%93x.png"),
+        ('a"b;c.png', "a_b;c.png", "a%22b%3Bc.png"),
+    ],
+)
+async def test_get_asset_raw_filename(
+    client: AsyncClient, authenticated_user, test_file, filename, fallback, encoded
+):
+    """Test that any filename yields a well-formed Content-Disposition header."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    asset_id = await _upload(client, headers, test_file["id"], b"data", filename)
+
+    response = await client.get(f"/assets/{asset_id}/raw", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == (
+        f"inline; filename=\"{fallback}\"; filename*=UTF-8''{encoded}"
+    )
+
+
+async def test_get_asset_raw_other_user(client: AsyncClient, authenticated_user, test_file):
+    """Test that another user's asset is not served."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    asset_id = await _upload(client, headers, test_file["id"], b"secret")
+    other = await client.post(
+        "/register",
+        json={"email": "other@example.com", "name": "Other", "password": "password123"},
+    )
+    other_headers = {"Authorization": f"Bearer {other.json()['access_token']}"}
+
+    response = await client.get(f"/assets/{asset_id}/raw", headers=other_headers)
+    assert response.status_code == 404
+
+
+async def test_list_file_assets_metadata_only(
+    client: AsyncClient, authenticated_user, test_file, valid_base64_image
+):
+    """Test that a file's asset listing omits content, which stays available per asset."""
+    headers = {"Authorization": f"Bearer {authenticated_user['token']}"}
+    png = base64.b64decode(valid_base64_image)
+    asset_id = await _upload(client, headers, test_file["id"], png, "fig.png", "image/png")
+
+    response = await client.get(f"/files/{test_file['id']}/assets", headers=headers)
+    assert response.status_code == 200
+    [listed] = response.json()
+    assert listed["id"] == asset_id
+    assert listed["size"] == len(png)
+    assert "content" not in listed
+
+    response = await client.get(f"/assets/{asset_id}", headers=headers)
+    assert response.json()["content"] == valid_base64_image
+    assert response.json()["content_hash"] == listed["content_hash"]
+
+    raw = await client.get(f"/assets/{asset_id}/raw", headers=headers)
+    assert raw.headers["etag"] == f'"{listed["content_hash"]}"'
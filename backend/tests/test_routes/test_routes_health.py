@@ -121,3 +121,31 @@ async def test_health_check_response_structure(client):
         
         # Validate status values
         assert check["status"] in ["healthy", "degraded", "unhealthy", "disabled"]
+
+
+async def test_health_check_reports_write_behind_backlog(client, monkeypatch):
+    """Test health endpoint reports the write-behind queue when it is enabled."""
+    from aris.services import file_service
+    from aris.services.file_service import InMemoryFileService
+
+    service = InMemoryFileService()
+    monkeypatch.setattr(file_service, "file_service_instance", service)
+
+    response = await client.get("/health")
+    assert "file_write_behind" not in response.json()["checks"]
+
+    def broken_session():
+        raise ConnectionError("database is down")
+
+    queue = service.start_write_behind(broken_session, interval=60)
+    queue.mark_dirty(1)
+    try:
+        await queue.flush()
+        response = await client.get("/health")
+    finally:
+        await service.stop_write_behind()
+
+    check = response.json()["checks"]["file_write_behind"]
+    assert check["status"] == "degraded"
+    assert check["dirty"] == 1
+    assert check["consecutive_failures"] == 1
@@ -1,7 +1,14 @@
 """Test render routes."""
 
+import asyncio
+import time
+
+import pytest
+import rsm
 from httpx import AsyncClient
 
+from aris.services import render_engine
+
 
 OUTPUT = """
 <body>
@@ -92,3 +99,35 @@ async def test_render(client: AsyncClient):
     response = await client.post("/render", json={"source": ":rsm:foo::"})
     assert response.status_code == 200
     assert OUTPUT.strip() == response.json().strip()
+
+
+@pytest.fixture
+async def small_engine(monkeypatch):
+    """A render engine with room for exactly one render and a 100 byte source limit."""
+    engine = render_engine.ThreadRenderEngine(workers=1, max_queue=0, timeout=5, max_source_bytes=100)
+    monkeypatch.setattr(render_engine, "_render_engine", engine)
+    yield engine
+    await engine.shutdown()
+
+
+async def test_render_rejects_oversized_source(client: AsyncClient, small_engine):
+    """Sources over the size limit are refused with 413 before rendering."""
+    response = await client.post("/render", json={"source": ":rsm:" + "x" * 200 + "::"})
+    assert response.status_code == 413
+    assert "maximum is 100" in response.json()["detail"]
+
+
+async def test_render_saturated_returns_503_with_retry_after(
+    client: AsyncClient, small_engine, monkeypatch
+):
+    """When every worker and queue slot is taken, renders fail fast with 503."""
+    monkeypatch.setattr(rsm, "render", lambda src, handrails=True: time.sleep(0.3) or "<p>ok</p>")
+
+    busy = asyncio.create_task(client.post("/render", json={"source": ":rsm:a::"}))
+    while not small_engine.is_saturated():
+        await asyncio.sleep(0.01)
+    response = await client.post("/render", json={"source": ":rsm:b::"})
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert (await busy).status_code == 200
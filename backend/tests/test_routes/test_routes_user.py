@@ -348,6 +348,77 @@ class TestUserFiles:
         assert response.status_code == 200
         assert isinstance(response.json(), list)
 
+    async def test_get_user_files_paginated(
+        self, client: AsyncClient, authenticated_user, auth_headers
+    ):
+        """Test walking the user's files page by page with a cursor."""
+        file_ids = [
+            await create_test_file(client, auth_headers, authenticated_user["user_id"])
+            for _ in range(5)
+        ]
+        url = f"/users/{authenticated_user['user_id']}/files"
+
+        seen = []
+        params = {"limit": 2}
+        while True:
+            response = await client.get(url, headers=auth_headers, params=params)
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page) <= 2
+            seen.extend(f["id"] for f in page)
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+            params = {"limit": 2, "cursor": cursor}
+
+        assert seen == list(reversed(file_ids))
+
+    async def test_get_user_files_fields_projection(
+        self, client: AsyncClient, authenticated_user, auth_headers
+    ):
+        """Test that fields= omits everything not requested, including the source."""
+        await create_test_file(client, auth_headers, authenticated_user["user_id"])
+
+        response = await client.get(
+            f"/users/{authenticated_user['user_id']}/files?fields=title,last_edited_at",
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        assert set(response.json()[0]) == {"id", "title", "last_edited_at"}
+
+    async def test_get_user_files_filter_by_tag(
+        self, client: AsyncClient, authenticated_user, auth_headers
+    ):
+        """Test that tag_id restricts the listing to tagged files."""
+        user_id = authenticated_user["user_id"]
+        tagged_id = await create_test_file(client, auth_headers, user_id)
+        await create_test_file(client, auth_headers, user_id)
+        tag = await client.post(
+            f"/users/{user_id}/tags", headers=auth_headers, json={"name": "Keep", "color": "red"}
+        )
+        tag_id = tag.json()["id"]
+        await client.post(f"/users/{user_id}/files/{tagged_id}/tags/{tag_id}", headers=auth_headers)
+
+        response = await client.get(
+            f"/users/{user_id}/files", headers=auth_headers, params={"tag_id": tag_id}
+        )
+
+        assert [f["id"] for f in response.json()] == [tagged_id]
+
+    async def test_get_user_files_invalid_listing_params(
+        self, client: AsyncClient, authenticated_user, auth_headers
+    ):
+        """Test that unknown fields and malformed cursors are rejected."""
+        url = f"/users/{authenticated_user['user_id']}/files"
+
+        response = await client.get(url, headers=auth_headers, params={"fields": "id,secret"})
+        assert response.status_code == 400
+        response = await client.get(url, headers=auth_headers, params={"cursor": "garbage"})
+        assert response.status_code == 400
+        response = await client.get(url, headers=auth_headers, params={"limit": 0})
+        assert response.status_code == 422
+
     async def test_get_user_files_without_auth(self, client: AsyncClient):
         """Test getting user files without authentication."""
         response = await client.get("/users/1/files")
@@ -599,28 +670,23 @@ class TestProfilePicture:
 class TestErrorHandling:
     """Test class for error handling scenarios."""
 
-    async def test_get_profile_picture_invalid_data(
+    async def test_get_profile_picture_serves_stored_bytes(
         self, client: AsyncClient, authenticated_user, auth_headers, db_session
     ):
-        """Test getting profile picture with corrupted data."""
-        # Upload a valid profile picture
+        """Test that the avatar endpoint returns the stored bytes verbatim."""
         upload_response = await upload_profile_picture(
             client, auth_headers, authenticated_user["user_id"]
         )
         assert upload_response.status_code == 200
 
-        # Corrupt the stored content to be invalid base64
         pic_id = upload_response.json()["picture_id"]
         pp = await db_session.get(ProfilePicture, pic_id)
-        pp.content = "not_base64!"
-        await db_session.commit()
 
-        # Attempt to retrieve the corrupted profile picture
         response = await client.get(
             f"/users/{authenticated_user['user_id']}/avatar", headers=auth_headers
         )
-        assert response.status_code == 500
-        assert response.json()["detail"] == "Invalid image data"
+        assert response.status_code == 200
+        assert response.content == pp.content
 
     async def test_upload_profile_picture_user_not_found(
         self, client: AsyncClient, authenticated_user, auth_headers, db_session
@@ -1,5 +1,14 @@
+import asyncio
 
-from aris.security import hash_password, verify_password
+from aris import security
+from aris.security import (
+    PasswordHasher,
+    PasswordHasherBusyError,
+    hash_password,
+    hash_password_async,
+    verify_password,
+    verify_password_async,
+)
 
 
 def test_hash_and_verify_password():
@@ -17,3 +26,39 @@ def test_hash_password_unique_salt():
     h2 = hash_password(p)
     # Each hash should use a new salt
     assert h1 != h2
+
+
+async def test_async_hash_and_verify_password():
+    hashed = await hash_password_async("mysecret")
+    assert await verify_password_async("mysecret", hashed)
+    assert not await verify_password_async("wrong", hashed)
+    assert verify_password("mysecret", hashed)
+
+
+async def test_password_hasher_rejects_when_queue_is_full():
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    try:
+        results = await asyncio.gather(
+            *(hasher.hash("password") for _ in range(3)), return_exceptions=True
+        )
+    finally:
+        hasher.shutdown()
+
+    assert sum(isinstance(r, str) for r in results) == 2
+    assert sum(isinstance(r, PasswordHasherBusyError) for r in results) == 1
+    assert hasher.stats() == {"outstanding": 0, "completed": 2, "rejected": 1}
+
+
+async def test_login_returns_503_when_hasher_is_busy(client, authenticated_user, monkeypatch):
+    busy = PasswordHasher(workers=1, max_queue=0)
+    busy._outstanding = 1  # every thread taken
+    monkeypatch.setattr(security, "_password_hasher", busy)
+
+    response = await client.post(
+        "/login",
+        json={"email": authenticated_user["email"], "password": authenticated_user["password"]},
+    )
+    busy.shutdown()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -1,9 +1,47 @@
 """Tests for FileAssetResolver service."""
 
+import re
+
+import pytest
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from aris.models.models import FileAsset
-from aris.services.asset_resolver import FileAssetResolver
+from aris.services import asset_resolver
+from aris.services.asset_resolver import AssetBundleCache, FileAssetResolver
+
+
+@pytest.fixture
+def bundle_cache(monkeypatch):
+    """Enable an asset bundle cache, which conftest disables."""
+    cache = AssetBundleCache(max_bytes=1_000_000)
+    monkeypatch.setattr(asset_resolver, "_asset_bundle_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def content_loads(db_session):
+    """Record every query loading asset contents."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT") and re.search(r"file_assets\.content\b", statement):
+            statements.append(statement)
+
+    sync_engine = db_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(sync_engine, "before_cursor_execute", record)
+
+
+async def _add_assets(db_session, file_id, **assets):
+    rows = [
+        FileAsset(filename=name, mime_type="text/plain", content=content, file_id=file_id, owner_id=1)
+        for name, content in assets.items()
+    ]
+    db_session.add_all(rows)
+    await db_session.commit()
+    return rows
 
 
 class TestFileAssetResolver:
@@ -37,7 +75,7 @@ class TestFileAssetResolver:
         asset = FileAsset(
             filename="merge_sort_embed.html",
             mime_type="text/html",
-            content="<div>Merge Sort Algorithm</div>",
+            content=b"<div>Merge Sort Algorithm</div>",
             file_id=2,
             owner_id=1
         )
@@ -69,7 +107,7 @@ class TestFileAssetResolver:
         asset1 = FileAsset(
             filename="active.html",
             mime_type="text/html", 
-            content="<div>Active</div>",
+            content=b"<div>Active</div>",
             file_id=3,
             owner_id=1
         )
@@ -78,7 +116,7 @@ class TestFileAssetResolver:
         asset2 = FileAsset(
             filename="deleted.html",
             mime_type="text/html",
-            content="<div>Deleted</div>",
+            content=b"<div>Deleted</div>",
             file_id=3,
             owner_id=1,
             deleted_at=datetime.now(timezone.utc)
@@ -100,21 +138,21 @@ class TestFileAssetResolver:
             FileAsset(
                 filename="chart.html",
                 mime_type="text/html",
-                content="<div>Chart</div>",
+                content=b"<div>Chart</div>",
                 file_id=4,
                 owner_id=1
             ),
             FileAsset(
                 filename="data.json", 
                 mime_type="application/json",
-                content='{"values": [1, 2, 3]}',
+                content=b'{"values": [1, 2, 3]}',
                 file_id=4,
                 owner_id=1
             ),
             FileAsset(
                 filename="style.css",
                 mime_type="text/css", 
-                content="body { font-family: Arial; }",
+                content=b"body { font-family: Arial; }",
                 file_id=4,
                 owner_id=1
             )
@@ -129,4 +167,101 @@ class TestFileAssetResolver:
         assert resolver.resolve_asset("chart.html") == "<div>Chart</div>"
         assert resolver.resolve_asset("data.json") == '{"values": [1, 2, 3]}'
         assert resolver.resolve_asset("style.css") == "body { font-family: Arial; }"
-        assert resolver.resolve_asset("missing.txt") is None
\ No newline at end of file
+        assert resolver.resolve_asset("missing.txt") is None
+
+class TestAssetBundleCache:
+    """Test reuse of decoded assets across renders."""
+
+    def test_lru_bound_by_decoded_size(self):
+        """Test that least recently used files are evicted past max_bytes."""
+        cache = AssetBundleCache(max_bytes=10)
+        cache.add(1, ("v",), {"a": "1234"})
+        cache.add(2, ("v",), {"b": "1234"})
+        cache.get(1, ("v",))
+        cache.add(3, ("v",), {"c": "1234"})
+
+        assert cache.get(2, ("v",)) == {}
+        assert cache.get(1, ("v",)) == {"a": "1234"}
+        assert cache.stats()["bytes"] == 8
+
+    def test_version_change_drops_entry(self):
+        """Test that an entry is never served for a different set of assets."""
+        cache = AssetBundleCache(max_bytes=100)
+        cache.add(1, ("v1",), {"a": "old"})
+
+        assert cache.get(1, ("v2",)) == {}
+        assert cache.stats()["entries"] == 0
+
+    async def test_unchanged_assets_are_not_reloaded(self, db_session, bundle_cache, content_loads):
+        """Test that a second resolver reuses the decoded assets."""
+        await _add_assets(db_session, 7, **{"a.html": b"<p>A</p>", "b.css": b"p {}"})
+
+        first = await FileAssetResolver.create_for_file(7, db_session)
+        second = await FileAssetResolver.create_for_file(7, db_session)
+
+        assert len(content_loads) == 1
+        assert second.resolve_asset("a.html") == "<p>A</p>"
+        assert second.digest() == first.digest()
+        assert bundle_cache.stats()["hits"] == 1
+
+    async def test_edits_are_picked_up(self, db_session, bundle_cache):
+        """Test that changed content is decoded again without explicit invalidation."""
+        [asset] = await _add_assets(db_session, 8, **{"a.html": b"<p>old</p>"})
+        await FileAssetResolver.create_for_file(8, db_session)
+
+        asset.content = b"<p>new</p>"
+        await db_session.commit()
+        resolver = await FileAssetResolver.create_for_file(8, db_session)
+
+        assert resolver.resolve_asset("a.html") == "<p>new</p>"
+
+    async def test_file_service_invalidation_drops_bundle(self, db_session, bundle_cache):
+        """Test that asset changes reported to the file service clear the bundle."""
+        from aris.services.file_service import InMemoryFileService
+
+        await _add_assets(db_session, 9, **{"a.html": b"<p>A</p>"})
+        await FileAssetResolver.create_for_file(9, db_session)
+        assert bundle_cache.stats()["entries"] == 1
+
+        await InMemoryFileService().invalidate_file_assets(9)
+
+        assert bundle_cache.stats()["entries"] == 0
+
+    async def test_lazy_mode_loads_referenced_assets_only(
+        self, db_session, bundle_cache, content_loads
+    ):
+        """Test that given a source, only assets it names are loaded and decoded."""
+        await _add_assets(
+            db_session, 10, **{"used.html": b"<p>used</p>", "unused.html": b"<p>unused</p>"}
+        )
+        source = ":rsm:\n:figure:\n  :path: used.html\n\n::\n::"
+
+        resolver = await FileAssetResolver.create_for_file(10, db_session, source=source)
+        assert resolver.resolve_asset("used.html") == "<p>used</p>"
+        assert resolver.resolve_asset("unused.html") is None
+        assert bundle_cache.stats()["bytes"] == len("<p>used</p>")
+
+        # A source referencing both only loads the one not decoded yet
+        await FileAssetResolver.create_for_file(10, db_session, source=source + " unused.html")
+        assert len(content_loads) == 2
+        assert content_loads[1].count("?") == 1
+
+    async def test_undecodable_assets_are_not_refetched(
+        self, db_session, bundle_cache, content_loads, caplog
+    ):
+        """Test that an asset that is not UTF-8 is only fetched again once it changes."""
+        _, bad = await _add_assets(db_session, 11, **{"a.html": b"<p>A</p>", "b.bin": b"\xff\xfe"})
+
+        await FileAssetResolver.create_for_file(11, db_session)
+        resolver = await FileAssetResolver.create_for_file(11, db_session)
+
+        assert len(content_loads) == 1
+        assert resolver.resolve_asset("b.bin") is None
+        assert len([r for r in caplog.records if "Failed to decode" in r.message]) == 1
+
+        bad.content = b"fixed"
+        await db_session.commit()
+        resolver = await FileAssetResolver.create_for_file(11, db_session)
+
+        assert len(content_loads) == 2
+        assert resolver.resolve_asset("b.bin") == "fixed"
@@ -0,0 +1,157 @@
+"""Tests for bulk writes of in-memory files to the database."""
+
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import select
+
+from aris.models.models import File
+from aris.services import file_metadata
+from aris.services.file_service import FileCreateData, FileUpdateData, InMemoryFileService, bulk
+from aris.services.file_service.bulk import upsert_files
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    """Record the sources whose metadata is extracted."""
+    sources = []
+    extract = file_metadata.extract_metadata
+
+    async def spy(source):
+        sources.append(source)
+        return await extract(source)
+
+    monkeypatch.setattr(file_metadata, "extract_metadata", spy)
+    return sources
+
+
+async def _add_file(db_session, owner_id, source):
+    now = datetime.now(UTC)
+    db_file = File(owner_id=owner_id, source=source, title="", created_at=now, last_edited_at=now)
+    await file_metadata.refresh_file_metadata(db_file)
+    db_session.add(db_file)
+    await db_session.commit()
+    return db_file.id
+
+
+async def _stored(db_session):
+    db_session.expunge_all()
+    result = await db_session.execute(select(File.id, File.source, File.derived_title).order_by(File.id))
+    return {row.id: (row.source, row.derived_title) for row in result}
+
+
+async def test_upsert_inserts_and_updates_rows(db_session, test_user):
+    """Test that one upsert writes new and existing files with their metadata."""
+    existing_id = await _add_file(db_session, test_user.id, ":rsm:\n# Before\n::")
+    service = InMemoryFileService()
+    await service.sync_from_database(db_session)
+    await service.update_file(existing_id, FileUpdateData(source=":rsm:\n# After\n::"))
+    created = await service.create_file(
+        FileCreateData(title="", source=":rsm:\n# New\n::", owner_id=test_user.id)
+    )
+
+    files = await service.get_all_files()
+    assert await upsert_files(db_session, files, chunk_size=1) == 2
+    await db_session.commit()
+
+    assert await _stored(db_session) == {
+        existing_id: (":rsm:\n# After\n::", "After"),
+        created.id: (":rsm:\n# New\n::", "New"),
+    }
+
+
+async def test_upsert_keeps_current_metadata(db_session, test_user, parsed):
+    """Test that metadata is only extracted again for files whose source changed."""
+    file_ids = [await _add_file(db_session, test_user.id, f":rsm:\n# Doc {i}\n::") for i in range(3)]
+    service = InMemoryFileService()
+    await service.sync_from_database(db_session)
+    await service.update_file(file_ids[0], FileUpdateData(title="Renamed"))
+    await service.update_file(file_ids[1], FileUpdateData(source=":rsm:\n# Edited\n::"))
+    parsed.clear()
+
+    await upsert_files(db_session, await service.get_all_files())
+    await db_session.commit()
+
+    assert parsed == [":rsm:\n# Edited\n::"]
+    stored = await _stored(db_session)
+    assert stored[file_ids[0]] == (":rsm:\n# Doc 0\n::", "Doc 0")
+    assert stored[file_ids[1]] == (":rsm:\n# Edited\n::", "Edited")
+
+
+async def test_sync_to_database_writes_only_changed_files(db_session, test_user, monkeypatch):
+    """Test that a sync writes the files changed in memory, and nothing once they are saved."""
+    file_ids = [await _add_file(db_session, test_user.id, f":rsm:\n# Doc {i}\n::") for i in range(4)]
+    service = InMemoryFileService()
+    await service.sync_from_database(db_session)
+    await service.update_file(file_ids[2], FileUpdateData(source=":rsm:\n# Edited\n::"))
+
+    written = []
+    upsert = bulk.upsert_files
+
+    async def spy(db, files, **kwargs):
+        written.append(sorted(file_data.id for file_data in files))
+        return await upsert(db, files, **kwargs)
+
+    monkeypatch.setattr("aris.services.file_service.memory_service.upsert_files", spy)
+    await service.sync_to_database(db_session)
+    await service.sync_to_database(db_session)
+    await service.sync_to_database(db_session, full=True)
+
+    assert written == [[file_ids[2]], [], sorted(file_ids)]
+    assert (await _stored(db_session))[file_ids[2]] == (":rsm:\n# Edited\n::", "Edited")
+
+
+async def test_failed_sync_keeps_files_unsaved(db_session, test_user, monkeypatch):
+    """Test that files stay marked as changed when writing them fails."""
+    file_id = await _add_file(db_session, test_user.id, ":rsm:\nOriginal\n::")
+    service = InMemoryFileService()
+    await service.sync_from_database(db_session)
+    await service.update_file(file_id, FileUpdateData(source=":rsm:\nEdited\n::"))
+
+    async def broken(db, files, **kwargs):
+        raise ConnectionError("database is down")
+
+    monkeypatch.setattr("aris.services.file_service.memory_service.upsert_files", broken)
+    with pytest.raises(ConnectionError):
+        await service.sync_to_database(db_session)
+    monkeypatch.undo()
+
+    await service.sync_to_database(db_session)
+
+    assert (await _stored(db_session))[file_id][0] == ":rsm:\nEdited\n::"
+
+
+async def test_upsert_keeps_owner_and_creation_time(db_session, test_user):
+    """Test that upserting an existing row does not move it to another owner or creation time."""
+    file_id = await _add_file(db_session, test_user.id, ":rsm:\nOriginal\n::")
+    service = InMemoryFileService()
+    await service.sync_from_database(db_session)
+    file_data = await service.update_file(file_id, FileUpdateData(source=":rsm:\nEdited\n::"))
+    file_data.owner_id = test_user.id + 1
+    file_data.created_at = datetime(2000, 1, 1, tzinfo=UTC)
+
+    await upsert_files(db_session, [file_data])
+    await db_session.commit()
+
+    db_session.expunge_all()
+    stored = await db_session.get(File, file_id)
+    assert (stored.source, stored.owner_id) == (":rsm:\nEdited\n::", test_user.id)
+    assert stored.created_at.year != 2000
+
+
+async def test_create_with_taken_id_fails(db_session, test_user):
+    """Test that a file created with an id another process took is not saved over its row."""
+    first, second = InMemoryFileService(), InMemoryFileService()
+    mine = await first.create_file(
+        FileCreateData(title="mine", source=":rsm:\nMine\n::", owner_id=test_user.id)
+    )
+    theirs = await second.create_file(
+        FileCreateData(title="theirs", source=":rsm:\nTheirs\n::", owner_id=test_user.id)
+    )
+    assert mine.id == theirs.id
+
+    assert await first.save_file_to_database(mine.id, db_session)
+    assert not await second.save_file_to_database(theirs.id, db_session)
+
+    assert (await _stored(db_session))[mine.id][0] == ":rsm:\nMine\n::"
+    assert await second.get_file(theirs.id) is None
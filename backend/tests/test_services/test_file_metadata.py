@@ -0,0 +1,223 @@
+"""Tests for metadata derived from file sources and persisted at write time."""
+
+import json
+from datetime import UTC, datetime, timedelta
+
+import pytest
+import rsm
+from sqlalchemy import select
+
+from aris.crud.file import create_file, update_file
+from aris.crud.user import get_user_files
+from aris.models.models import File
+from aris.services.file_metadata import (
+    backfill_file_metadata,
+    is_metadata_current,
+    persisted_title,
+    refresh_file_metadata,
+    source_digest,
+)
+from aris.services.file_service.memory_service import InMemoryFileService
+
+
+SOURCE = """:rsm:
+# Derived Title
+
+:abstract:
+  An *abstract*
+  over two lines.
+::
+
+## Introduction
+
+Text.
+
+### Details
+
+More text.
+
+::"""
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    """Count RSM parses while still running the real parser."""
+    calls = []
+    parser_app = rsm.app.ParserApp
+
+    def counting_parser_app(*args, **kwargs):
+        calls.append(kwargs.get("plain"))
+        return parser_app(*args, **kwargs)
+
+    monkeypatch.setattr(rsm.app, "ParserApp", counting_parser_app)
+    return calls
+
+
+@pytest.fixture
+def no_parsing(monkeypatch):
+    """Fail the test if anything parses RSM."""
+
+    def parser_app(*args, **kwargs):
+        raise AssertionError("RSM was parsed")
+
+    monkeypatch.setattr(rsm.app, "ParserApp", parser_app)
+
+
+async def _add_raw_file(db_session, owner_id, source, edited_at=None):
+    """Insert a file without derived metadata, as rows predating the columns are."""
+    edited_at = edited_at or datetime.now(UTC)
+    db_file = File(owner_id=owner_id, source=source, created_at=edited_at, last_edited_at=edited_at)
+    db_session.add(db_file)
+    await db_session.commit()
+    await db_session.refresh(db_file)
+    return db_file
+
+
+class TestRefreshFileMetadata:
+    """Test write-time extraction of the derived columns."""
+
+    async def test_extracts_title_abstract_and_outline(self):
+        """Test that a single parse fills every derived column."""
+        file = File(owner_id=1, source=SOURCE)
+
+        assert await refresh_file_metadata(file)
+
+        assert file.derived_title == "Derived Title"
+        assert file.derived_abstract == "An abstract over two lines."
+        assert json.loads(file.outline) == [
+            {"title": "Introduction", "level": 2},
+            {"title": "Details", "level": 3},
+        ]
+        assert file.derived_source_hash == source_digest(SOURCE)
+        assert is_metadata_current(file)
+
+    async def test_unchanged_source_is_not_reparsed(self, parse_calls):
+        """Test that refreshing twice parses once."""
+        file = File(owner_id=1, source=SOURCE)
+
+        assert await refresh_file_metadata(file)
+        assert not await refresh_file_metadata(file)
+
+        assert len(parse_calls) == 1
+
+    async def test_edited_source_is_reparsed(self):
+        """Test that a new source invalidates and replaces the derived columns."""
+        file = File(owner_id=1, source=SOURCE)
+        await refresh_file_metadata(file)
+
+        file.source = ":rsm:\n# Renamed\n::"
+        assert persisted_title(file) is None
+        assert await refresh_file_metadata(file)
+
+        assert persisted_title(file) == "Renamed"
+        assert json.loads(file.outline) == []
+
+    async def test_empty_source(self, no_parsing):
+        """Test that empty sources get empty metadata without invoking RSM."""
+        file = File(owner_id=1, source="")
+
+        assert await refresh_file_metadata(file)
+
+        assert file.derived_title == ""
+        assert is_metadata_current(file)
+
+    async def test_parse_failure_leaves_columns_stale(self, monkeypatch):
+        """Test that extraction errors are swallowed and readers keep falling back."""
+
+        def parser_app(*args, **kwargs):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(rsm.app, "ParserApp", parser_app)
+        file = File(owner_id=1, source=SOURCE)
+
+        assert not await refresh_file_metadata(file)
+        assert persisted_title(file) is None
+
+
+class TestPersistedTitlesInListings:
+    """Listings must read persisted titles instead of parsing every document."""
+
+    async def test_crud_writes_populate_metadata(self, db_session, test_user):
+        """Test that crud create and update keep the derived columns current."""
+        file = await create_file(SOURCE, test_user.id, db=db_session)
+        assert file.derived_title == "Derived Title"
+
+        file = await update_file(file.id, None, ":rsm:\n# Second\n::", db_session)
+        assert file.derived_title == "Second"
+        assert is_metadata_current(file)
+
+    async def test_user_files_listing_does_not_parse(self, db_session, test_user, monkeypatch):
+        """Test that listing many documents with current metadata never parses RSM."""
+        for i in range(20):
+            file = File(owner_id=test_user.id, source=f":rsm:\n# Doc {i}\n::")
+            await refresh_file_metadata(file)
+            db_session.add(file)
+        await db_session.commit()
+
+        def parser_app(*args, **kwargs):
+            raise AssertionError("RSM was parsed")
+
+        monkeypatch.setattr(rsm.app, "ParserApp", parser_app)
+        files = await get_user_files(test_user.id, False, db_session)
+
+        assert sorted(f["title"] for f in files) == sorted(f"Doc {i}" for i in range(20))
+
+    async def test_file_service_titles_come_from_database(self, db_session, test_user, monkeypatch):
+        """Test that synced files serve persisted titles without parsing."""
+        file = File(owner_id=test_user.id, source=SOURCE, title="")
+        await refresh_file_metadata(file)
+        db_session.add(file)
+        await db_session.commit()
+
+        def parser_app(*args, **kwargs):
+            raise AssertionError("RSM was parsed")
+
+        monkeypatch.setattr(rsm.app, "ParserApp", parser_app)
+        file_service = InMemoryFileService()
+        await file_service.sync_from_database(db_session)
+
+        assert await file_service.get_file_title(file.id) == "Derived Title"
+
+    async def test_file_service_writes_populate_metadata(self, db_session, test_user):
+        """Test that saving an in-memory file extracts its metadata."""
+        from aris.services.file_service.models import FileCreateData
+
+        file_service = InMemoryFileService()
+        created = await file_service.create_file(
+            FileCreateData(title="", source=SOURCE, owner_id=test_user.id)
+        )
+        assert await file_service.save_file_to_database(created.id, db_session)
+
+        db_file = (await db_session.execute(select(File).where(File.id == created.id))).scalar_one()
+        assert persisted_title(db_file) == "Derived Title"
+
+
+class TestBackfillFileMetadata:
+    """Test the batch job populating existing rows."""
+
+    async def test_backfills_missing_and_stale_rows(self, db_session, test_user):
+        """Test that every row without current metadata is updated, in batches."""
+        edited_at = datetime.now(UTC) - timedelta(days=3)
+        files = [
+            await _add_raw_file(db_session, test_user.id, f":rsm:\n# Old {i}\n::", edited_at)
+            for i in range(5)
+        ]
+        current = File(owner_id=test_user.id, source=":rsm:\n# Current\n::")
+        await refresh_file_metadata(current)
+        db_session.add(current)
+        await db_session.commit()
+
+        assert await backfill_file_metadata(db_session, batch_size=2) == 5
+
+        for i, file in enumerate(files):
+            await db_session.refresh(file)
+            assert persisted_title(file) == f"Old {i}"
+            assert file.last_edited_at.replace(tzinfo=UTC) == edited_at
+
+    async def test_rerun_is_a_noop(self, db_session, test_user, parse_calls):
+        """Test that a second run finds nothing to do and parses nothing."""
+        await _add_raw_file(db_session, test_user.id, SOURCE)
+
+        assert await backfill_file_metadata(db_session) == 1
+        assert await backfill_file_metadata(db_session) == 0
+        assert len(parse_calls) == 1
@@ -446,6 +446,31 @@ class TestInMemoryFileService:
         assert "<" in section_html and ">" in section_html  # Should contain HTML tags
         assert "minimap" in section_html.lower()  # Should contain the first level-2 section content
     
+    @pytest.mark.asyncio
+    async def test_get_file_section_slices_one_render(self, file_service, monkeypatch):
+        """Test that different sections of a file are sliced from a single render."""
+        from aris.services.render_engine import tasks
+        
+        calls = []
+        render_body = tasks.render_body
+        
+        def counting_render_body(source, handrails=True):
+            calls.append(source)
+            return render_body(source, handrails)
+        
+        monkeypatch.setattr(tasks, "render_body", counting_render_body)
+        await file_service.initialize()
+        created_file = await file_service.create_file(
+            FileCreateData(title="Doc", source=":rsm:\n# Title\n\n## First\n\nText.\n::", owner_id=123)
+        )
+        
+        section = await file_service.get_file_section(created_file.id, "level-2")
+        manuscript = await file_service.get_file_section(created_file.id, "manuscript")
+        
+        assert section.startswith('<section class="section level-2"') and "First" in section
+        assert manuscript.startswith('<div class="manuscript"') and section in manuscript
+        assert len(calls) == 1
+    
     @pytest.mark.asyncio 
     async def test_html_caching_with_real_rsm(self, file_service):
         """Test that HTML caching works correctly with real RSM rendering."""
@@ -679,31 +704,26 @@ class TestInMemoryFileServiceAssetIntegration:
         from aris.models.models import FileAsset
         
         # Create a real test database asset that the real resolver will find (HTML file)
-        # Asset content should be base64 encoded as it's stored in the database
-        import base64
         html_content = "<div class='test-asset'>Test Asset Content</div>"
-        base64_content = base64.b64encode(html_content.encode('utf-8')).decode('ascii')
         
         test_asset = FileAsset(
+            id=1,
             filename="test_figure.html",
             mime_type="text/html",
-            content=base64_content,  # Store as base64 like the real system
+            content=html_content.encode('utf-8'),
             file_id=created_file.id,
             owner_id=123
         )
         
-        # Mock the database execute call to return our test asset
+        # Mock the database execute calls: asset metadata first, then contents
         from unittest.mock import AsyncMock, MagicMock
         
-        # Create proper mock for the database query result
-        mock_scalars = MagicMock()
-        mock_scalars.all.return_value = [test_asset]
+        metadata_result = MagicMock()
+        metadata_result.all.return_value = [test_asset]
+        content_result = MagicMock()
+        content_result.all.return_value = [(test_asset.id, test_asset.filename, test_asset.content)]
         
-        mock_result = MagicMock()
-        mock_result.scalars.return_value = mock_scalars
-        
-        # Mock db.execute to return our mock result
-        mock_db.execute = AsyncMock(return_value=mock_result)
+        mock_db.execute = AsyncMock(side_effect=[metadata_result, content_result])
         
         # Get HTML rendering with database session - should use asset resolver
         html = await file_service.get_file_html(created_file.id, db=mock_db)
@@ -713,7 +733,7 @@ class TestInMemoryFileServiceAssetIntegration:
         assert "Test Asset Content" in html  # Asset content should be embedded
         
         # Verify that the database was actually queried for assets
-        mock_db.execute.assert_called_once()
+        assert mock_db.execute.await_count == 2
     
     @pytest.mark.asyncio
     async def test_get_file_html_falls_back_without_db_session(self, file_service):
@@ -737,4 +757,357 @@ class TestInMemoryFileServiceAssetIntegration:
         
         # Should still render but without asset resolution
         assert html is not None
-        assert "missing-image.png" in html  # Original path should remain (no resolution)
\ No newline at end of file
+        assert "missing-image.png" in html  # Original path should remain (no resolution)
+
+class TestInMemoryFileServiceIncrementalSync:
+    """Test incremental change-feed sync from the database."""
+    
+    @pytest.fixture
+    def file_service(self):
+        """Create a fresh file service for each test."""
+        return InMemoryFileService()
+    
+    async def _add_file(self, db_session, owner_id, source, title=""):
+        from aris.models.models import File
+        
+        now = datetime.now(UTC)
+        db_file = File(owner_id=owner_id, source=source, title=title, created_at=now, last_edited_at=now)
+        db_session.add(db_file)
+        await db_session.commit()
+        await db_session.refresh(db_file)
+        return db_file
+    
+    @pytest.mark.asyncio
+    async def test_first_sync_loads_all_files(self, file_service, db_session, test_user):
+        """Test that the first sync loads every non-deleted file."""
+        await self._add_file(db_session, test_user.id, ":rsm:\nOne\n::")
+        await self._add_file(db_session, test_user.id, ":rsm:\nTwo\n::")
+        
+        await file_service.sync_from_database(db_session)
+        
+        all_files = await file_service.get_all_files()
+        assert len(all_files) == 2
+    
+    @pytest.mark.asyncio
+    async def test_incremental_sync_picks_up_new_and_edited_files(self, file_service, db_session, test_user):
+        """Test that edits and inserts made after the first sync are visible."""
+        first = await self._add_file(db_session, test_user.id, ":rsm:\nOriginal\n::")
+        await file_service.sync_from_database(db_session)
+        
+        first.source = ":rsm:\nEdited\n::"
+        first.last_edited_at = datetime.now(UTC)
+        await db_session.commit()
+        second = await self._add_file(db_session, test_user.id, ":rsm:\nNew\n::")
+        
+        await file_service.sync_from_database(db_session)
+        
+        assert (await file_service.get_file(first.id)).source == ":rsm:\nEdited\n::"
+        assert (await file_service.get_file(second.id)).source == ":rsm:\nNew\n::"
+    
+    @pytest.mark.asyncio
+    async def test_incremental_sync_keeps_caches_of_unchanged_files(self, file_service, db_session, test_user):
+        """Test that cached renders survive a sync when the source did not change."""
+        unchanged = await self._add_file(db_session, test_user.id, ":rsm:\n# Stable\n::")
+        edited = await self._add_file(db_session, test_user.id, ":rsm:\n# Before\n::")
+        await file_service.sync_from_database(db_session)
+        
+        unchanged_data = await file_service.get_file(unchanged.id)
+        edited_data = await file_service.get_file(edited.id)
+        unchanged_data._extracted_title = "cached"
+        edited_data._extracted_title = "cached"
+        
+        edited.source = ":rsm:\n# After\n::"
+        edited.last_edited_at = datetime.now(UTC)
+        await db_session.commit()
+        await file_service.sync_from_database(db_session)
+        
+        assert (await file_service.get_file(unchanged.id)) is unchanged_data
+        assert (await file_service.get_file(unchanged.id))._extracted_title == "cached"
+        assert (await file_service.get_file(edited.id))._extracted_title is None
+    
+    @pytest.mark.asyncio
+    async def test_incremental_sync_drops_soft_deleted_files(self, file_service, db_session, test_user):
+        """Test that rows soft deleted in the database disappear from memory."""
+        db_file = await self._add_file(db_session, test_user.id, ":rsm:\nDoomed\n::")
+        await file_service.sync_from_database(db_session)
+        
+        db_file.deleted_at = datetime.now(UTC)
+        await db_session.commit()
+        await file_service.sync_from_database(db_session)
+        
+        assert await file_service.get_file(db_file.id) is None
+        assert await file_service.get_user_files(test_user.id) == []
+    
+    @pytest.mark.asyncio
+    async def test_incremental_sync_falls_back_to_full_reload_on_drift(self, file_service, db_session, test_user):
+        """Test that rows removed without a timestamp trigger a full reload."""
+        from sqlalchemy import delete
+
+        from aris.models.models import File
+        
+        db_file = await self._add_file(db_session, test_user.id, ":rsm:\nGone\n::")
+        await file_service.sync_from_database(db_session)
+        
+        await db_session.execute(delete(File).where(File.id == db_file.id))
+        await db_session.commit()
+        # Within the interval the row count is not checked
+        await file_service.sync_from_database(db_session)
+        assert len(await file_service.get_all_files()) == 1
+        
+        file_service._drift_checked_at -= file_service.DRIFT_CHECK_INTERVAL.total_seconds()
+        await file_service.sync_from_database(db_session)
+        
+        assert await file_service.get_all_files() == []
+    
+    @pytest.mark.asyncio
+    async def test_sync_without_high_water_mark_reloads_fully(self, file_service, db_session, monkeypatch):
+        """Test that syncs before any row set the high-water mark take the full path."""
+        await file_service.sync_from_database(db_session)
+        
+        async def unexpected(db):
+            raise AssertionError("incremental sync without a high-water mark")
+        
+        monkeypatch.setattr(file_service, "_incremental_sync_from_database", unexpected)
+        await file_service.sync_from_database(db_session)
+    
+    @pytest.mark.asyncio
+    async def test_full_sync_keeps_unsaved_files(self, file_service, db_session, test_user):
+        """Test that a full sync keeps files created in memory and not written yet."""
+        await file_service.sync_from_database(db_session)
+        created = await file_service.create_file(
+            FileCreateData(title="", source=":rsm:\nUnsaved\n::", owner_id=test_user.id)
+        )
+        
+        await file_service.sync_from_database(db_session, full=True)
+        
+        assert (await file_service.get_file(created.id)).source == ":rsm:\nUnsaved\n::"
+        assert [f.id for f in await file_service.get_user_files(test_user.id)] == [created.id]
+    
+    @pytest.mark.asyncio
+    async def test_incremental_sync_only_fetches_changed_rows(self, file_service, db_session, test_user):
+        """Test that an incremental sync does not reload unchanged rows."""
+        from datetime import timedelta
+        
+        old = await self._add_file(db_session, test_user.id, ":rsm:\nOld\n::")
+        old.last_edited_at = datetime.now(UTC) - timedelta(hours=1)
+        await db_session.commit()
+        recent = await self._add_file(db_session, test_user.id, ":rsm:\nRecent\n::")
+        await file_service.sync_from_database(db_session)
+        
+        fetched = []
+        original_apply = file_service._apply_db_file
+        
+        def spy(db_file, existing):
+            fetched.append(db_file.id)
+            return original_apply(db_file, existing)
+        
+        file_service._apply_db_file = spy
+        await file_service.sync_from_database(db_session)
+        
+        assert old.id not in fetched
+        assert recent.id in fetched
+
+
+class TestFileCacheInvalidation:
+    """Cached renders must never outlive the source, assets or renderer they came from."""
+    
+    @pytest.fixture
+    def file_service(self):
+        """Create a fresh file service for each test."""
+        return InMemoryFileService()
+    
+    @pytest.fixture
+    def echo_render(self, monkeypatch):
+        """Replace rsm.render with a stand-in that echoes its source and counts calls."""
+        import rsm
+        
+        calls = []
+        
+        def render(source, handrails=True, **kwargs):
+            calls.append(source)
+            return f"<html>{source}</html>"
+        
+        monkeypatch.setattr(rsm, "render", render)
+        return calls
+    
+    async def _create(self, file_service, source=":rsm:\nOriginal\n::", owner_id=1):
+        return await file_service.create_file(FileCreateData(title="Doc", source=source, owner_id=owner_id))
+    
+    def test_cache_is_stamped_with_source_assets_and_renderer(self):
+        """Test that changing any input hands out a fresh cache entry."""
+        from aris.services.render_cache import invalidate_renderer
+        
+        now = datetime.now(UTC)
+        file_data = FileData(
+            id=1, title="", abstract="", source=":rsm:\nA\n::", owner_id=1,
+            status=FileStatus.DRAFT, created_at=now, last_edited_at=now,
+        )
+        file_data.cache().html = "<p>A</p>"
+        
+        file_data.source = ":rsm:\nB\n::"
+        assert file_data.cache().html is None
+        file_data.cache().html = "<p>B</p>"
+        
+        file_data.invalidate_assets()
+        assert file_data.cache().html is None
+        file_data.cache().html = "<p>B</p>"
+        
+        invalidate_renderer()
+        assert file_data.cache().html is None
+    
+    def test_cache_for_rejects_outdated_stamp(self):
+        """Test that values computed for an old stamp are not stored."""
+        now = datetime.now(UTC)
+        file_data = FileData(
+            id=1, title="", abstract="", source=":rsm:\nA\n::", owner_id=1,
+            status=FileStatus.DRAFT, created_at=now, last_edited_at=now,
+        )
+        stamp = file_data.cache_stamp()
+        assert file_data.cache_for(stamp) is file_data.cache()
+        
+        file_data.source = ":rsm:\nB\n::"
+        assert file_data.cache_for(stamp) is None
+    
+    @pytest.mark.asyncio
+    async def test_edit_never_serves_stale_html(self, file_service, echo_render):
+        """Test that both HTML variants follow the source across edits."""
+        created = await self._create(file_service)
+        assert await file_service.get_file_html(created.id) == "<html>:rsm:\nOriginal\n::</html>"
+        
+        await file_service.update_file(created.id, FileUpdateData(source=":rsm:\nEdited\n::"))
+        
+        assert await file_service.get_file_html(created.id) == "<html>:rsm:\nEdited\n::</html>"
+
+    @pytest.mark.asyncio
+    async def test_incremental_render_follows_edits(self, file_service, monkeypatch):
+        """Test that incremental renders reuse the previous fragments and match full renders."""
+        import rsm
+
+        from aris.config import settings
+        from aris.services.render_engine import tasks
+
+        monkeypatch.setattr(settings, "RENDER_INCREMENTAL", True)
+        previous = []
+        render_incremental = tasks.render_incremental
+
+        def spy(source, handrails=True, asset_resolver=None, fragments=None):
+            previous.append(fragments)
+            return render_incremental(source, handrails, asset_resolver, fragments)
+
+        monkeypatch.setattr(tasks, "render_incremental", spy)
+        source = ":rsm:\n# Doc\n\n## One\n\nFirst.\n\n## Two\n\nSecond.\n::"
+        created = await self._create(file_service, source=source)
+        await file_service.get_file_html(created.id)
+
+        edited = source.replace("Second.", "Second, edited.")
+        await file_service.update_file(created.id, FileUpdateData(source=edited))
+        html = await file_service.get_file_html(created.id)
+
+        assert html == rsm.render(edited, handrails=True)
+        assert previous[0] is None
+        assert previous[1]
+
+    @pytest.mark.asyncio
+    async def test_edit_during_render_is_not_shadowed(self, file_service, monkeypatch):
+        """Test that a render finishing after an edit does not cache the old HTML."""
+        import asyncio
+
+        import rsm
+        
+        created = await self._create(file_service)
+        started = asyncio.Event()
+        release = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        
+        def render(source, handrails=True, **kwargs):
+            loop.call_soon_threadsafe(started.set)
+            asyncio.run_coroutine_threadsafe(release.wait(), loop).result()
+            return f"<html>{source}</html>"
+        
+        monkeypatch.setattr(rsm, "render", render)
+        pending = asyncio.create_task(file_service.get_file_html(created.id))
+        await started.wait()
+        await file_service.update_file(created.id, FileUpdateData(source=":rsm:\nEdited\n::"))
+        release.set()
+        
+        assert await pending == "<html>:rsm:\nOriginal\n::</html>"
+        assert (await file_service.get_file(created.id))._rendered_html is None
+        assert await file_service.get_file_html(created.id) == "<html>:rsm:\nEdited\n::</html>"
+    
+    @pytest.mark.asyncio
+    async def test_renderer_invalidation_rerenders(self, file_service, echo_render):
+        """Test that invalidating the renderer forces a new render."""
+        from aris.services.render_cache import invalidate_renderer
+        
+        created = await self._create(file_service)
+        await file_service.get_file_html(created.id)
+        await file_service.get_file_html(created.id)
+        assert len(echo_render) == 1
+        
+        invalidate_renderer()
+        await file_service.get_file_html(created.id)
+        assert len(echo_render) == 2
+    
+    @pytest.mark.asyncio
+    async def test_invalidate_file_assets(self, file_service):
+        """Test that asset invalidation drops renders but keeps the source-only title."""
+        created = await self._create(file_service)
+        file_data = await file_service.get_file(created.id)
+        file_data.cache().html_with_assets = "<p>old assets</p>"
+        
+        await file_service.invalidate_file_assets(created.id)
+        await file_service.invalidate_file_assets(999)  # unknown files are ignored
+        
+        assert file_data.cache().html_with_assets is None
+    
+    @pytest.mark.asyncio
+    async def test_sync_picks_up_asset_changes(self, file_service, db_session, test_user):
+        """Test that assets changed by another process invalidate renders on the next sync."""
+        from datetime import timedelta
+
+        from aris.models.models import File, FileAsset
+        
+        now = datetime.now(UTC)
+        db_file = File(owner_id=test_user.id, source=":rsm:\nA\n::", title="", created_at=now, last_edited_at=now)
+        db_session.add(db_file)
+        await db_session.commit()
+        await file_service.sync_from_database(db_session)
+        file_data = await file_service.get_file(db_file.id)
+        
+        file_data.cache().html_with_assets = "<p>no assets</p>"
+        asset = FileAsset(
+            filename="a.txt", mime_type="text/plain", content=b"A",
+            file_id=db_file.id, owner_id=test_user.id,
+        )
+        db_session.add(asset)
+        await db_session.commit()
+        await file_service.sync_from_database(db_session)
+        assert file_data.cache().html_with_assets is None
+        
+        # The overlap window returns the same change again; it is applied only once
+        file_data.cache().html_with_assets = "<p>one asset</p>"
+        await file_service.sync_from_database(db_session)
+        assert file_data.cache().html_with_assets == "<p>one asset</p>"
+        
+        asset.content = b"B"
+        asset.updated_at = datetime.now(UTC) + timedelta(seconds=1)
+        await db_session.commit()
+        await file_service.sync_from_database(db_session)
+        assert file_data.cache().html_with_assets is None
+    
+    def test_clear_cache(self):
+        """Test that clear_cache drops every cached value."""
+        now = datetime.now(UTC)
+        file_data = FileData(
+            id=1, title="", abstract="", source=":rsm:\nA\n::", owner_id=1,
+            status=FileStatus.DRAFT, created_at=now, last_edited_at=now,
+        )
+        file_data._rendered_html = "<p>A</p>"
+        file_data._sections["abstract"] = "<p>abs</p>"
+        file_data._extracted_title = "A"
+        
+        file_data.clear_cache()
+        
+        assert file_data._rendered_html is None
+        assert file_data._sections == {}
+        assert file_data._extracted_title is None
@@ -0,0 +1,200 @@
+"""Concurrency stress tests for the in-memory file service."""
+
+import asyncio
+import time
+
+import pytest
+import rsm
+
+from aris.services import render_engine
+from aris.services.asset_resolver import FileAssetResolver
+from aris.services.file_service.memory_service import InMemoryFileService
+from aris.services.file_service.models import FileCreateData, FileUpdateData
+
+
+RENDER_DELAY = 0.2
+
+
+@pytest.fixture(autouse=True)
+async def thread_engine(monkeypatch):
+    """Render on enough threads that the service, not the engine, is the bottleneck."""
+    engine = render_engine.ThreadRenderEngine(workers=16, max_queue=64, timeout=10)
+    monkeypatch.setattr(render_engine, "_render_engine", engine)
+    yield engine
+    await engine.shutdown()
+
+
+@pytest.fixture
+def slow_render(monkeypatch):
+    """Replace rsm.render with a slow, blocking stand-in that echoes its source."""
+    calls = []
+
+    def render(source, handrails=True, **kwargs):
+        calls.append(source)
+        time.sleep(RENDER_DELAY)
+        return f"<html>{source}</html>"
+
+    monkeypatch.setattr(rsm, "render", render)
+    return calls
+
+
+async def _create_files(service, n):
+    return [
+        await service.create_file(FileCreateData(title=f"Doc {i}", source=f":rsm:\nDoc {i}\n::", owner_id=1))
+        for i in range(n)
+    ]
+
+
+class TestInMemoryFileServiceConcurrency:
+    """Renders of different documents must not serialize on a service-wide lock."""
+
+    async def test_renders_of_distinct_files_run_in_parallel(self, slow_render):
+        """Rendering N documents concurrently takes far less than N sequential renders."""
+        service = InMemoryFileService()
+        files = await _create_files(service, 8)
+
+        start = time.perf_counter()
+        htmls = await asyncio.gather(*(service.get_file_html(f.id) for f in files))
+        elapsed = time.perf_counter() - start
+
+        assert htmls == [f"<html>{f.source}</html>" for f in files]
+        assert elapsed < RENDER_DELAY * len(files) / 2
+
+    async def test_slow_render_does_not_block_other_files(self, slow_render):
+        """Reads and writes of other documents complete while a render is in flight."""
+        service = InMemoryFileService()
+        rendering, other = await _create_files(service, 2)
+
+        render_task = asyncio.create_task(service.get_file_html(rendering.id))
+        await asyncio.sleep(RENDER_DELAY / 10)
+
+        start = time.perf_counter()
+        assert await service.get_file(other.id) is other
+        assert await service.get_user_files(1)
+        updated = await service.update_file(other.id, FileUpdateData(source=":rsm:\nEdited\n::"))
+        deleted = await service.delete_file(other.id)
+        elapsed = time.perf_counter() - start
+
+        assert not render_task.done()
+        assert updated.source == ":rsm:\nEdited\n::"
+        assert deleted is True
+        assert elapsed < RENDER_DELAY / 2
+        await render_task
+
+    async def test_render_of_stale_source_is_not_cached(self, slow_render):
+        """An update landing mid-render must not be shadowed by the old HTML."""
+        service = InMemoryFileService()
+        [file_data] = await _create_files(service, 1)
+        old_source = file_data.source
+
+        render_task = asyncio.create_task(service.get_file_html(file_data.id))
+        await asyncio.sleep(RENDER_DELAY / 10)
+        await service.update_file(file_data.id, FileUpdateData(source=":rsm:\nNew\n::"))
+
+        assert await render_task == f"<html>{old_source}</html>"
+        assert await service.get_file_html(file_data.id) == "<html>:rsm:\nNew\n::</html>"
+        assert slow_render == [old_source, ":rsm:\nNew\n::"]
+
+    async def test_concurrent_updates_to_many_files(self):
+        """Interleaved updates across many files all land on the right document."""
+        service = InMemoryFileService()
+        files = await _create_files(service, 20)
+
+        async def edit(file_data, round_):
+            await asyncio.sleep(0)
+            await service.update_file(file_data.id, FileUpdateData(source=f"{file_data.id}:{round_}"))
+
+        await asyncio.gather(*(edit(f, r) for r in range(10) for f in files))
+
+        for f in files:
+            assert (await service.get_file(f.id)).source == f"{f.id}:9"
+
+
+class TestRenderSingleFlight:
+    """Concurrent renders of the same document and source share one render."""
+
+    async def test_concurrent_requests_for_same_file_render_once(self, slow_render):
+        """A burst of requests for one document runs rsm.render a single time."""
+        service = InMemoryFileService()
+        [file_data] = await _create_files(service, 1)
+
+        htmls = await asyncio.gather(*(service.get_file_html(file_data.id) for _ in range(10)))
+
+        assert len(set(htmls)) == 1
+        assert len(slow_render) == 1
+        stats = service.get_render_stats()
+        assert stats["executed"] == 1
+        assert stats["coalesced"] == 9
+        assert stats["in_flight"] == 0
+
+    async def test_callers_resolve_assets_with_their_own_session(self, slow_render, monkeypatch):
+        """Requests with assets share the render but never another request's session."""
+        sessions = []
+
+        async def create_for_file(file_id, db, source=None):
+            sessions.append(db)
+            return FileAssetResolver({})
+
+        monkeypatch.setattr(FileAssetResolver, "create_for_file", staticmethod(create_for_file))
+        service = InMemoryFileService()
+        [file_data] = await _create_files(service, 1)
+        dbs = [object() for _ in range(3)]
+
+        await asyncio.gather(*(service.get_file_html(file_data.id, db=db) for db in dbs))
+
+        assert sessions == dbs
+        assert len(slow_render) == 1
+        assert service.get_render_stats()["coalesced"] == 2
+
+    async def test_distinct_files_are_not_coalesced(self, slow_render):
+        """Requests for different documents each get their own render."""
+        service = InMemoryFileService()
+        files = await _create_files(service, 3)
+
+        await asyncio.gather(*(service.get_file_html(f.id) for f in files for _ in range(2)))
+
+        assert sorted(slow_render) == sorted(f.source for f in files)
+        assert service.get_render_stats()["coalesced"] == 3
+
+    async def test_new_source_is_not_coalesced_with_old_render(self, slow_render):
+        """A request arriving after an edit does not join the render of the old source."""
+        service = InMemoryFileService()
+        [file_data] = await _create_files(service, 1)
+
+        first = asyncio.create_task(service.get_file_html(file_data.id))
+        await asyncio.sleep(RENDER_DELAY / 10)
+        await service.update_file(file_data.id, FileUpdateData(source=":rsm:\nNew\n::"))
+        second = await service.get_file_html(file_data.id)
+
+        assert second == "<html>:rsm:\nNew\n::</html>"
+        assert await first != second
+        assert service.get_render_stats()["coalesced"] == 0
+
+    async def test_cancelled_waiter_does_not_cancel_shared_render(self, slow_render):
+        """A disconnecting client leaves the render running for the other waiters."""
+        service = InMemoryFileService()
+        [file_data] = await _create_files(service, 1)
+
+        leader = asyncio.create_task(service.get_file_html(file_data.id))
+        follower = asyncio.create_task(service.get_file_html(file_data.id))
+        await asyncio.sleep(RENDER_DELAY / 10)
+        leader.cancel()
+
+        assert await follower == f"<html>{file_data.source}</html>"
+        assert leader.cancelled()
+        assert len(slow_render) == 1
+
+    async def test_render_failure_is_shared_fallback(self, monkeypatch):
+        """When the render fails, every waiter gets the same fallback HTML."""
+        def failing_render(source, handrails=True, **kwargs):
+            time.sleep(RENDER_DELAY / 4)
+            raise ValueError("boom")
+
+        monkeypatch.setattr(rsm, "render", failing_render)
+        service = InMemoryFileService()
+        [file_data] = await _create_files(service, 1)
+
+        htmls = await asyncio.gather(*(service.get_file_html(file_data.id) for _ in range(3)))
+
+        assert htmls == [f"<p>Rendered: {file_data.source}</p>"] * 3
+        assert service.get_render_stats()["executed"] == 1
@@ -0,0 +1,89 @@
+"""Tests for incremental rendering with reused block fragments."""
+
+import pytest
+import rsm
+
+from aris.services.render_engine.incremental import render_incremental
+
+
+def _document(n_sections: int = 6, toc: bool = False) -> str:
+    sections = "\n".join(
+        f"## Section {i}\n:label: sec-{i}\n\n"
+        f"Text with $x^{i}$. See :ref:sec-{(i + 2) % n_sections}:: and :cite:bib::.\n\n"
+        f":theorem:\n  :label: thm-{i}\n\n  Statement {i}.\n\n::\n\n### Sub\n\nMore $$ y $$. text.\n"
+        for i in range(n_sections)
+    )
+    references = ":references:\n  :bibtex:\n  @article{bib, title={T}, author={A}, year={2000}}\n  ::\n::\n"
+    return ":rsm:\n# Title\n\n" + (":toc:\n\n" if toc else "") + sections + "\n" + references + "::"
+
+
+EDITS = {
+    "typing": lambda s: s.replace("Statement 3.", "Statement 3, edited."),
+    "new paragraph": lambda s: s.replace("Statement 3.", "Statement 3.\n\n  Another paragraph."),
+    "new section": lambda s: s.replace("## Section 3\n", "## Inserted\n\nText.\n\n## Section 3\n"),
+    "referenced title": lambda s: s.replace("## Section 4\n", "## Section four\n"),
+    "deleted section": lambda s: s.replace("## Section 1\n", "").replace(":label: sec-1\n", ""),
+    "bibliography": lambda s: s.replace("year={2000}", "year={1999}"),
+    "manuscript title": lambda s: s.replace("# Title", "# Other title"),
+}
+
+
+@pytest.mark.parametrize("toc", [False, True])
+@pytest.mark.parametrize("handrails", [True, False])
+@pytest.mark.parametrize("edit", EDITS.values(), ids=EDITS.keys())
+def test_matches_full_render_after_edit(edit, handrails, toc):
+    """Test that an incremental render after an edit matches a full render."""
+    source = _document(toc=toc)
+    html, fragments = render_incremental(source, handrails)
+    assert html == rsm.render(source, handrails=handrails)
+
+    edited = edit(source)
+    html, _ = render_incremental(edited, handrails, fragments=fragments)
+
+    assert html == rsm.render(edited, handrails=handrails)
+
+
+def test_unchanged_blocks_are_reused(monkeypatch):
+    """Test that only the edited block is translated again."""
+    source = _document()
+    _, fragments = render_incremental(source)
+    edited = EDITS["typing"](source)
+
+    translated = []
+    original = rsm.translator.HandrailsTranslator.visit_section
+
+    def visit_section(self, node):
+        translated.append(node.title)
+        return original(self, node)
+
+    monkeypatch.setattr(rsm.translator.HandrailsTranslator, "visit_section", visit_section)
+    _, new_fragments = render_incremental(edited, fragments=fragments)
+
+    assert translated == ["Section 3", "Sub"]
+    assert len(new_fragments) == len(fragments)
+    assert len(set(new_fragments) - set(fragments)) == 1
+
+
+def test_table_of_contents_is_always_translated():
+    """Test that blocks holding a table of contents are never reused."""
+    source = _document(toc=True)
+    _, fragments = render_incremental(source)
+    _, again = render_incremental(source, fragments=fragments)
+
+    assert set(again) == set(fragments)
+    assert not any('class="toc' in html for html in fragments.values())
+
+
+def test_fragments_need_an_asset_digest():
+    """Test that fragments are ignored when assets cannot be fingerprinted."""
+    class Resolver:
+        def resolve_asset(self, path):
+            return None
+
+    source = _document()
+    _, fragments = render_incremental(source)
+    stale = {fingerprint: "<p>stale</p>" for fingerprint in fragments}
+
+    html, _ = render_incremental(source, asset_resolver=Resolver(), fragments=stale)
+
+    assert "stale" not in html
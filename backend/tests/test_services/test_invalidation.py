@@ -0,0 +1,232 @@
+"""Tests for cache coherence between file services through an invalidation bus."""
+
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from aris.models.models import File
+from aris.services.file_service import (
+    FileCreateData,
+    FileUpdateData,
+    InMemoryFileService,
+    InvalidationEvent,
+    LocalInvalidationBus,
+    PostgresInvalidationBus,
+    TextOperation,
+    create_invalidation_bus,
+    source_version,
+)
+from aris.services.file_service.invalidation import CHANNEL, dumps, loads
+
+
+@pytest.fixture
+def session_factory(db_session, test_engine):
+    return async_sessionmaker(test_engine, expire_on_commit=False)
+
+
+@pytest.fixture
+async def workers(db_session):
+    """Two file services sharing a local bus, as if they ran in separate workers."""
+    subscribers = set()
+    services = [InMemoryFileService(), InMemoryFileService()]
+    for service in services:
+        await service.attach_invalidation_bus(LocalInvalidationBus(subscribers))
+    yield services
+    for service in services:
+        await service.stop_write_behind()
+        await service.detach_invalidation_bus()
+
+
+async def _add_file(db_session, owner_id, source):
+    now = datetime.now(UTC)
+    db_file = File(owner_id=owner_id, source=source, title="", created_at=now, last_edited_at=now)
+    db_session.add(db_file)
+    await db_session.commit()
+    return db_file.id
+
+
+async def _edit_out_of_band(session_factory, file_id, source):
+    async with session_factory() as db:
+        await db.execute(
+            update(File).where(File.id == file_id).values(source=source, last_edited_at=datetime.now(UTC))
+        )
+        await db.commit()
+
+
+async def test_announced_edit_reaches_other_worker(workers, db_session, session_factory, test_user):
+    """Test that a worker reloads announced files and notices rows changed without an announcement."""
+    writer, reader = workers
+    announced = await _add_file(db_session, test_user.id, ":rsm:\nOriginal\n::")
+    silent = await _add_file(db_session, test_user.id, ":rsm:\nOriginal\n::")
+    for service in workers:
+        await service.sync_from_database(db_session)
+
+    await writer.update_file(announced, FileUpdateData(source=":rsm:\nEdited\n::"))
+    assert await writer.update_file_in_database(announced, db_session)
+    await reader.sync_from_database(db_session)
+    assert (await reader.get_file(announced)).source == ":rsm:\nEdited\n::"
+
+    await _edit_out_of_band(session_factory, silent, ":rsm:\nEdited\n::")
+    inserted = await _add_file(db_session, test_user.id, ":rsm:\nInserted\n::")
+    await reader.sync_from_database(db_session)
+
+    assert (await reader.get_file(silent)).source == ":rsm:\nEdited\n::"
+    assert (await reader.get_file(inserted)).source == ":rsm:\nInserted\n::"
+
+
+async def test_created_files_get_ids_from_database(workers, db_session, test_user):
+    """Test that workers creating files at the same time get distinct ids from the database."""
+    for service in workers:
+        await service.sync_from_database(db_session)
+
+    created = [
+        await service.create_file(
+            FileCreateData(title="", source=f":rsm:\nWorker {i}\n::", owner_id=test_user.id), db_session
+        )
+        for i, service in enumerate(workers)
+    ]
+
+    assert created[0].id != created[1].id
+    for service in workers:
+        await service.sync_from_database(db_session)
+        assert [(await service.get_file(file_data.id)).source for file_data in created] == [
+            ":rsm:\nWorker 0\n::", ":rsm:\nWorker 1\n::"
+        ]
+
+
+async def test_announced_create_and_delete(workers, db_session, test_user):
+    """Test that files created and deleted by another worker appear and disappear."""
+    writer, reader = workers
+    for service in workers:
+        await service.sync_from_database(db_session)
+
+    created = await writer.create_file(FileCreateData(title="", source=":rsm:\nNew\n::", owner_id=test_user.id))
+    assert await writer.save_file_to_database(created.id, db_session)
+    await reader.sync_from_database(db_session)
+    assert (await reader.get_file(created.id)).source == ":rsm:\nNew\n::"
+
+    assert await writer.delete_file(created.id)
+    assert await writer.delete_file_in_database(created.id, db_session)
+    await reader.sync_from_database(db_session)
+    assert await reader.get_file(created.id) is None
+
+
+async def test_patch_is_announced(workers, db_session, test_user):
+    """Test that delta edits written without loading the row are announced."""
+    writer, reader = workers
+    file_id = await _add_file(db_session, test_user.id, ":rsm:\nOriginal\n::")
+    for service in workers:
+        await service.sync_from_database(db_session)
+
+    file_data = await writer.get_file(file_id)
+    await writer.patch_file_source(
+        file_id, source_version(file_data.source), [TextOperation(offset=6, delete=8, insert="Patched")]
+    )
+    assert await writer.update_source_in_database(file_id, db_session)
+    await reader.sync_from_database(db_session)
+
+    assert (await reader.get_file(file_id)).source == ":rsm:\nPatched\n::"
+
+
+async def test_write_behind_flush_is_announced(workers, db_session, session_factory, test_user):
+    """Test that edits persisted by the write-behind queue are announced once written."""
+    writer, reader = workers
+    file_id = await _add_file(db_session, test_user.id, ":rsm:\nOriginal\n::")
+    for service in workers:
+        await service.sync_from_database(db_session)
+    queue = writer.start_write_behind(session_factory, interval=60)
+
+    await writer.update_file(file_id, FileUpdateData(source=":rsm:\nEdited\n::"))
+    await writer.update_file_in_database(file_id, db_session)
+    await reader.sync_from_database(db_session)
+    assert (await reader.get_file(file_id)).source == ":rsm:\nOriginal\n::"
+
+    await queue.flush()
+    await reader.sync_from_database(db_session)
+    assert (await reader.get_file(file_id)).source == ":rsm:\nEdited\n::"
+
+
+async def test_asset_changes_are_announced(workers, db_session, test_user):
+    """Test that asset invalidations reach the renders cached by other workers."""
+    writer, reader = workers
+    file_id = await _add_file(db_session, test_user.id, ":rsm:\nOriginal\n::")
+    for service in workers:
+        await service.sync_from_database(db_session)
+    assets_version = (await reader.get_file(file_id)).assets_version
+
+    await writer.invalidate_file_assets(file_id)
+
+    assert (await reader.get_file(file_id)).assets_version == assets_version + 1
+
+
+async def test_detached_bus_falls_back_to_change_feed(workers, db_session, session_factory, test_user):
+    """Test that a worker without a listening bus catches up from the database."""
+    _, reader = workers
+    file_id = await _add_file(db_session, test_user.id, ":rsm:\nOriginal\n::")
+    await reader.sync_from_database(db_session)
+
+    await reader._bus.stop()
+    await _edit_out_of_band(session_factory, file_id, ":rsm:\nEdited\n::")
+    await reader.sync_from_database(db_session)
+
+    assert (await reader.get_file(file_id)).source == ":rsm:\nEdited\n::"
+
+
+async def test_restarted_bus_forces_catch_up(workers, db_session, session_factory, test_user):
+    """Test that the first sync after the bus may have missed events reads the change feed."""
+    _, reader = workers
+    file_id = await _add_file(db_session, test_user.id, ":rsm:\nOriginal\n::")
+    await reader.sync_from_database(db_session)
+
+    await reader._bus.stop()
+    await _edit_out_of_band(session_factory, file_id, ":rsm:\nEdited\n::")
+    await reader._bus.start(reader._on_invalidation)
+    await reader.sync_from_database(db_session)
+
+    assert (await reader.get_file(file_id)).source == ":rsm:\nEdited\n::"
+
+
+async def test_publisher_ignores_own_events():
+    """Test that a bus does not deliver events back to their publisher."""
+    subscribers = set()
+    received = {"a": [], "b": []}
+    a, b = LocalInvalidationBus(subscribers), LocalInvalidationBus(subscribers)
+    await a.start(received["a"].append)
+    await b.start(received["b"].append)
+
+    event = InvalidationEvent(1, "abc")
+    await a.publish([event])
+
+    assert received == {"a": [], "b": [event]}
+
+
+def test_payload_round_trip():
+    """Test that notification payloads keep the origin and every event."""
+    events = [InvalidationEvent(1, "abc"), InvalidationEvent(2, None), InvalidationEvent(3, None, "assets")]
+
+    assert loads(dumps("worker", events)) == ("worker", events)
+
+
+def test_create_invalidation_bus():
+    """Test that the bus is built from its setting."""
+    assert create_invalidation_bus("") is None
+    assert isinstance(create_invalidation_bus("local"), LocalInvalidationBus)
+    with pytest.raises(ValueError):
+        create_invalidation_bus("redis")
+
+
+def test_postgres_bus_delivers_notifications_from_others():
+    """Test that the PostgreSQL bus hands notifications of other workers to its handler."""
+    received = []
+    bus = PostgresInvalidationBus("postgresql://unused")
+    bus._handler = received.append
+    event = InvalidationEvent(1, "abc")
+
+    bus._on_notification(None, 0, CHANNEL, dumps("other", [event]))
+    bus._on_notification(None, 0, CHANNEL, dumps(bus.origin, [InvalidationEvent(2, "def")]))
+    bus._on_notification(None, 0, CHANNEL, "not json")
+
+    assert received == [event]
+    assert not bus.listening
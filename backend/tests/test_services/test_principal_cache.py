@@ -0,0 +1,143 @@
+"""Tests for the authenticated-user cache behind current_user."""
+
+import pytest
+from sqlalchemy import event, inspect
+
+from aris.models import User
+from aris.services import principal_cache
+from aris.services.principal_cache import PrincipalCache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Enable a principal cache for the application, which conftest disables."""
+    cache = PrincipalCache(ttl=60)
+    monkeypatch.setattr(principal_cache, "_principal_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def user_selects(db_session):
+    """Record every SELECT on the users table."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            statements.append(statement)
+
+    sync_engine = db_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(sync_engine, "before_cursor_execute", record)
+
+
+def _user(user_id=1, name="Ada"):
+    return User(id=user_id, name=name, email=f"user{user_id}@example.com", password_hash="x")
+
+
+class TestPrincipalCache:
+    """Test the cache on its own."""
+
+    def test_hit_returns_detached_snapshot(self):
+        """Test that cached users are copies no session tracks."""
+        cache = PrincipalCache(ttl=60)
+        user = _user()
+
+        snapshot = cache.set(user)
+
+        assert snapshot is not user
+        assert cache.get(1) is snapshot
+        assert snapshot.name == "Ada"
+        assert inspect(snapshot).session is None
+
+    def test_expired_entries_miss(self, monkeypatch):
+        """Test that entries stop being served once their TTL elapses."""
+        now = [1000.0]
+        monkeypatch.setattr(principal_cache.time, "monotonic", lambda: now[0])
+        cache = PrincipalCache(ttl=5)
+        cache.set(_user())
+
+        now[0] += 4
+        assert cache.get(1) is not None
+        now[0] += 2
+        assert cache.get(1) is None
+        assert cache.stats()["entries"] == 0
+
+    def test_invalidate_and_stats(self):
+        """Test explicit invalidation and the hit ratio counters."""
+        cache = PrincipalCache(ttl=60)
+        cache.set(_user())
+        cache.get(1)
+        cache.invalidate(1)
+        cache.get(1)
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["invalidations"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_lru_bound(self):
+        """Test that the least recently used entry is evicted past max_entries."""
+        cache = PrincipalCache(ttl=60, max_entries=2)
+        cache.set(_user(1))
+        cache.set(_user(2))
+        cache.get(1)
+        cache.set(_user(3))
+
+        assert cache.get(2) is None
+        assert cache.get(1) is not None
+        assert cache.get(3) is not None
+
+    def test_zero_ttl_disables_caching(self):
+        """Test that a zero TTL still returns snapshots but never caches them."""
+        cache = PrincipalCache(ttl=0)
+        assert cache.set(_user()).name == "Ada"
+        assert cache.get(1) is None
+
+
+class TestCurrentUserCaching:
+    """Test current_user with the cache enabled."""
+
+    async def test_repeated_requests_resolve_user_once(
+        self, client, authenticated_user, auth_headers, cache, user_selects
+    ):
+        """Test that authenticating many requests queries the user once."""
+        for _ in range(5):
+            response = await client.get("/me", headers=auth_headers)
+            assert response.status_code == 200
+
+        assert len(user_selects) == 1
+        assert cache.stats()["hits"] == 4
+
+    async def test_duplicate_dependency_resolves_once_per_request(
+        self, client, authenticated_user, auth_headers, cache
+    ):
+        """Test that a router dependency plus a parameter count as one lookup."""
+        # /assets declares current_user on the router and again on the endpoint
+        response = await client.get("/assets", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert cache.stats()["hits"] + cache.stats()["misses"] == 1
+
+    async def test_update_invalidates(self, client, authenticated_user, auth_headers, cache):
+        """Test that changing the user is visible on the next request."""
+        await client.get("/me", headers=auth_headers)
+
+        response = await client.put(
+            f"/users/{authenticated_user['user_id']}",
+            headers=auth_headers,
+            json={"name": "Renamed", "initials": "RN", "email": authenticated_user["email"]},
+        )
+        assert response.status_code == 200
+
+        assert (await client.get("/me", headers=auth_headers)).json()["name"] == "Renamed"
+
+    async def test_soft_delete_invalidates(self, client, authenticated_user, auth_headers, cache):
+        """Test that a deleted user is rejected on the next request."""
+        await client.get("/me", headers=auth_headers)
+
+        response = await client.delete(f"/users/{authenticated_user['user_id']}", headers=auth_headers)
+        assert response.status_code == 200
+
+        assert (await client.get("/me", headers=auth_headers)).status_code == 401
@@ -0,0 +1,185 @@
+"""Tests for the content-addressed render cache."""
+
+import zlib
+
+import pytest
+import rsm
+
+from aris.services import render_engine
+from aris.services.asset_resolver import FileAssetResolver
+from aris.services.file_service.memory_service import InMemoryFileService
+from aris.services.file_service.models import FileCreateData
+from aris.services.render_cache import MemoryTier, RenderCache
+
+
+SOURCE = ":rsm:\n# Cached\n\nSome text.\n::"
+
+
+@pytest.fixture
+def render_calls(monkeypatch):
+    """Count calls to rsm.render, echoing the source and handrails flag."""
+    calls = []
+
+    def render(source, handrails=True, asset_resolver=None):
+        calls.append(source)
+        assets = asset_resolver.resolve_asset("a.txt") if asset_resolver else None
+        return f"<html handrails={handrails} asset={assets}>{source}</html>"
+
+    monkeypatch.setattr(rsm, "render", render)
+    return calls
+
+
+@pytest.fixture
+async def cached_engine(monkeypatch):
+    engine = render_engine.ThreadRenderEngine(workers=2, max_queue=8, timeout=5)
+    engine.cache = RenderCache(max_bytes=1_000_000)
+    monkeypatch.setattr(render_engine, "_render_engine", engine)
+    yield engine
+    await engine.shutdown()
+
+
+class TestMemoryTier:
+    """The in-memory tier is an LRU bounded by value size."""
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        tier = MemoryTier(max_bytes=10)
+        tier.set("a", "aaaa")
+        tier.set("b", "bbbb")
+        assert tier.get("a") == "aaaa"  # a is now most recently used
+        tier.set("c", "cccc")
+
+        assert tier.get("b") is None
+        assert tier.get("a") == "aaaa"
+        assert tier.get("c") == "cccc"
+        assert tier.size == 8
+
+    def test_counts_utf8_bytes(self):
+        tier = MemoryTier(max_bytes=10)
+        tier.set("a", "ééé")  # 6 bytes
+        tier.set("b", "éé")  # 4 bytes
+        assert tier.size == 10
+        tier.set("c", "x")
+        assert tier.get("a") is None
+
+    def test_replacing_and_oversized_values(self):
+        tier = MemoryTier(max_bytes=4)
+        tier.set("a", "aa")
+        tier.set("a", "aaa")
+        assert tier.size == 3 and len(tier) == 1
+        tier.set("b", "bbbbb")
+        assert tier.get("b") is None
+        assert tier.get("a") == "aaa"
+
+
+class TestRenderCacheKey:
+    """Keys address exactly the inputs that determine a render."""
+
+    def test_key_inputs(self):
+        cache = RenderCache(max_bytes=100)
+        base = cache.key("render", SOURCE, True, "")
+
+        assert cache.key("render", SOURCE, True, "") == base
+        assert cache.key("body", SOURCE, True, "") != base
+        assert cache.key("render", SOURCE + " ", True, "") != base
+        assert cache.key("render", SOURCE, False, "") != base
+        assert cache.key("render", SOURCE, True, "digest") != base
+
+        cache.rsm_version = "0.0.0"
+        assert cache.key("render", SOURCE, True, "") != base
+
+    def test_asset_digest_depends_on_content(self):
+        digest = FileAssetResolver({"a.txt": "one", "b.txt": "two"}).digest()
+        assert FileAssetResolver({"b.txt": "two", "a.txt": "one"}).digest() == digest
+        assert FileAssetResolver({"a.txt": "one", "b.txt": "TWO"}).digest() != digest
+        assert FileAssetResolver({"a.txt": "one"}).digest() != digest
+
+
+class TestDiskTier:
+    """The SQLite tier survives restarts and is shared between processes."""
+
+    async def test_survives_restart_and_promotes_to_memory(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        first = RenderCache(max_bytes=1000, disk_path=path, disk_max_bytes=10_000)
+        key = first.key("render", SOURCE)
+        await first.set(key, "<html>cached</html>")
+        first.close()
+
+        second = RenderCache(max_bytes=1000, disk_path=path, disk_max_bytes=10_000)
+        assert await second.get(key) == "<html>cached</html>"
+        assert await second.get(key) == "<html>cached</html>"
+        assert second.stats()["disk_hits"] == 1
+        assert second.stats()["memory_hits"] == 1
+        second.close()
+
+    async def test_prune_evicts_least_recently_accessed(self, tmp_path):
+        value_size = len(zlib.compress(b"a" * 100))
+        cache = RenderCache(
+            max_bytes=1000, disk_path=str(tmp_path / "c.sqlite3"), disk_max_bytes=value_size
+        )
+        await cache.set("a", "a" * 100)
+        await cache.set("b", "b" * 100)
+        await cache.disk.get("a")  # a becomes the most recently accessed
+        await cache.disk.prune()
+
+        assert await cache.disk.get("a") == "a" * 100
+        assert await cache.disk.get("b") is None
+        cache.close()
+
+    async def test_clear(self, tmp_path):
+        cache = RenderCache(max_bytes=1000, disk_path=str(tmp_path / "c.sqlite3"), disk_max_bytes=10_000)
+        await cache.set("k", "v")
+        await cache.clear()
+        assert await cache.get("k") is None
+        cache.close()
+
+
+class TestEngineCaching:
+    """The render engine consults the cache before dispatching work."""
+
+    async def test_identical_sources_render_once(self, cached_engine, render_calls):
+        first = await cached_engine.render(SOURCE)
+        second = await cached_engine.render(SOURCE)
+        other = await cached_engine.render(SOURCE, handrails=False)
+
+        assert first == second != other
+        assert render_calls == [SOURCE, SOURCE]
+        assert cached_engine.cache.stats()["memory_hits"] == 1
+
+    async def test_assets_are_part_of_the_address(self, cached_engine, render_calls):
+        one = FileAssetResolver({"a.txt": "one"})
+        same = FileAssetResolver({"a.txt": "one"})
+        changed = FileAssetResolver({"a.txt": "two"})
+
+        assert "asset=one" in await cached_engine.render(SOURCE, asset_resolver=one)
+        assert "asset=one" in await cached_engine.render(SOURCE, asset_resolver=same)
+        assert "asset=two" in await cached_engine.render(SOURCE, asset_resolver=changed)
+        assert len(render_calls) == 2
+
+    async def test_resolver_without_digest_is_not_cached(self, cached_engine, render_calls):
+        class Resolver:
+            def resolve_asset(self, path):
+                return "x"
+
+        await cached_engine.render(SOURCE, asset_resolver=Resolver())
+        await cached_engine.render(SOURCE, asset_resolver=Resolver())
+        assert len(render_calls) == 2
+
+    async def test_failures_are_not_cached(self, cached_engine, monkeypatch):
+        def fail(source, handrails=True):
+            raise rsm.RSMApplicationError("bad")
+
+        monkeypatch.setattr(rsm, "render", fail)
+        with pytest.raises(rsm.RSMApplicationError):
+            await cached_engine.render(SOURCE)
+        assert len(cached_engine.cache.memory) == 0
+
+    async def test_duplicated_files_share_renders(self, cached_engine, render_calls):
+        service = InMemoryFileService()
+        original = await service.create_file(FileCreateData(title="A", source=SOURCE, owner_id=1))
+        duplicate = await service.duplicate_file(original.id)
+        other_user = await service.create_file(FileCreateData(title="B", source=SOURCE, owner_id=2))
+
+        htmls = {await service.get_file_html(f.id) for f in (original, duplicate, other_user)}
+
+        assert len(htmls) == 1
+        assert render_calls == [SOURCE]
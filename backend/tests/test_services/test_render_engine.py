@@ -0,0 +1,198 @@
+"""Tests for the RSM render engines."""
+
+import asyncio
+import os
+import time
+
+import pytest
+import rsm
+
+from aris.services.render_engine import (
+    ProcessRenderEngine,
+    RenderQueueFullError,
+    RenderSourceTooLargeError,
+    RenderTimeoutError,
+    ThreadRenderEngine,
+    tasks,
+)
+
+
+SOURCE = ":rsm:\n# The Title\n\nSome *content*.\n::"
+
+
+@pytest.fixture
+async def process_engine():
+    engine = ProcessRenderEngine(workers=2, max_queue=4, timeout=30, max_tasks_per_worker=0)
+    yield engine
+    await engine.shutdown()
+
+
+@pytest.fixture
+async def thread_engine():
+    engine = ThreadRenderEngine(workers=1, max_queue=1, timeout=5)
+    yield engine
+    await engine.shutdown()
+
+
+class TestThreadRenderEngine:
+    """Admission control and timeouts shared by every engine."""
+
+    async def test_render_matches_rsm(self, thread_engine):
+        assert await thread_engine.render(SOURCE) == rsm.render(SOURCE, handrails=True)
+        assert thread_engine.stats()["completed"] == 1
+
+    async def test_rejects_when_queue_full(self, thread_engine, monkeypatch):
+        monkeypatch.setattr(rsm, "render", lambda src, handrails=True: time.sleep(0.2) or src)
+
+        running = asyncio.create_task(thread_engine.render("a"))
+        queued = asyncio.create_task(thread_engine.render("b"))
+        await asyncio.sleep(0)
+        assert thread_engine.is_saturated()
+
+        with pytest.raises(RenderQueueFullError):
+            await thread_engine.render("c")
+
+        assert await asyncio.gather(running, queued) == ["a", "b"]
+        assert not thread_engine.is_saturated()
+        assert thread_engine.stats()["rejected"] == 1
+
+    async def test_timeout(self, monkeypatch):
+        monkeypatch.setattr(rsm, "render", lambda src, handrails=True: time.sleep(0.3) or src)
+        engine = ThreadRenderEngine(workers=1, max_queue=1, timeout=0.05)
+
+        with pytest.raises(RenderTimeoutError):
+            await engine.render(SOURCE)
+
+        assert engine.stats()["timed_out"] == 1
+        # The render keeps its slot until the thread finishes it
+        assert engine.stats()["outstanding"] == 1
+        while engine.stats()["outstanding"]:
+            await asyncio.sleep(0.05)
+        await engine.shutdown()
+
+    async def test_timed_out_renders_count_until_finished(self, monkeypatch):
+        monkeypatch.setattr(rsm, "render", lambda src, handrails=True: time.sleep(0.5) or src)
+        engine = ThreadRenderEngine(workers=1, max_queue=1, timeout=0.05)
+
+        for source in "ab":
+            with pytest.raises(RenderTimeoutError):
+                await engine.render(source)
+
+        # Both renders still occupy the worker and the queue
+        assert engine.is_saturated()
+        with pytest.raises(RenderQueueFullError):
+            await engine.render("c")
+
+        while engine.stats()["outstanding"]:
+            await asyncio.sleep(0.05)
+        assert not engine.is_saturated()
+        await engine.shutdown()
+
+    async def test_rsm_errors_propagate(self, thread_engine, monkeypatch):
+        def fail(src, handrails=True):
+            raise rsm.RSMApplicationError("bad source")
+
+        monkeypatch.setattr(rsm, "render", fail)
+        with pytest.raises(rsm.RSMApplicationError):
+            await thread_engine.render(SOURCE)
+
+
+class TestProcessRenderEngine:
+    """RSM work runs in recyclable worker processes."""
+
+    async def test_render_title_and_body(self, process_engine):
+        html = await process_engine.render(SOURCE)
+        body = await process_engine.render_body(SOURCE)
+        title = await process_engine.parse_title(SOURCE)
+
+        assert html == rsm.render(SOURCE, handrails=True)
+        assert "Some" in body and "<html" not in body
+        assert title == "The Title"
+
+    async def test_render_indexed(self, process_engine):
+        indexed = await process_engine.render_indexed(SOURCE)
+
+        assert indexed.html == await process_engine.render_body(SOURCE)
+        assert indexed.section("manuscript").startswith('<div class="manuscript"')
+        assert "Some" in indexed.section("manuscript")
+
+    async def test_render_incremental(self, process_engine):
+        html, fragments = await process_engine.render_incremental(SOURCE)
+        edited = SOURCE.replace("# The Title", "# The Title\n\nA new paragraph.")
+        edited_html, _ = await process_engine.render_incremental(edited, fragments=fragments)
+
+        assert html == rsm.render(SOURCE, handrails=True)
+        assert fragments
+        assert edited_html == rsm.render(edited, handrails=True)
+
+    async def test_runs_in_other_processes(self, process_engine):
+        await process_engine.start()
+        pids = await asyncio.gather(*(process_engine._submit(tasks.worker_pid) for _ in range(4)))
+        assert os.getpid() not in pids
+
+    async def test_worker_errors_propagate(self, process_engine):
+        with pytest.raises(Exception):
+            await process_engine.render(None)
+        assert await process_engine.parse_title(SOURCE) == "The Title"
+
+    async def test_workers_are_recycled(self):
+        engine = ProcessRenderEngine(workers=1, max_queue=1, timeout=30, max_tasks_per_worker=2)
+        try:
+            pids = [await engine._submit(tasks.worker_pid) for _ in range(4)]
+        finally:
+            await engine.shutdown()
+        assert pids[0] == pids[1]
+        assert pids[2] == pids[3]
+        assert pids[1] != pids[2]
+
+    async def test_timeout_retires_pool_and_kills_worker(self):
+        engine = ProcessRenderEngine(workers=1, max_queue=1, timeout=0.5, max_tasks_per_worker=0)
+        try:
+            stuck_pid = await engine._submit(tasks.worker_pid)
+            stuck_pool = engine._pool
+            with pytest.raises(RenderTimeoutError):
+                await engine._submit(time.sleep, 30)
+
+            # The stuck worker is killed and renders continue on a fresh pool
+            assert await engine.parse_title(SOURCE) == "The Title"
+            assert engine._pool is not stuck_pool
+            assert engine.stats()["pools_started"] == 2
+            assert engine.stats()["retired_pools"] == 0
+            assert await engine._submit(tasks.worker_pid) != stuck_pid
+        finally:
+            await engine.shutdown()
+
+
+class TestAdmissionControl:
+    """Source size limits and retry hints."""
+
+    async def test_oversized_source_is_rejected_before_dispatch(self):
+        engine = ThreadRenderEngine(workers=1, max_queue=1, timeout=5, max_source_bytes=10)
+
+        with pytest.raises(RenderSourceTooLargeError) as info:
+            await engine.render(":rsm:" + "é" * 10 + "::")
+        assert info.value.retry_after is None
+        assert engine.stats()["outstanding"] == 0
+
+        # Multi-byte characters are measured in bytes, not characters
+        with pytest.raises(RenderSourceTooLargeError):
+            await engine.render_body("éééééé")
+        # Parsing titles is never refused, so listings keep working
+        assert await engine.parse_title(SOURCE) == "The Title"
+        await engine.shutdown()
+
+    async def test_retry_after_tracks_backlog(self, monkeypatch):
+        monkeypatch.setattr(rsm, "render", lambda src, handrails=True: time.sleep(0.2) or src)
+        engine = ThreadRenderEngine(workers=1, max_queue=1, timeout=5)
+        assert engine.retry_after() == 1
+
+        await engine.render("a")
+        tasks_ = [asyncio.create_task(engine.render(s)) for s in "bc"]
+        await asyncio.sleep(0)
+        with pytest.raises(RenderQueueFullError) as info:
+            await engine.render("d")
+
+        assert info.value.retry_after >= 1
+        assert engine.stats()["mean_duration_ms"] > 0
+        await asyncio.gather(*tasks_)
+        await engine.shutdown()
@@ -0,0 +1,63 @@
+"""Tests for the section index of rendered HTML."""
+
+import rsm
+from bs4 import BeautifulSoup
+
+from aris.services.render_engine import IndexedHTML, index_sections
+
+
+SOURCE = """:rsm:
+# Title
+
+## minimap
+
+Minimap &lt; content.
+
+## abstract
+
+Some :span: text ::. $$ x < y $$
+
+- one
+- two
+::"""
+
+
+def test_sections_match_a_full_parse():
+    app = rsm.app.ProcessorApp(plain=SOURCE, handrails=True)
+    app.run()
+    html = str(app.translator.body)
+    indexed = index_sections(html)
+    soup = BeautifulSoup(html, "lxml")
+
+    assert "level-2" in indexed.sections
+    for name in indexed.sections:
+        expected = soup.find(attrs={"class": name})
+        found = BeautifulSoup(indexed.section(name), "lxml").find(attrs={"class": name})
+        assert str(found) == str(expected), name
+
+
+def test_first_element_wins():
+    html = '<div class="a b">one</div><p class="a">two</p>'
+    indexed = index_sections(html)
+
+    assert indexed.section("a") == '<div class="a b">one</div>'
+    assert indexed.section("a b") == indexed.section("a")
+    assert indexed.section("missing") == ""
+
+
+def test_void_and_unclosed_elements():
+    html = '<div class="outer"><p class="para">text<img class="pic" src="x"></div><span class="tail">'
+    indexed = index_sections(html)
+
+    assert indexed.section("pic") == '<img class="pic" src="x">'
+    assert indexed.section("para") == '<p class="para">text<img class="pic" src="x">'
+    assert indexed.section("outer").endswith("</div>")
+    assert indexed.section("tail") == '<span class="tail">'
+
+
+def test_offsets_span_lines_and_round_trip():
+    html = '<div>\n\n  <section class="s">\nα\n</section>\n</div>'
+    indexed = index_sections(html)
+
+    assert indexed.section("s") == '<section class="s">\nα\n</section>'
+    assert IndexedHTML.loads(indexed.dumps()) == indexed
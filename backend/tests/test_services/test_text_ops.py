@@ -0,0 +1,54 @@
+"""Tests for text operations on file sources."""
+
+import pytest
+
+from aris.services.file_service import (
+    TextOperation,
+    TextOperationError,
+    apply_text_operations,
+    source_version,
+)
+
+
+def test_operations_refer_to_the_base_source():
+    """Test that every offset is relative to the base, not to earlier edits."""
+    source = "abcdefgh"
+    operations = [
+        TextOperation(1, 2, "XYZ"),
+        TextOperation(4, 0, "-"),
+        TextOperation(6, 2),
+    ]
+
+    assert apply_text_operations(source, operations) == "aXYZd-ef"
+
+
+def test_operations_count_code_points():
+    """Test that offsets count characters rather than bytes."""
+    assert apply_text_operations("é=mc²", [TextOperation(4, 1, "^2")]) == "é=mc^2"
+
+
+def test_insert_at_end():
+    """Test that an insertion may sit right after the last character."""
+    assert apply_text_operations("abc", [TextOperation(3, 0, "d")]) == "abcd"
+
+
+@pytest.mark.parametrize(
+    "operations",
+    [
+        [TextOperation(2, 5)],
+        [TextOperation(3, 0), TextOperation(1, 0)],
+        [TextOperation(0, 2), TextOperation(1, 0)],
+        [TextOperation(0, -1)],
+    ],
+    ids=["out of range", "unsorted", "overlapping", "negative"],
+)
+def test_invalid_operations(operations):
+    """Test that operations not fitting the base source are rejected."""
+    with pytest.raises(TextOperationError):
+        apply_text_operations("abcd", operations)
+
+
+def test_source_version_follows_content():
+    """Test that equal sources share a version and different sources do not."""
+    assert source_version(":rsm:a::") == source_version(":rsm:" + "a::")
+    assert source_version(":rsm:a::") != source_version(":rsm:b::")
@@ -0,0 +1,154 @@
+"""Tests for write-behind persistence of edited files."""
+
+import asyncio
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from aris.models.models import File
+from aris.services.file_service import FileUpdateData, InMemoryFileService
+
+
+@pytest.fixture
+def session_factory(db_session, test_engine):
+    return async_sessionmaker(test_engine, expire_on_commit=False)
+
+
+async def _add_file(db_session, owner_id, source):
+    now = datetime.now(UTC)
+    db_file = File(owner_id=owner_id, source=source, title="", created_at=now, last_edited_at=now)
+    db_session.add(db_file)
+    await db_session.commit()
+    return db_file.id
+
+
+async def _stored_source(session_factory, file_id):
+    async with session_factory() as db:
+        return (await db.get(File, file_id)).source
+
+
+@pytest.fixture
+async def file_service(db_session):
+    service = InMemoryFileService()
+    yield service
+    await service.stop_write_behind()
+
+
+async def test_edits_are_coalesced_into_one_write(file_service, db_session, session_factory, test_user):
+    """Test that repeated edits of a file are written once, with its latest state."""
+    file_id = await _add_file(db_session, test_user.id, ":rsm:\nOriginal\n::")
+    await file_service.sync_from_database(db_session)
+    queue = file_service.start_write_behind(session_factory, interval=60)
+
+    for i in range(3):
+        await file_service.update_file(file_id, FileUpdateData(source=f":rsm:\n# Edit {i}\n::"))
+        assert await file_service.update_file_in_database(file_id, db_session)
+
+    assert file_service.get_write_behind_stats()["dirty"] == 1
+    assert await _stored_source(session_factory, file_id) == ":rsm:\nOriginal\n::"
+
+    assert await queue.flush() == 1
+
+    assert await _stored_source(session_factory, file_id) == ":rsm:\n# Edit 2\n::"
+    async with session_factory() as db:
+        assert (await db.get(File, file_id)).derived_title == "Edit 2"
+    stats = file_service.get_write_behind_stats()
+    assert stats["dirty"] == 0
+    assert stats["flushes"] == 1 and stats["written"] == 1
+
+
+async def test_dirty_threshold_triggers_flush(file_service, db_session, session_factory, test_user):
+    """Test that enough dirty files are written before the interval ends."""
+    file_ids = [await _add_file(db_session, test_user.id, f":rsm:\n{i}\n::") for i in range(2)]
+    await file_service.sync_from_database(db_session)
+    file_service.start_write_behind(session_factory, interval=60, max_dirty=2)
+
+    for file_id in file_ids:
+        await file_service.update_file(file_id, FileUpdateData(source=":rsm:\nEdited\n::"))
+        await file_service.update_file_in_database(file_id, db_session)
+    while file_service.get_write_behind_stats()["written"] < 2:
+        await asyncio.sleep(0.01)
+
+    for file_id in file_ids:
+        assert await _stored_source(session_factory, file_id) == ":rsm:\nEdited\n::"
+
+
+async def test_stop_writes_pending_edits(file_service, db_session, session_factory, test_user):
+    """Test that pending edits are written on shutdown."""
+    file_id = await _add_file(db_session, test_user.id, ":rsm:\nOriginal\n::")
+    await file_service.sync_from_database(db_session)
+    file_service.start_write_behind(session_factory, interval=60)
+    await file_service.update_file(file_id, FileUpdateData(source=":rsm:\nEdited\n::"))
+    await file_service.update_file_in_database(file_id, db_session)
+
+    await file_service.stop_write_behind()
+
+    assert await _stored_source(session_factory, file_id) == ":rsm:\nEdited\n::"
+    assert file_service.get_write_behind_stats() is None
+
+
+async def test_sync_keeps_pending_edits(file_service, db_session, session_factory, test_user):
+    """Test that syncing from the database does not revert edits waiting to be written."""
+    file_id = await _add_file(db_session, test_user.id, ":rsm:\nOriginal\n::")
+    await file_service.sync_from_database(db_session)
+    file_service.start_write_behind(session_factory, interval=60)
+    await file_service.update_file(file_id, FileUpdateData(source=":rsm:\nEdited\n::"))
+    await file_service.update_file_in_database(file_id, db_session)
+
+    await file_service.sync_from_database(db_session)
+    await file_service.sync_from_database(db_session, full=True)
+
+    assert (await file_service.get_file(file_id)).source == ":rsm:\nEdited\n::"
+
+
+async def test_failed_flush_keeps_files_dirty(file_service, db_session, session_factory, test_user):
+    """Test that files stay dirty and are retried when writing fails."""
+    file_id = await _add_file(db_session, test_user.id, ":rsm:\nOriginal\n::")
+    await file_service.sync_from_database(db_session)
+
+    def broken_session():
+        raise ConnectionError("database is down")
+
+    queue = file_service.start_write_behind(broken_session, interval=60)
+    await file_service.update_file(file_id, FileUpdateData(source=":rsm:\nEdited\n::"))
+    await file_service.update_file_in_database(file_id, db_session)
+
+    assert await queue.flush() == 0
+    stats = file_service.get_write_behind_stats()
+    assert stats["dirty"] == 1
+    assert stats["consecutive_failures"] == 1
+
+    queue.session_factory = session_factory
+    assert await queue.flush() == 1
+    assert file_service.get_write_behind_stats()["consecutive_failures"] == 0
+    assert await _stored_source(session_factory, file_id) == ":rsm:\nEdited\n::"
+
+
+async def test_flush_skips_current_metadata(file_service, db_session, session_factory, test_user, monkeypatch):
+    """Test that a flush only extracts metadata for sources it has not written before."""
+    from aris.services.file_service import bulk
+
+    file_id = await _add_file(db_session, test_user.id, ":rsm:\n# Original\n::")
+    await file_service.sync_from_database(db_session)
+    queue = file_service.start_write_behind(session_factory, interval=60)
+    parsed = []
+    metadata_columns = bulk.metadata_columns
+
+    async def counting_metadata_columns(file_id, source):
+        parsed.append(source)
+        return await metadata_columns(file_id, source)
+
+    monkeypatch.setattr(bulk, "metadata_columns", counting_metadata_columns)
+
+    await file_service.update_file(file_id, FileUpdateData(source=":rsm:\n# Edited\n::"))
+    await file_service.update_file_in_database(file_id, db_session)
+    await queue.flush()
+    await file_service.update_file(file_id, FileUpdateData(title="Renamed"))
+    await file_service.update_file_in_database(file_id, db_session)
+    await queue.flush()
+
+    assert parsed == [":rsm:\n# Edited\n::"]
+    async with session_factory() as db:
+        stored = await db.get(File, file_id)
+        assert (stored.title, stored.derived_title) == ("Renamed", "Edited")